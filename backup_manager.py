@@ -11,6 +11,275 @@ import zipfile
 import mysql.connector
 import subprocess
 import tempfile
+import queue
+import stat
+import re
+import calendar
+import json
+import hashlib
+import random
+import gzip
+import tarfile
+import shlex
+import zlib
+import math
+import lzma
+import sqlite3
+import struct
+import copy
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+
+# tar.zst arşivleri için (isteğe bağlı)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Tekilleştirilmiş deponun dosya kilidi için (POSIX'te fcntl, Windows'ta msvcrt)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Manifest ve diğer kalıcı durum dosyalarının tutulduğu dizin (ConfigManager ile aynı)
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".backupmaster")
+
+# Tekilleştirilmiş depoda dosya içeriklerini adreslemek için kullanılan özet boyutu (bayt)
+BLOB_DIGEST_SIZE = 20
+# Dosyalar özetlenirken okunan blok boyutu
+HASH_CHUNK = 1024 * 1024
+
+# Sunucu kaydında 'connections' belirtilmemişse kullanılacak eşzamanlı bağlantı sayısı
+DEFAULT_CONNECTIONS = 4
+# Uyarlanabilir bağlantı denetleyicisinin çıkabileceği en yüksek eşzamanlı bağlantı sayısı (varsayılan)
+MAX_ADAPTIVE_CONNECTIONS = 16
+# Verimin ölçüldüğü aralık (sn) ve yeni bağlantının tutulması için gereken en az verim artışı
+CONTROLLER_INTERVAL = 3.0
+CONTROLLER_MIN_GAIN = 0.05
+# Verim düzleştikten sonra kaç aralıkta bir yeniden bağlantı ekleneceği
+CONTROLLER_REPROBE_INTERVALS = 20
+# Bağlantı reddiyle öğrenilen tavanın geçerli kaldığı süre (sn)
+CONTROLLER_CEILING_TTL = 7 * 24 * 3600
+# Düşük tavanın sonraki yedeklemeler için kaydedilmesi için bir çalışmada gereken en az sınır hatası
+CONTROLLER_CEILING_HITS = 3
+# Sunucunun bağlantı sınırına ulaşıldığını gösteren hata iletileri; bağlantı sıfırlanması gibi
+# geçici ağ hataları sınır sayılmaz
+CONNECTION_LIMIT_RE = re.compile(
+    r'too many (connections|users|clients|connected users)|maximum number of (connections|clients|users)|'
+    r'connection limit|^421\b.*\b(many|limit|maximum)\b|administratively prohibited',
+    re.IGNORECASE
+)
+# Geçici hatalarda bir listeleme/aktarımın en fazla deneme sayısı
+RETRY_ATTEMPTS = 4
+# Yeniden denemeler arasındaki bekleme (sn); her denemede iki katına çıkar, üst sınıra kadar
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+# Kontrol bağlantısının ya da SSH oturumunun koptuğunu gösteren hata iletileri
+CONNECTION_LOST_RE = re.compile(
+    r'^421\b|closed|not connected|connection (reset|aborted|dropped|lost)|broken pipe|timed out|eof',
+    re.IGNORECASE
+)
+# Dizin taraması için açılacak en fazla bağlantı (indirme bağlantılarından bağımsız, küçük bir havuz)
+MAX_SCAN_CONNECTIONS = 4
+# Tarama sırasında kaç öğede bir ilerleme bildirileceği
+SCAN_REPORT_INTERVAL = 500
+# Tarayıcı ile indirme işçileri arasındaki dosya kuyruğunun kapasitesi
+PIPELINE_QUEUE_SIZE = 1000
+
+# SFTP okumalarında kullanılan blok boyutu; sunucu kaydında 'request_size' yoksa tek okuma isteğinin boyutu
+SFTP_READ_CHUNK = 32768
+# SFTP aktarım ayarlarının otomatik belirlenmesinde hedeflenen bant genişliği (bayt/sn, ~1 Gbit/s)
+SFTP_TUNING_BANDWIDTH = 125 * 1024 * 1024
+# Otomatik ayarda kullanılan alt/üst sınırlar
+SFTP_MIN_READ_AHEAD = 32
+SFTP_MAX_READ_AHEAD = 1024
+SFTP_MIN_WINDOW = 2 * 1024 * 1024
+SFTP_MAX_WINDOW = 64 * 1024 * 1024
+SFTP_MIN_BUFFER = 256 * 1024
+SFTP_MAX_BUFFER = 4 * 1024 * 1024
+# FTP veri bağlantısından okunan blok boyutu (ftplib.retrbinary varsayılanı)
+FTP_READ_CHUNK = 8192
+
+# Uzak tar akışında sunucuda çalıştırılan komut; hariç tutma kuralları --exclude olarak eklenir
+REMOTE_TAR_COMMAND = "tar -czf - -C {root} {excludes} ."
+# Sunucu kaydındaki 'remote_tar' alanında açık anlamına gelen değerler
+TRUE_VALUES = ('1', 'true', 'evet', 'yes', 'on')
+
+# Doğrudan ZIP'e yazılırken bu boyuta kadar olan dosyalar bellekte toplanıp tek seferde eklenir
+ZIP_MEMORY_BUFFER = 4 * 1024 * 1024
+# Doğrudan ZIP'e yazılırken sırada bekleyen girdilerin bellekte tutulabileceği toplam boyut; aşan girdi diske taşınır
+ZIP_QUEUE_MEMORY = 64 * 1024 * 1024
+# Doğrudan ZIP'e yazılırken geçici dosyalarda bekleyebilecek toplam veri; aşılırsa girdi arşivi bekleyip doğrudan yazılır
+ZIP_SPOOL_LIMIT = 1024 * 1024 * 1024
+# ZIP tarih alanının gösterebildiği en eski zaman (1980-01-01, yerel saat farkı için bir gün sonrası)
+ZIP_MIN_TIMESTAMP = 315619200
+# Paralel sıkıştırmada dosyalar bu boyutta parçalara bölünüp iş parçacıklarına dağıtılır
+ZIP_CHUNK_SIZE = 1024 * 1024
+# Her parça önceki parçanın son 32 KB'ı sözlük olarak verilerek sıkıştırılır (deflate penceresi)
+ZIP_DICTIONARY_SIZE = 32 * 1024
+# İş parçacığı başına sırada bekleyebilecek parça sayısı (bellek kullanımını sınırlar)
+ZIP_PIPELINE_DEPTH = 4
+# Arşivleme ilerlemesinin log'a yazılma aralığı (saniye)
+ARCHIVE_LOG_INTERVAL = 2.0
+
+# Desteklenen arşiv biçimleri: ad -> (dosya uzantısı, açıklama)
+ARCHIVE_FORMATS = {
+    'zip': ('.zip', 'ZIP (deflate)'),
+    'zip-store': ('.zip', 'ZIP (sıkıştırmasız)'),
+    'tar': ('.tar', 'TAR (sıkıştırmasız)'),
+    'tar.zst': ('.tar.zst', 'TAR + Zstandard'),
+    'tar.xz': ('.tar.xz', 'TAR + XZ'),
+}
+# Sunucu kaydında seviye belirtilmemişse kullanılan sıkıştırma seviyeleri
+DEFAULT_ARCHIVE_LEVELS = {'zip': 6, 'tar.zst': 3, 'tar.xz': 6}
+# Biçim karşılaştırma raporunda sıkıştırılan örneğin en büyük boyutu
+ARCHIVE_SAMPLE_BYTES = 64 * 1024 * 1024
+# Parçalı ZIP'te her girdinin merkezi dizin kaydı için adına ek olarak ayrılan pay (ZIP64 alanı dahil)
+VOLUME_ENTRY_OVERHEAD = 128
+# Parçanın kalanı bundan azsa sığmayan dosya bölünmeden sonraki parçaya geçilir
+VOLUME_MIN_PART = 1024 * 1024
+# Sıkışmayan verinin blok başlıklarıyla büyüme payı: boyutun binde biri
+VOLUME_EXPANSION = 1000
+# Parça sınırında kesilen deflate akışını kapatan boş son blok
+ZIP_DEFLATE_END = b'\x03\x00'
+# Parça başına kapanış kayıtları, tar kayıt dolgusu ve sıkıştırma çerçevesi için ayrılan pay
+VOLUME_RESERVE = 64 * 1024
+# Arşiv dizinine (index.db) tek seferde yazılan girdi satırı sayısı
+INDEX_BATCH_SIZE = 10000
+# ZIP yerel dosya başlığı: imza, sürüm, bayraklar, yöntem, zaman, CRC, boyutlar, ad ve ek alan uzunlukları
+ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+# Zaten sıkıştırılmış olduğundan arşive sıkıştırılmadan eklenen dosya türleri
+COMPRESSED_EXTENSIONS = frozenset((
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'heic', 'ico',
+    'mp4', 'm4v', 'mov', 'avi', 'mkv', 'webm', 'flv', 'wmv',
+    'mp3', 'm4a', 'aac', 'ogg', 'oga', 'opus', 'flac', 'wma',
+    'zip', 'gz', 'tgz', 'bz2', 'xz', 'txz', 'zst', 'lz4', 'br', '7z', 'rar', 'cab',
+    'jar', 'war', 'apk', 'whl', 'docx', 'xlsx', 'pptx', 'odt', 'ods', 'odp', 'epub',
+    'pdf', 'woff', 'woff2',
+))
+# Uzantısı bilinmeyen dosyalarda sıkıştırılabilirlik ilk bloğun entropisinden tahmin edilir
+ENTROPY_SAMPLE_SIZE = 64 * 1024
+# Bundan kısa örneklerin entropisi güvenilir değildir, dosya sıkıştırılır
+ENTROPY_MIN_SAMPLE = 4096
+# Bayt başına bu kadar bit ve üzerindeki entropi zaten sıkıştırılmış/şifreli veri demektir
+ENTROPY_THRESHOLD = 7.5
+
+# Bu boyutun üzerindeki dosyalar bayt aralıklarına bölünüp ayrı oturumlarla eşzamanlı indirilir
+SEGMENT_THRESHOLD = 64 * 1024 * 1024
+# Bir parçanın en küçük boyutu; küçük dosyalar daha az parçaya bölünür
+SEGMENT_MIN_SIZE = 16 * 1024 * 1024
+# Sunucu kaydında 'segments' belirtilmemişse büyük bir dosya için açılacak parça oturumu sayısı
+DEFAULT_SEGMENTS = 4
+
+# Bant genişliği sınırlayıcısının biriktirebileceği en fazla kota (saniyelik hız cinsinden)
+BANDWIDTH_BURST_SECONDS = 1.0
+# Kota beklenirken en uzun uyku süresi (sn); hız değişikliği ve durdurma bu aralıkla fark edilir
+BANDWIDTH_MAX_SLEEP = 0.25
+
+# MLSD desteklenmediğinde kullanılan LIST satırı ayrıştırıcıları (Unix ve Windows/IIS biçimleri)
+UNIX_LIST_RE = re.compile(
+    r'^(?P<mode>[-dlcbps])[-rwxsStT]{9}\S*\s+\d+\s+\S+(?:\s+\S+)?\s+(?P<size>\d+)\s+'
+    r'(?P<month>[A-Za-z]{3})\s+(?P<day>\d{1,2})\s+(?:(?P<hour>\d{1,2}):(?P<minute>\d{2})|(?P<year>\d{4}))\s(?P<name>.+)$'
+)
+DOS_LIST_RE = re.compile(
+    r'^(?P<month>\d{2})-(?P<day>\d{2})-(?P<year>\d{2,4})\s+(?P<hour>\d{1,2}):(?P<minute>\d{2})(?P<ampm>[AP]M)?\s+'
+    r'(?P<size><DIR>|\d+)\s+(?P<name>.+)$',
+    re.IGNORECASE
+)
+# Filtre kurallarındaki boyut ("<50MB", ">1KB") ve yaş ("age<30d", "age>1y") sınırları
+SIZE_RULE_RE = re.compile(r'^([<>])(\d+(?:\.\d+)?)([KMGT]?)B?$', re.IGNORECASE)
+AGE_RULE_RE = re.compile(r'^age([<>])(\d+(?:\.\d+)?)([smhdwy]?)$', re.IGNORECASE)
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+AGE_UNITS = {'': 86400, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400, 'y': 365 * 86400}
+# Filtre kural listelerindeki ayraçlar
+FILTER_SEPARATOR_RE = re.compile(r'[;,\s]+')
+
+LIST_MONTHS = {name: index for index, name in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], 1)}
+
+def server_state_key(server_info):
+    """Sunucuya ait durum dosyaları için dosya sistemi güvenli anahtar"""
+    return re.sub(r'[^\w.-]', '_', f"{server_info.get('name', '')}_{server_info.get('host', '')}")
+
+def make_item(path, is_dir, size=None, mtime=None):
+    """Tarama sonucundaki tek bir uzak öğeyi temsil eden kaydı oluştur"""
+    return {'path': path, 'is_dir': is_dir, 'size': size, 'mtime': mtime}
+
+def parse_mlsd_time(value):
+    """MLSD 'modify' değerini (YYYYMMDDHHMMSS[.sss], UTC) epoch saniyesine çevir"""
+    try:
+        return calendar.timegm(time.strptime(value[:14], "%Y%m%d%H%M%S"))
+    except (TypeError, ValueError):
+        return None
+
+def parse_list_line(line):
+    """Tek bir LIST satırını (isim, klasör_mü, boyut, mtime) olarak ayrıştır
+
+    LIST zamanları dakika hassasiyetinde ve sunucu yerel saatindedir; yine de
+    aynı sunucudaki iki tarama arasında değişiklik tespiti için yeterlidir.
+    Tanınmayan satırlar için None döner.
+    """
+    match = UNIX_LIST_RE.match(line)
+    if match:
+        name = match.group('name')
+        if match.group('mode') == 'l' and ' -> ' in name:
+            name = name.split(' -> ', 1)[0]
+        month = LIST_MONTHS.get(match.group('month').lower())
+        mtime = None
+        if month:
+            now = time.gmtime()
+            if match.group('year'):
+                year, hour, minute = int(match.group('year')), 0, 0
+            else:
+                # Yıl yazılmayan satırlar son 6 ay içindedir
+                year, hour, minute = now.tm_year, int(match.group('hour')), int(match.group('minute'))
+                if (month, int(match.group('day'))) > (now.tm_mon, now.tm_mday):
+                    year -= 1
+            try:
+                mtime = calendar.timegm((year, month, int(match.group('day')), hour, minute, 0))
+            except (ValueError, OverflowError):
+                mtime = None
+        return name, match.group('mode') == 'd', int(match.group('size')), mtime
+
+    match = DOS_LIST_RE.match(line)
+    if match:
+        year = int(match.group('year'))
+        if year < 100:
+            year += 2000 if year < 70 else 1900
+        hour = int(match.group('hour')) % 12 if match.group('ampm') else int(match.group('hour'))
+        if (match.group('ampm') or '').upper() == 'PM':
+            hour += 12
+        try:
+            mtime = calendar.timegm((year, int(match.group('month')), int(match.group('day')), hour, int(match.group('minute')), 0))
+        except (ValueError, OverflowError):
+            mtime = None
+        is_dir = match.group('size').upper() == '<DIR>'
+        return match.group('name'), is_dir, None if is_dir else int(match.group('size')), mtime
+
+    return None
+
+def server_bandwidth_limiter(server_info):
+    """Sunucuya ait, o sunucudaki tüm işlerin paylaştığı sınırlayıcıyı döndür"""
+    key = server_state_key(server_info)
+    with BandwidthLimiter.registry_lock:
+        if key not in SERVER_BANDWIDTH_LIMITERS:
+            SERVER_BANDWIDTH_LIMITERS[key] = BandwidthLimiter()
+        return SERVER_BANDWIDTH_LIMITERS[key]
+
+def format_size(num_bytes):
+    """Byte değerini okunabilir birime çevir"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.2f} TB"
 
 class BackupManager:
     def __init__(self, progress_callback=None, log_callback=None):
@@ -18,6 +287,28 @@ class BackupManager:
         self.log_callback = log_callback
         self.is_running = False
         self.current_operation = ""
+        # Artımlı yedeklemede karşılaştırma yapılan önceki manifest ve
+        # bu çalışmada başarıyla yedeklenen dosyaların kayıtları
+        self.previous_manifest = None
+        self.manifest_files = {}
+        # İndirilirken özeti hesaplanan dosyaların özetleri (uzak yol -> özet);
+        # her anahtara yalnızca o dosyayı işleyen iş parçacığı dokunur
+        self.inline_digests = {}
+        # Artımlı yedeklemede değişmeyen dosyaların alındığı önceki arşivin dizini
+        self._previous_archive = None
+        self._previous_archive_lock = threading.Lock()
+        # Yarıda kalan işlerin sürdürülmesi için iş günlüğü ve okunan önceki durumu
+        self.job_journal = None
+        self.resume_state = None
+        # Çalışan aktarım hattının bağlantı sayısını yöneten denetleyici
+        self.concurrency = None
+        # Yedeklenen sunucunun bant genişliği sınırlayıcısı
+        self.bandwidth = None
+        # Dosyalar ara klasör yerine doğrudan yazılacaksa açık ZIP arşivi
+        self.archive_stream = None
+        # Bu çalışmadaki yeniden deneme ve kalıcı olarak alınamayan öğe sayıları
+        self.transfer_stats = {'retries': 0, 'failed': 0}
+        self._transfer_stats_lock = threading.Lock()
     
     def _log(self, message):
         """Log mesajını callback fonksiyonu ile ilet"""
@@ -26,6 +317,30 @@ class BackupManager:
                 self.log_callback(message)
             except Exception as e:
                 print(f"Log hatası: {e}")
+
+    def _report_bytes(self, byte_count):
+        """Aktarılan bayt miktarını verim ölçümüne ve arayüze bildir
+
+        Sunucu ve genel bant genişliği sınırı varsa kota dolana kadar çağıran
+        işçi bekletilir; okuma durduğu için sunucu da gönderimi yavaşlatır.
+        """
+        if self.concurrency:
+            self.concurrency.add_bytes(byte_count)
+        if hasattr(self, 'byte_progress_callback') and self.byte_progress_callback:
+            self.byte_progress_callback(byte_count)
+        stopped = lambda: not self.is_running
+        if self.bandwidth:
+            self.bandwidth.consume(byte_count, stopped)
+        GLOBAL_BANDWIDTH_LIMITER.consume(byte_count, stopped)
+
+    def _bandwidth_limited(self):
+        """Aktarımlara şu anda bir hız sınırı uygulanıyor mu"""
+        return bool(GLOBAL_BANDWIDTH_LIMITER.rate or (self.bandwidth and self.bandwidth.rate))
+
+    def set_bandwidth_limit(self, kb_per_sec):
+        """Yedeklenen sunucunun hız sınırını çalışma sırasında değiştir (KB/s, 0 = sınırsız)"""
+        if self.bandwidth:
+            self.bandwidth.set_rate(kb_per_sec * 1024)
     
     def _progress(self, value, max_value):
         """İlerleme durumunu callback fonksiyonu ile ilet"""
@@ -47,6 +362,7 @@ class BackupManager:
         try:
             self._log("🚀 Yedekleme işlemi başlatılıyor...")
             self._progress(5, 100)
+            self.transfer_stats = {'retries': 0, 'failed': 0}
             
             # Bağlantıyı test et
             self._log("🔗 Sunucuya bağlanılıyor...")
@@ -71,22 +387,23 @@ class BackupManager:
             else:
                 self._perform_sftp_backup(conn, server_info, backup_config)
             
-            # Bağlantıyı kapat
+            # Bağlantıyı kapat (yeniden bağlanılmışsa bu oturum kopmuş olabilir)
             if server_info['protocol'] == 'ftp':
-                conn.quit()
+                self._close_ftp(conn)
             else:
-                conn.close()
+                self._close_sftp(conn)
             
             if self.is_running:
-                self._log("✅ Yedekleme başarıyla tamamlandı!")
                 self._progress(100, 100)
+                status = self._completion_status()
                 if hasattr(self, 'on_complete_callback'):
-                    self.on_complete_callback("Tamamlandı")
+                    self.on_complete_callback(status)
             
         except Exception as e:
             self._log(f"❌ Beklenmeyen hata: {str(e)}")
             self._progress(0, 100)
-            if hasattr(self, 'on_complete_callback'):
+            # Kullanıcı durdurduysa stop_backup "Durduruldu" olarak zaten bildirdi
+            if self.is_running and hasattr(self, 'on_complete_callback'):
                 self.on_complete_callback("Başarısız")
         finally:
             self.is_running = False
@@ -113,32 +430,97 @@ class BackupManager:
                 password=server_info['password'],
                 timeout=30
             )
-            sftp = ssh.open_sftp()
+            transport = ssh.get_transport()
+            tuning = self._sftp_tuning(transport, server_info)
+            sftp = paramiko.SFTPClient.from_transport(
+                transport, window_size=tuning['window_size'], max_packet_size=tuning['packet_size']
+            )
+            sftp.tuning = tuning
             return True, sftp
         except Exception as e:
             return False, str(e)
     
+    def _sftp_tuning(self, transport, server_info):
+        """SFTP aktarım ayarlarını sunucu kaydından al, verilmeyenleri RTT'ye göre belirle
+
+        Sunucu kaydındaki 'read_ahead' (eşzamanlı okuma isteği), 'request_size'
+        (tek isteğin boyutu), 'window_size' (SSH kanal penceresi) ve
+        'buffer_size' (okuma/yazma bloğu) değerleri kullanılır. Boş ya da
+        sayısal olmayan alanlar, ölçülen gidiş-dönüş süresiyle hesaplanan
+        bant genişliği-gecikme çarpımından türetilir.
+        """
+        def configured(key):
+            try:
+                value = int(server_info.get(key) or 0)
+            except (TypeError, ValueError):
+                return None
+            return value if value > 0 else None
+
+        tuning = {key: configured(key) for key in ('read_ahead', 'request_size', 'window_size', 'buffer_size')}
+        tuning['request_size'] = tuning['request_size'] or SFTP_READ_CHUNK
+
+        rtt = None
+        if None in tuning.values():
+            rtt = self._measure_rtt(transport)
+            bdp = SFTP_TUNING_BANDWIDTH * rtt
+            if tuning['read_ahead'] is None:
+                tuning['read_ahead'] = int(min(SFTP_MAX_READ_AHEAD, max(SFTP_MIN_READ_AHEAD, 2 * bdp // tuning['request_size'])))
+            if tuning['window_size'] is None:
+                # Pencere, yolda olan tüm okuma yanıtlarını karşılayabilmeli
+                tuning['window_size'] = int(min(SFTP_MAX_WINDOW, max(SFTP_MIN_WINDOW, 2 * tuning['read_ahead'] * tuning['request_size'])))
+            if tuning['buffer_size'] is None:
+                tuning['buffer_size'] = int(min(SFTP_MAX_BUFFER, max(SFTP_MIN_BUFFER, bdp // 4)))
+
+        # Bir okuma yanıtı tek SSH paketine sığmalı
+        tuning['packet_size'] = max(paramiko.common.DEFAULT_MAX_PACKET_SIZE, tuning['request_size'] + 1024)
+
+        self._log(
+            "⚙️ SFTP ayarları" + (f" (RTT {rtt * 1000:.0f} ms)" if rtt is not None else "") +
+            f": {tuning['read_ahead']} × {format_size(tuning['request_size'])} okuma önü, "
+            f"pencere {format_size(tuning['window_size'])}, tampon {format_size(tuning['buffer_size'])}"
+        )
+        return tuning
+
+    def _measure_rtt(self, transport, samples=3):
+        """SSH oturumunun gidiş-dönüş süresini (sn) ölç
+
+        Yanıtı beklenen bir global istek gönderilir; sunucu tanımadığı isteğe
+        de ret yanıtı verdiği için (OpenSSH keepalive yöntemi) her sunucuda çalışır.
+        """
+        best = None
+        for _ in range(samples):
+            started = time.perf_counter()
+            transport.global_request('keepalive@openssh.com', wait=True)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
     def _perform_ftp_backup(self, ftp, server_info, backup_config):
         """FTP yedekleme işlemini gerçekleştir"""
         try:
-            # Yedekleme dizinini oluştur
-            backup_path = self._create_backup_path(backup_config['target_path'])
+            # Yedekleme dizinini oluştur (yarım kalan iş varsa onun dizinini kullan)
+            backup_path = self._prepare_files_path(backup_config['target_path'])
 
-            # Dosya ve klasörleri recursive olarak yedekle
-            self._log("📁 Dosya ve klasörler taranıyor...")
+            # Dosya ve klasörleri taranırken eşzamanlı olarak indir
+            self._log("📁 Dosya ve klasörler taranıyor ve indiriliyor...")
             self._progress(25, 100)
             
-            # Tüm dosya ve klasörleri listele
-            all_items = self._ftp_list_recursive(ftp, "")
-            
-            if not all_items:
-                self._log("ℹ️ Sunucuda dosya/klasör bulunamadı")
-                return
+            # Yapılandırılmış listeleme (MLSD) destekleniyor mu?
+            self.ftp_use_mlsd = self._ftp_supports_mlsd(ftp)
+            self._log("ℹ️ Listeleme yöntemi: " + ("MLSD" if self.ftp_use_mlsd else "LIST"))
 
-            self._log(f"📊 {len(all_items)} öğe bulundu. İndirme işlemi başlıyor...")
-            self._download_items_ftp(ftp, all_items, backup_path, backup_config.get('filter', '*.*'))
+            self._run_backup_pipeline(
+                ftp, "", backup_path, server_info, self._compile_filter(backup_config),
+                list_dir=self._ftp_list_dir,
+                connect=self._connect_ftp,
+                close=self._close_ftp,
+                fetch=self._ftp_fetch_file,
+                fetch_range=self._ftp_fetch_range,
+                fast_rescan=backup_config.get('fast_rescan', False)
+            )
 
             self._progress(90, 100)
+            return backup_path
 
         except Exception as e:
             raise Exception(f"FTP yedekleme hatası: {str(e)}")
@@ -146,263 +528,1271 @@ class BackupManager:
     def _perform_sftp_backup(self, sftp, server_info, backup_config):
         """SFTP yedekleme işlemini gerçekleştir"""
         try:
-            # Yedekleme dizinini oluştur
-            backup_path = self._create_backup_path(backup_config['target_path'])
+            # Yedekleme dizinini oluştur (yarım kalan iş varsa onun dizinini kullan)
+            backup_path = self._prepare_files_path(backup_config['target_path'])
 
-            # Dosya ve klasörleri recursive olarak yedekle
+            # Dosya ve klasörleri taranırken eşzamanlı olarak indir
             self._log("📁 Dosya ve klasörler taranıyor ve indiriliyor...")
             self._progress(25, 100)
             
-            # Tüm dosya ve klasörleri listele
-            all_items = self._sftp_list_recursive(sftp, ".")
-            
-            if not all_items:
-                self._log("ℹ️ Sunucuda dosya/klasör bulunamadı")
-                return
+            file_filter = self._compile_filter(backup_config)
+            if self._use_remote_tar(server_info) and self._sftp_tar_backup(sftp, ".", backup_path, file_filter):
+                self._progress(90, 100)
+                return backup_path
 
-            self._log(f"📊 {len(all_items)} öğe bulundu. İndirme işlemi başlıyor...")
-            self._download_items_sftp(sftp, all_items, backup_path, backup_config.get('filter', '*.*'))
+            connect, close = self._sftp_worker_factory(sftp)
+            self._run_backup_pipeline(
+                sftp, ".", backup_path, server_info, file_filter,
+                list_dir=self._sftp_list_dir,
+                connect=connect,
+                close=close,
+                fetch=self._sftp_fetch_file,
+                fetch_range=self._sftp_fetch_range,
+                fast_rescan=backup_config.get('fast_rescan', False)
+            )
 
             self._progress(90, 100)
+            return backup_path
             
         except Exception as e:
             raise Exception(f"SFTP yedekleme hatası: {str(e)}")
     
-    def _ftp_list_recursive(self, ftp, path):
-        """FTP'de recursive dosya listesi al"""
-        items = []
-        self._log(f"🔎 Taranıyor: {path if path else '/'}")
+    def preview_changes(self, server_info, backup_config):
+        """Uzak ağacı indirmeden tarayıp son yedekten bu yana değişenleri raporla
+
+        Son taramadan hesaplanan boyut tahmini bağlantı kurulmadan hemen
+        loglanır. Tarama tek bağlantıyla yapılır ve kayıtlı tarama
+        güncellenmez, karşılaştırma bir sonraki yedeğe kadar son yedeğe göre
+        kalır. (başarılı_mı, mesaj) döndürür.
+        """
+        file_filter = self._compile_filter(backup_config)
+        tree_cache = TreeCache(server_info)
+        has_previous_tree = tree_cache.load()
+        if has_previous_tree:
+            items, files, size = tree_cache.summary(file_filter)
+            self._log(f"📐 Son taramaya ({tree_cache.created}) göre: {items} öğe ({files} dosya, {format_size(size)})")
+        else:
+            self._log("ℹ️ Bu sunucu için kayıtlı tarama yok, yalnızca güncel toplamlar raporlanacak")
+
+        self.is_running = True
         try:
-            # Geçerli dizindeki öğeleri listele
-            lines = []
-            ftp.retrlines(f'LIST {path}', lines.append)
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) < 9:
-                    continue
-                
-                # İzinleri ve ismi al
-                permissions = parts[0]
-                name = ' '.join(parts[8:])
-                
-                if name in ['.', '..']:
-                    continue
-                
-                full_path = os.path.join(path, name).replace('\\', '/')
-                
-                # Klasör mü dosya mı kontrol et
-                if permissions.startswith('d'):
-                    # Klasör
-                    items.append((full_path, True))
-                    # Recursive olarak alt klasörleri listele
-                    items.extend(self._ftp_list_recursive(ftp, full_path))
-                else:
-                    # Dosya
-                    items.append((full_path, False))
-                    
+            if server_info['protocol'] == 'ftp':
+                success, conn = self._connect_ftp(server_info)
+                root, list_dir, connect, close, close_main = "", self._ftp_list_dir, self._connect_ftp, self._close_ftp, self._close_ftp
+            else:
+                success, conn = self._connect_sftp(server_info)
+                root, list_dir, close_main = ".", self._sftp_list_dir, self._close_sftp
+            if not success:
+                return False, f"Bağlantı hatası: {conn}"
+            if server_info['protocol'] == 'ftp':
+                self.ftp_use_mlsd = self._ftp_supports_mlsd(conn)
+            else:
+                connect, close = self._sftp_worker_factory(conn)
+
+            has_previous_tree = has_previous_tree and tree_cache.root == root
+            fast_rescan = has_previous_tree and backup_config.get('fast_rescan', False)
+            tree_cache.root = root
+            session = {'conn': conn, 'owned': False}
+            dir_mtimes = {}
+            pending = [root]
+            try:
+                self._log("🔎 Uzak ağaç taranıyor (dosya indirilmeyecek)...")
+                while pending and self.is_running:
+                    path = pending.pop()
+                    entries = tree_cache.lookup(path, dir_mtimes.get(path)) if fast_rescan else None
+                    if entries is None:
+                        entries = self._run_with_retry(
+                            lambda worker_conn: list_dir(worker_conn, path),
+                            session, f"{path if path else '/'} listesi", server_info, connect, close
+                        )
+                    tree_cache.record(path, dir_mtimes.get(path), entries)
+                    for entry in self._filter_items(entries, file_filter):
+                        if entry['is_dir']:
+                            dir_mtimes[entry['path']] = entry['mtime']
+                            pending.append(entry['path'])
+            finally:
+                if session['owned']:
+                    close(session['conn'])
+                close_main(conn)
+
+            if not self.is_running:
+                return False, "Önizleme durduruldu"
+            current = tree_cache.files(file_filter, current=True)
+            sizes = [item['size'] or 0 for item in current if not item['is_dir']]
+            self._log(f"📊 Sunucudaki güncel durum: {len(current)} öğe ({len(sizes)} dosya, {format_size(sum(sizes))})")
+            if has_previous_tree:
+                self._log_tree_changes(*tree_cache.changes(file_filter))
+            return True, "Değişiklik önizlemesi tamamlandı"
         except Exception as e:
-            self._log(f"⚠️ Liste alınırken hata: {str(e)}")
-        
-        return items
-    
-    def _sftp_list_recursive(self, sftp, path):
-        """SFTP'de recursive dosya listesi al"""
-        items = []
-        self._log(f"🔎 Taranıyor: {path if path else '/'}")
+            self._log(f"❌ Önizleme hatası: {str(e)}")
+            return False, str(e)
+        finally:
+            self.is_running = False
+
+    def _ftp_supports_mlsd(self, ftp):
+        """Sunucunun FEAT yanıtında MLST/MLSD desteği olup olmadığını kontrol et"""
         try:
-            for item in sftp.listdir(path):
-                full_path = os.path.join(path, item).replace('\\', '/')
-                
-                try:
-                    # Öğenin türünü kontrol et
-                    stat = sftp.stat(full_path)
-                    
-                    if stat.st_mode & 0o40000:  # Klasör
-                        items.append((full_path, True))
-                        # Recursive olarak alt klasörleri listele
-                        items.extend(self._sftp_list_recursive(sftp, full_path))
-                    else:  # Dosya
-                        items.append((full_path, False))
-                        
-                except Exception:
-                    # Erişim hatası olabilir, devam et
+            response = ftp.sendcmd('FEAT')
+        except ftplib.all_errors:
+            return False
+        return any(line.strip().upper().startswith('MLST') for line in response.splitlines()[1:])
+
+    def _ftp_list_dir(self, ftp, path):
+        """Tek bir FTP dizininin içeriğini öğe kayıtları olarak döndür
+
+        MLSD destekleniyorsa tür, boyut ve değişiklik zamanı makine tarafından
+        okunabilir biçimde alınır; desteklenmiyorsa LIST çıktısı ayrıştırılır.
+        """
+        items = []
+        if getattr(self, 'ftp_use_mlsd', False):
+            for name, facts in ftp.mlsd(path):
+                entry_type = facts.get('type', '').lower()
+                if entry_type in ('cdir', 'pdir') or name in ('.', '..'):
                     continue
-                    
-        except Exception as e:
-            self._log(f"⚠️ Liste alınırken hata: {str(e)}")
-        
+                full_path = os.path.join(path, name).replace('\\', '/')
+                size = facts.get('size')
+                items.append(make_item(
+                    full_path,
+                    entry_type == 'dir',
+                    int(size) if size and size.isdigit() else None,
+                    parse_mlsd_time(facts.get('modify'))
+                ))
+            return items
+
+        lines = []
+        ftp.retrlines(f'LIST {path}', lines.append)
+        for line in lines:
+            parsed = parse_list_line(line)
+            if not parsed:
+                continue
+            name, is_dir, size, mtime = parsed
+            if name in ['.', '..']:
+                continue
+            full_path = os.path.join(path, name).replace('\\', '/')
+            items.append(make_item(full_path, is_dir, size, mtime))
         return items
-    
-    def _download_items_ftp(self, ftp, items, backup_path, file_filter):
-        """FTP'den öğeleri indirir."""
-        filtered_items = self._filter_items(items, file_filter)
-        total_items = len(filtered_items)
-        downloaded_count = 0
 
-        self._log(f"⬇️ {total_items} öğe indirilecek...")
+    def _use_remote_tar(self, server_info):
+        """Bu yedeklemede uzak tar akışı denenmeli mi"""
+        if str(server_info.get('remote_tar', '')).strip().lower() not in TRUE_VALUES:
+            return False
+        # Sürdürme ve artımlı yedekleme dosya bazında karar verir, tek akışla yapılamaz
+        if self.resume_state or self.previous_manifest:
+            self._log("ℹ️ Sürdürülen/artımlı yedeklemede uzak tar kullanılmaz, dosya dosya indirilecek")
+            return False
+        return True
 
-        for i, (item_path, is_dir) in enumerate(filtered_items):
+    def _sftp_tar_backup(self, sftp, root, backup_path, file_filter):
+        """Sunucuda tar çalıştırıp sıkıştırılmış akışı doğrudan yedek klasörüne aç
+
+        Komut mevcut SSH oturumunda ayrı bir kanalda çalışır. Hariç tutma
+        globları tar'a --exclude olarak verilir (sonu '/' ile biten kurallar
+        aynı adlı dosyaları da dışarıda bırakır); dahil etme, boyut ve yaş
+        kuralları öğeler açılırken uygulanır. Sembolik bağlantılar ve özel
+        dosyalar atlanır. Sunucu komut çalıştırmaya izin vermezse ya da akış
+        yarıda kesilirse False döner ve dosya dosya SFTP ile devam edilir;
+        akıştan tamamlanan dosyalar (yerelde ya da arşivde) sürdürülen iş gibi
+        atlanır, böylece yeniden indirilmez ve arşive ikinci kez yazılmaz.
+        """
+        excludes = ' '.join(f"--exclude={shlex.quote(glob.strip('/'))}" for glob in file_filter.exclude_globs
+                            if not glob.startswith('/'))
+        command = REMOTE_TAR_COMMAND.format(root=shlex.quote(root), excludes=excludes)
+        transport = sftp.get_channel().get_transport()
+        try:
+            channel = transport.open_session()
+            channel.exec_command(command)
+        except (paramiko.ChannelException, paramiko.SSHException) as e:
+            self._log(f"ℹ️ Sunucu komut çalıştırmaya izin vermiyor ({str(e)}), dosya dosya indirilecek")
+            return False
+
+        self._log(f"📦 Uzak tar akışı başlatıldı: {command}")
+        counts = {'files': 0, 'dirs': 0, 'bytes': 0, 'skipped': 0}
+        # Yerel filtreyle dışarıda bırakılan klasörler; altındaki öğeler de atlanır
+        pruned = set()
+        try:
+            with tarfile.open(fileobj=channel.makefile('rb'), mode='r|gz') as archive:
+                for member in archive:
+                    if not self.is_running:
+                        break
+                    self._extract_tar_member(archive, member, root, backup_path, file_filter, counts, pruned)
             if not self.is_running:
-                break
-            
+                # Okuma bırakıldığında tar yazarken bekler; kanal kapatılarak sonlandırılır
+                return True
+            exit_status = channel.recv_exit_status()
+            stderr = channel.makefile_stderr('rb').read().decode('utf-8', 'replace').strip() if exit_status else ''
+        except (tarfile.TarError, EOFError, OSError, paramiko.SSHException) as e:
+            error = str(e)
+            if channel.exit_status_ready() and channel.recv_exit_status():
+                error = channel.makefile_stderr('rb').read().decode('utf-8', 'replace').strip() or error
+            self._log(f"ℹ️ Uzak tar akışı kullanılamadı ({error}), dosya dosya indirilecek")
+            if self.manifest_files:
+                # Manifestte yalnızca akıştan tamamlanan dosyalar var; yarım kalan girdi atılmıştır
+                self.resume_state = {'listings': {}, 'done': dict(self.manifest_files)}
+                self._log(f"⏯️ Akıştan tamamlanan {len(self.manifest_files)} dosya yeniden indirilmeyecek")
+            return False
+        finally:
+            channel.close()
+
+        if exit_status:
+            # tar 1 ile okuma sırasında değişen dosyaları bildirir, akış yine de tamdır
+            self._log(f"⚠️ Uzak tar uyarıyla bitti ({exit_status}): {stderr[-500:]}")
+            if exit_status > 1:
+                if not counts['files'] and not counts['dirs']:
+                    self._log("ℹ️ Uzak tar akışından öğe gelmedi, dosya dosya indirilecek")
+                    return False
+                self._count_transfer('failed')
+
+        summary = f"📊 Uzak tar: {counts['files']} dosya, {counts['dirs']} klasör ({format_size(counts['bytes'])})"
+        if counts['skipped']:
+            summary += f", {counts['skipped']} öğe atlandı"
+        self._log(summary)
+        return True
+
+    def _extract_tar_member(self, archive, member, root, backup_path, file_filter, counts, pruned):
+        """Tar akışındaki tek bir öğeyi filtreleyip yedek klasörüne yaz"""
+        name = member.name[2:] if member.name.startswith('./') else member.name
+        name = name.strip('/')
+        parts = name.split('/')
+        if not name or name == '.' or '..' in parts:
+            return
+        if any('/'.join(parts[:depth]) in pruned for depth in range(1, len(parts))):
+            return
+        item = make_item(f"{root}/{name}", member.isdir(), None if member.isdir() else member.size, member.mtime)
+        if not (member.isdir() or member.isfile()) or not file_filter.accepts(item):
+            if member.isdir():
+                pruned.add(name)
+            counts['skipped'] += 1
+            return
+
+        local_path = os.path.join(backup_path, *parts)
+        if member.isdir():
+            self._create_local_dir(local_path)
+            counts['dirs'] += 1
+            return
+
+        source = archive.extractfile(member)
+        with self._local_output(item, local_path) as local_file:
+            while True:
+                data = source.read(HASH_CHUNK)
+                if not data:
+                    break
+                local_file.write(data)
+                self._report_bytes(len(data))
+
+        entry = [member.size, member.mtime, self.inline_digests.pop(item['path'], None)]
+        self.manifest_files[item['path']] = entry
+        if self.job_journal:
+            self.job_journal.record('done', path=item['path'], entry=entry)
+        counts['files'] += 1
+        counts['bytes'] += member.size
+        if hasattr(self, 'file_progress_callback') and self.file_progress_callback:
+            self.file_progress_callback(counts['files'], counts['files'])
+
+    def _sftp_list_dir(self, sftp, path):
+        """Tek bir SFTP dizininin içeriğini öğe kayıtları olarak döndür
+
+        Öğe türü, boyutu ve değişiklik zamanı dizin başına tek bir
+        `listdir_attr` isteğiyle alınır; yalnızca sembolik bağlantılar için
+        hedefi öğrenmek üzere ayrıca `stat` yapılır.
+        """
+        items = []
+        for attr in sftp.listdir_attr(path):
+            full_path = os.path.join(path, attr.filename).replace('\\', '/')
             try:
-                local_path = os.path.join(backup_path, item_path)
-                
-                if is_dir:
-                    os.makedirs(local_path, exist_ok=True)
-                    self._log(f"📁 Klasör oluşturuldu: {item_path}")
-                else:
-                    local_dir = os.path.dirname(local_path)
-                    os.makedirs(local_dir, exist_ok=True)
-                    
-                    def ftp_callback(data):
-                        local_file.write(data)
-                        if hasattr(self, 'byte_progress_callback') and self.byte_progress_callback:
-                            self.byte_progress_callback(len(data))
-
-                    self._log(f"📥 İndiriliyor: {item_path}")
-                    with open(local_path, 'wb') as local_file:
-                        ftp.retrbinary(f'RETR {item_path}', ftp_callback)
-                
-                downloaded_count += 1
+                if attr.st_mode is not None and stat.S_ISLNK(attr.st_mode):
+                    # Bağlantının gösterdiği öğenin özniteliklerini al
+                    attr = sftp.stat(full_path)
+            except Exception:
+                # Kırık bağlantı veya erişim hatası olabilir, devam et
+                continue
 
-                if hasattr(self, 'file_progress_callback') and self.file_progress_callback:
-                    self.file_progress_callback(downloaded_count, total_items)
-                
-                progress = 25 + (i / total_items) * 65
-                self._progress(int(progress), 100)
-                
+            if attr.st_mode is not None and stat.S_ISDIR(attr.st_mode):  # Klasör
+                items.append(make_item(full_path, True, mtime=attr.st_mtime))
+            else:  # Dosya
+                items.append(make_item(full_path, False, attr.st_size, attr.st_mtime))
+        return items
+
+    def _run_backup_pipeline(self, conn, root, backup_path, server_info, file_filter, list_dir, connect, close, fetch,
+                             fetch_range=None, fast_rescan=False):
+        """Taramayı ve indirmeyi üretici/tüketici hattı olarak birlikte yürüt
+
+        Tarayıcı işçiler dizinleri kuyruk tabanlı, genişlik öncelikli listeler
+        ve filtreden geçen dosyaları sınırlı bir kuyruğa koyar; indirme
+        işçileri ilk dosya bulunur bulunmaz çekmeye başlar. Kuyruk dolduğunda
+        tarama bekler, böylece bellek kullanımı ağacın büyüklüğünden bağımsız
+        kalır. Tarama bitince tarayıcıların bağlantıları da indirmeye katılır,
+        toplam oturum sayısı sunucu kaydındaki 'connections' değerini aşmaz.
+        İlk tarayıcı mevcut bağlantıyı kullanır, diğer işçiler `connect` ile
+        kendi oturumlarını açar ve iş bitince `close` ile kapatır. `fetch_range`
+        verilmişse SEGMENT_THRESHOLD üzerindeki dosyalar parçalı indirilir.
+        Başlangıçtaki bağlantı sayısı ve sonrasında eklenen/bırakılan indirme
+        işçileri ConcurrencyController tarafından belirlenir. Sunucunun önceki
+        taraması (TreeCache) toplamları ön boyutlandırır; `fast_rescan` açıksa
+        mtime'ı değişmemiş dizinler yeniden listelenmez. Bu, dizin mtime'ını
+        değiştirmeyen yerinde dosya değişikliklerini kaçırabilir.
+        """
+        controller = ConcurrencyController(
+            server_info, self._get_connection_count(server_info), self._get_max_connections(server_info), self.log_callback
+        )
+        self.concurrency = controller
+        self.bandwidth = server_bandwidth_limiter(server_info)
+        self.bandwidth.set_rate(self._get_bandwidth_limit(server_info) * 1024)
+        if self._bandwidth_limited():
+            self._log(f"🐢 Bant genişliği sınırı: sunucu {self._format_rate(self.bandwidth.rate)}, "
+                      f"genel {self._format_rate(GLOBAL_BANDWIDTH_LIMITER.rate)}")
+        connection_count = controller.limit
+        scanner_count = min(MAX_SCAN_CONNECTIONS, max(1, connection_count // 2))
+        downloader_count = connection_count - scanner_count
+
+        # Tek bağlantıda indirme ancak tarama bitince başlayabilir, kuyruk sınırsız olmalı
+        file_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE if downloader_count else 0)
+        dir_queue = queue.Queue()
+        dir_queue.put(root)
+        walk_done = threading.Event()
+
+        lock = threading.Lock()
+        # İndirilemeyen dosyaların yarım .part dosyaları; iş durdurulursa sürdürmek için korunur
+        failed_parts = []
+        stats = {
+            'pending_dirs': 1, 'discovered': 0, 'files': 0, 'bytes': 0, 'unknown_sizes': 0,
+            'processed': 0, 'downloaded': 0, 'progress': 25, 'reused': 0, 'reused_bytes': 0,
+            'resumed': 0, 'resumed_bytes': 0, 'pruned': 0, 'cached_dirs': 0, 'list_failed': 0,
+            'expected_items': 0, 'expected_bytes': 0,
+            'downloaders': 0, 'next_report': SCAN_REPORT_INTERVAL
+        }
+
+        # Önceki tarama varsa toplamlar tarama bitmeden ondan tahmin edilir
+        tree_cache = TreeCache(server_info)
+        has_previous_tree = tree_cache.load() and tree_cache.root == root
+        if has_previous_tree:
+            stats['expected_items'], expected_files, stats['expected_bytes'] = tree_cache.summary(file_filter)
+            self._log(f"📐 Önceki taramaya ({tree_cache.created}) göre tahmini: {stats['expected_items']} öğe "
+                      f"({expected_files} dosya, {format_size(stats['expected_bytes'])})")
+        else:
+            tree_cache.root, tree_cache.dirs = root, {}
+            fast_rescan = False
+        # Dizinlerin üst dizin listesinde görülen mtime değerleri
+        dir_mtimes = {}
+
+        self._log(f"⬇️ {scanner_count} tarama ve {downloader_count} indirme bağlantısı kullanılacak...")
+
+        def report_total_bytes():
+            if hasattr(self, 'total_bytes_callback') and self.total_bytes_callback:
+                # Tarama sürerken önceki taramanın toplamı daha iyi bir tahmindir
+                total = stats['bytes'] if walk_done.is_set() else max(stats['bytes'], stats['expected_bytes'])
+                # Önceki yedekten alınan ve önceki çalışmada tamamlanan dosyalar ağdan aktarılmaz
+                self.total_bytes_callback(total - stats['reused_bytes'] - stats['resumed_bytes'])
+
+        def item_done(ok):
+            with lock:
+                stats['processed'] += 1
+                if ok:
+                    stats['downloaded'] += 1
+                downloaded = stats['downloaded']
+                total_items = stats['discovered'] if walk_done.is_set() else max(stats['discovered'], stats['expected_items'])
+                # Toplam tarama sürdükçe büyür; çubuğun geri gitmemesi için en yüksek değer tutulur
+                stats['progress'] = max(stats['progress'], int(25 + (stats['processed'] / total_items) * 65))
+                progress = stats['progress']
+
+            if ok and hasattr(self, 'file_progress_callback') and self.file_progress_callback:
+                self.file_progress_callback(downloaded, total_items)
+            self._progress(progress, 100)
+
+        def download_one(session, item):
+            ok = False
+            local_path = os.path.join(backup_path, item['path'].lstrip('/\\'))
+            try:
+                if not self.archive_stream:
+                    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                # Önceki yedekten alınan dosyanın içerik özeti değişmemiştir
+                digest = None
+                finished_entry = self._finished_in_previous_run(item, local_path)
+                previous_entry = None if finished_entry else self._reuse_unchanged_file(item, local_path)
+                if finished_entry:
+                    digest = finished_entry[2]
+                    with lock:
+                        stats['resumed'] += 1
+                        stats['resumed_bytes'] += item['size'] or 0
+                elif previous_entry:
+                    digest = previous_entry[2]
+                    with lock:
+                        stats['reused'] += 1
+                        stats['reused_bytes'] += item['size']
+                elif fetch_range and not self.archive_stream and self._segment_count(item, server_info) > 1 and \
+                        self._segmented_fetch(item, local_path, server_info, connect, close, fetch_range,
+                                              controller):
+                    pass
+                else:
+                    self._log(f"📥 İndiriliyor: {item['path']}")
+                    self._run_with_retry(
+                        lambda worker_conn: fetch(worker_conn, item, local_path),
+                        session, item['path'], server_info, connect, close
+                    )
+                digest = self.inline_digests.pop(item['path'], None) or digest
+                entry = [item['size'], item['mtime'], digest]
+                with lock:
+                    self.manifest_files[item['path']] = entry
+                if self.job_journal and not finished_entry:
+                    self.job_journal.record('done', path=item['path'], entry=entry)
+                ok = True
             except Exception as e:
-                self._log(f"⚠️ {item_path} işlenemedi: {str(e)}")
-        
-        self._log(f"✅ {downloaded_count}/{total_items} öğe başarıyla işlendi.")
+                self._log(f"⚠️ {item['path']} işlenemedi: {str(e)}")
+                controller.connection_error(e)
+                self._count_transfer('failed')
+                with lock:
+                    failed_parts.append(local_path + '.part')
+            item_done(ok)
+
+        def enqueue(session, item):
+            while self.is_running:
+                try:
+                    file_queue.put(item, timeout=0.2)
+                    return
+                except queue.Full:
+                    # Hiç indirme işçisi kalmadıysa kuyruğu tarayıcı kendisi boşaltır
+                    if stats['downloaders'] == 0:
+                        try:
+                            download_one(session, file_queue.get_nowait())
+                        except queue.Empty:
+                            pass
+
+        def scan(session):
+            while self.is_running and not walk_done.is_set():
+                try:
+                    path = dir_queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
 
-    def _download_items_sftp(self, sftp, items, backup_path, file_filter):
-        """SFTP'den öğeleri indirir."""
-        filtered_items = self._filter_items(items, file_filter)
-        total_items = len(filtered_items)
-        downloaded_count = 0
+                entries = self.resume_state['listings'].get(path) if self.resume_state else None
+                if entries is None and fast_rescan:
+                    entries = tree_cache.lookup(path, dir_mtimes.get(path))
+                    if entries is not None:
+                        with lock:
+                            stats['cached_dirs'] += 1
+                if entries is None:
+                    self._log(f"🔎 Taranıyor: {path if path else '/'}")
+                    try:
+                        entries = self._run_with_retry(
+                            lambda worker_conn: list_dir(worker_conn, path),
+                            session, f"{path if path else '/'} listesi", server_info, connect, close
+                        )
+                        if self.job_journal:
+                            self.job_journal.record('listing', path=path, items=entries)
+                    except Exception as e:
+                        # Alt ağacın tamamı eksik kalır; yedek kısmen tamamlandı sayılır
+                        self._log(f"⚠️ Liste alınamadı, {path if path else '/'} yedeklenmedi: {str(e)}")
+                        self._count_transfer('failed')
+                        with lock:
+                            stats['list_failed'] += 1
+                        entries = None
+                if entries is None:
+                    entries = []
+                else:
+                    tree_cache.record(path, dir_mtimes.get(path), entries)
 
-        self._log(f"⬇️ {total_items} öğe indirilecek...")
+                # Hariç tutulan klasörler listelenmez ve yerelde oluşturulmaz
+                accepted = self._filter_items(entries, file_filter)
+                subdirs = [entry['path'] for entry in accepted if entry['is_dir']]
 
-        for i, (item_path, is_dir) in enumerate(filtered_items):
-            if not self.is_running:
+                with lock:
+                    stats['pruned'] += sum(1 for entry in entries if entry['is_dir']) - len(subdirs)
+                    stats['pending_dirs'] += len(subdirs)
+                    for entry in accepted:
+                        if entry['is_dir']:
+                            dir_mtimes[entry['path']] = entry['mtime']
+                    stats['discovered'] += len(accepted)
+                    for entry in accepted:
+                        if not entry['is_dir']:
+                            stats['files'] += 1
+                            if entry['size'] is None:
+                                stats['unknown_sizes'] += 1
+                            else:
+                                stats['bytes'] += entry['size']
+                    report = stats['discovered'] >= stats['next_report']
+                    if report:
+                        stats['next_report'] = stats['discovered'] + SCAN_REPORT_INTERVAL
+                    discovered = stats['discovered']
+
+                for subdir in subdirs:
+                    dir_queue.put(subdir)
+
+                if report:
+                    self._log(f"📋 Şu ana kadar {discovered} öğe bulundu...")
+                    if hasattr(self, 'scan_progress_callback') and self.scan_progress_callback:
+                        self.scan_progress_callback(discovered)
+                    report_total_bytes()
+
+                for entry in accepted:
+                    if entry['is_dir']:
+                        try:
+                            self._create_local_dir(os.path.join(backup_path, entry['path'].lstrip('/\\')))
+                            self._log(f"📁 Klasör oluşturuldu: {entry['path']}")
+                            item_done(True)
+                        except Exception as e:
+                            self._log(f"⚠️ {entry['path']} işlenemedi: {str(e)}")
+                            self._count_transfer('failed')
+                            item_done(False)
+                    else:
+                        enqueue(session, entry)
+
+                with lock:
+                    stats['pending_dirs'] -= 1
+                    if stats['pending_dirs'] == 0:
+                        walk_done.set()
+                if walk_done.is_set():
+                    report_total_bytes()
+
+        def download(session):
+            while self.is_running:
+                # Denetleyici sınırı düşürdüyse fazla bağlantılar kapanır
+                if controller.should_release():
+                    return False
+                try:
+                    item = file_queue.get(timeout=0.2)
+                except queue.Empty:
+                    # Tarama bittikten sonra kuyruğa yeni öğe eklenmez
+                    if walk_done.is_set() and file_queue.empty():
+                        break
+                    continue
+                download_one(session, item)
+            return True
+
+        def worker(worker_conn, is_scanner):
+            owns_conn = worker_conn is None
+            holds_slot = True
+            if owns_conn:
+                success, worker_conn = connect(server_info)
+                if not success:
+                    self._log(f"⚠️ Ek bağlantı açılamadı: {worker_conn}")
+                    controller.connection_error(worker_conn, refused=True)
+                    controller.release()
+                    if not is_scanner:
+                        with lock:
+                            stats['downloaders'] -= 1
+                    return
+            controller.connected()
+            # Bağlantı koparsa yerine açılan oturum işçiye ait olur ve işçi tarafından kapatılır
+            session = {'conn': worker_conn, 'owned': owns_conn}
+            try:
+                if is_scanner:
+                    scan(session)
+                holds_slot = download(session)
+            finally:
+                controller.disconnected(holds_slot)
+                if not is_scanner:
+                    with lock:
+                        stats['downloaders'] -= 1
+                if session['owned']:
+                    close(session['conn'])
+
+        threads = []
+
+        def spawn(worker_conn, is_scanner):
+            if not is_scanner:
+                with lock:
+                    stats['downloaders'] += 1
+            thread = threading.Thread(target=worker, args=(worker_conn, is_scanner), daemon=True)
+            threads.append(thread)
+            thread.start()
+
+        for index in range(connection_count):
+            controller.try_acquire()
+            spawn(conn if index == 0 else None, index < scanner_count)
+
+        # Ana thread işçileri beklerken verimi ölçer ve gerekirse indirme işçisi ekler
+        while True:
+            alive = [thread for thread in threads if thread.is_alive()]
+            if not alive:
                 break
-            
+            alive[0].join(CONTROLLER_INTERVAL)
+            has_work = not (walk_done.is_set() and file_queue.empty())
+            controller.evaluate(backlog=file_queue.qsize() > 0)
+            while self.is_running and has_work and controller.try_acquire():
+                spawn(None, False)
+
+        controller.save()
+        self.concurrency = None
+
+        # Yarıda kalan ya da eksik listelenen tarama sonraki karşılaştırmalarda yanlış silinmiş dosya gösterir
+        if walk_done.is_set() and self.is_running and not stats['list_failed']:
+            if has_previous_tree:
+                self._log_tree_changes(*tree_cache.changes(file_filter))
+            tree_cache.save(root)
+
+        if self.is_running:
+            for part_path in failed_parts:
+                for leftover in (part_path, part_path[:-len('.part')] + '.segments'):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+
+        if walk_done.is_set():
+            report_total_bytes()
+            if stats['discovered'] == 0:
+                self._log("ℹ️ Sunucuda dosya/klasör bulunamadı")
+                return
+            summary = f"📊 Tarama tamamlandı: {stats['discovered']} öğe ({stats['files']} dosya, {format_size(stats['bytes'])})"
+            if stats['unknown_sizes']:
+                summary += f", {stats['unknown_sizes']} dosyanın boyutu bilinmiyor"
+            if stats['pruned']:
+                summary += f", {stats['pruned']} klasör hariç tutuldu"
+            if stats['cached_dirs']:
+                summary += f", {stats['cached_dirs']} değişmeyen klasör önceki taramadan alındı"
+            self._log(summary)
+
+        if stats['resumed']:
+            self._log(f"⏯️ {stats['resumed']} dosya ({format_size(stats['resumed_bytes'])}) önceki çalışmada tamamlanmıştı")
+        if stats['reused']:
+            self._log(f"♻️ {stats['reused']} değişmemiş dosya ({format_size(stats['reused_bytes'])}) önceki yedekten alındı")
+        self._log(f"✅ {stats['downloaded']}/{stats['discovered']} öğe başarıyla işlendi.")
+
+    def _log_tree_changes(self, added, removed, changed, limit=20):
+        """Önceki taramaya göre değişen dosyaların özetini ve ilk birkaçını logla"""
+        size_of = lambda items: format_size(sum(item['size'] or 0 for item in items))
+        self._log(f"🔀 Önceki taramadan bu yana: {len(added)} yeni ({size_of(added)}), "
+                  f"{len(changed)} değişen ({size_of(changed)}), {len(removed)} silinen dosya")
+        for mark, items in (('+', added), ('~', changed), ('-', removed)):
+            for item in items[:limit]:
+                self._log(f"   {mark} {item['path']}")
+            if len(items) > limit:
+                self._log(f"   {mark} ... ve {len(items) - limit} dosya daha")
+
+    def _completion_status(self):
+        """Biten çalışmanın durumunu sayaçlara göre belirle ve özetini logla
+
+        Alınamayan öğe varsa yedek eksiktir ve "Kısmen Tamamlandı" döner.
+        """
+        retries, failed = self.transfer_stats['retries'], self.transfer_stats['failed']
+        if failed:
+            self._log(f"⚠️ Yedekleme eksik tamamlandı: {failed} öğe alınamadı ({retries} yeniden deneme)")
+            return "Kısmen Tamamlandı"
+        self._log("✅ Yedekleme başarıyla tamamlandı!" + (f" ({retries} yeniden deneme)" if retries else ""))
+        return "Tamamlandı"
+
+    def _count_transfer(self, key, amount=1):
+        """Çalışmanın yeniden deneme/başarısız öğe sayacını artır"""
+        with self._transfer_stats_lock:
+            self.transfer_stats[key] += amount
+
+    def _is_retryable(self, error):
+        """Hata yeniden denemeyle düzelebilir mi (bağlantı kopması, zaman aşımı, 4xx yanıtı)
+
+        FTP 5xx yanıtları ve dosya bulunamadı/izin yok gibi hatalar kalıcıdır.
+        """
+        if isinstance(error, ftplib.error_perm):
+            return False
+        if isinstance(error, (ftplib.error_temp, EOFError, ConnectionError, TimeoutError, paramiko.SSHException)):
+            return True
+        return bool(CONNECTION_LOST_RE.search(str(error)))
+
+    def _is_connection_lost(self, error):
+        """Hata oturumun artık kullanılamayacağını mı gösteriyor"""
+        if isinstance(error, ftplib.error_temp):
+            return str(error).startswith('421')
+        if isinstance(error, (EOFError, ConnectionError, TimeoutError, paramiko.SSHException)):
+            return True
+        return bool(CONNECTION_LOST_RE.search(str(error)))
+
+    def _wait_before_retry(self, attempt):
+        """attempt. denemeden önce üstel (rastgele kaydırılmış) süre bekle, durdurulursa hemen dön"""
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+        deadline = time.monotonic() + delay
+        while self.is_running and time.monotonic() < deadline:
+            time.sleep(min(0.2, deadline - time.monotonic()))
+
+    def _reconnect(self, session, server_info, connect, close):
+        """Kopan oturumu kapatıp yerine yenisini aç
+
+        Uzak yollar oturum açılışındaki dizine göredir; yeni oturum da aynı
+        kullanıcıyla aynı başlangıç dizininde açıldığından kaldığı yerden
+        devam edilir. Açılan oturum artık çağıran işçiye aittir.
+        """
+        if session['owned']:
             try:
-                safe_item_path = item_path.lstrip('/\\')
-                local_path = os.path.join(backup_path, safe_item_path)
-                
-                if is_dir:
-                    os.makedirs(local_path, exist_ok=True)
-                    self._log(f"📁 Klasör oluşturuldu: {item_path}")
-                else:
-                    local_dir = os.path.dirname(local_path)
-                    os.makedirs(local_dir, exist_ok=True)
-                    
-                    def sftp_callback(bytes_so_far, total_bytes):
-                        if hasattr(self, 'byte_progress_callback') and self.byte_progress_callback:
-                            self.byte_progress_callback(bytes_so_far, total_bytes, is_new_file=True)
+                close(session['conn'])
+            except Exception:
+                pass
+        success, conn = connect(server_info)
+        if not success:
+            raise ConnectionError(f"Yeniden bağlanılamadı: {conn}")
+        session['conn'] = conn
+        session['owned'] = True
+        self._log("🔌 Sunucuya yeniden bağlanıldı")
 
-                    self._log(f"📥 İndiriliyor: {item_path}")
-                    sftp.get(item_path, local_path, callback=sftp_callback)
-                
-                downloaded_count += 1
-                
-                if hasattr(self, 'file_progress_callback') and self.file_progress_callback:
-                    self.file_progress_callback(downloaded_count, total_items)
+    def _run_with_retry(self, action, session, description, server_info, connect, close):
+        """`action(conn)`'u geçici hatalarda üstel beklemeyle RETRY_ATTEMPTS kez dene
 
-                progress = 25 + (i / total_items) * 65
-                self._progress(int(progress), 100)
-                
+        Bağlantı koptuysa bir sonraki denemeden önce oturum yeniden açılır;
+        yarım kalan indirmeler .part dosyasından sürdürülür. Kalıcı hatalar ya
+        da son denemenin hatası çağırana iletilir.
+        """
+        attempt = 0
+        reconnect = False
+        while True:
+            try:
+                if reconnect:
+                    self._reconnect(session, server_info, connect, close)
+                    reconnect = False
+                return action(session['conn'])
             except Exception as e:
-                self._log(f"⚠️ {item_path} işlenemedi: {str(e)}")
-        
-        self._log(f"✅ {downloaded_count}/{total_items} öğe başarıyla işlendi.")
+                attempt += 1
+                if not self.is_running or not self._is_retryable(e) or attempt >= RETRY_ATTEMPTS:
+                    raise
+                self._count_transfer('retries')
+                if self.concurrency:
+                    self.concurrency.connection_error(e)
+                self._log(f"🔁 {description} alınamadı ({str(e)}), yeniden deneniyor ({attempt}/{RETRY_ATTEMPTS - 1})")
+                reconnect = reconnect or self._is_connection_lost(e)
+                self._wait_before_retry(attempt)
 
-    def _filter_items(self, items, file_filter):
-        """Öğeleri filtrele"""
-        if file_filter == '*.*' or not file_filter:
-            return items
-        
-        filtered = []
-        for item_path, is_dir in items:
-            if is_dir:
-                # Klasörleri her zaman dahil et
-                filtered.append((item_path, is_dir))
-            else:
-                # Dosyaları filtrele
-                filename = os.path.basename(item_path)
-                if fnmatch.fnmatch(filename, file_filter):
-                    filtered.append((item_path, is_dir))
-        
-        return filtered
-    
-    def _create_backup_path(self, base_path):
-        """Yedekleme dizinini oluştur"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = os.path.join(base_path, f"backup_{timestamp}")
-        
-        os.makedirs(backup_path, exist_ok=True)
-        self._log(f"📂 Yedekleme dizini: {backup_path}")
-        
+    def _prepare_files_path(self, base_path):
+        """Dosyaların indirileceği dizini hazırla
+
+        Sürdürülen bir işte önceki çalışmanın dizini yeniden kullanılır, yeni
+        işte oluşturulan dizin iş günlüğüne yazılır.
+        """
+        resume = self.resume_state
+        if resume and resume.get('files_root') and os.path.isdir(resume['files_root']):
+            self._log(f"⏯️ Önceki çalışmanın dizinine devam ediliyor: {resume['files_root']}")
+            return resume['files_root']
+
+        backup_path = self._create_backup_path(base_path)
+        if self.job_journal:
+            self.job_journal.record('files_root', path=backup_path)
         return backup_path
 
+    @contextmanager
+    def _local_output(self, item, local_path, offset=0):
+        """İndirilen verinin yazılacağı hedefi aç
 
-class DatabaseManager:
-    """Veritabanı yedekleme sınıfı"""
-    
-    def __init__(self, progress_callback=None, log_callback=None):
-        self.progress_callback = progress_callback
-        self.log_callback = log_callback
-    
-    def _log(self, message):
-        if self.log_callback:
-            try:
-                self.log_callback(message)
-            except:
-                pass
-    
-    def backup_mysql(self, db_config, backup_path):
-        """MySQL veritabanı yedekle"""
-        # mysqldump komutunun sistemde var olup olmadığını kontrol et
-        if not shutil.which("mysqldump"):
-            error_msg = "❌ 'mysqldump' komutu bulunamadı. Lütfen MySQL/MariaDB client araçlarının yüklü ve sistem PATH'inde olduğundan emin olun."
-            self._log(error_msg)
-            return False, error_msg
+        Normalde veri .part dosyasına (offset varsa sonuna) yazılır ve başarıyla
+        bitince asıl adına taşınır. Doğrudan arşivleme açıksa yerel dosya
+        oluşturulmaz, veri ZIP girdisine yazılır. Her iki durumda da içerik
+        özeti yazılan baytlardan hesaplanır ve `inline_digests`'e işlenir;
+        dosya ikinci kez okunmaz (yalnızca sürdürülen indirmede diskteki ilk
+        kısım bir kez okunur).
+        """
+        if self.archive_stream:
+            with self.archive_stream.entry(local_path, item['size'], item['mtime']) as target:
+                writer = HashingWriter(target)
+                yield writer
+        else:
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            part_path = local_path + '.part'
+            with open(part_path, 'ab' if offset else 'wb') as local_file:
+                writer = HashingWriter(local_file)
+                if offset:
+                    writer.update_from(part_path, offset)
+                yield writer
+            os.replace(part_path, local_path)
+
+        if item['size'] is not None and writer.size != item['size']:
+            self._log(f"⚠️ {item['path']}: yazılan boyut ({format_size(writer.size)}) listedeki boyuttan "
+                      f"({format_size(item['size'])}) farklı, dosya aktarım sırasında değişmiş olabilir")
+        self.inline_digests[item['path']] = writer.hexdigest()
+
+    def _create_local_dir(self, local_path):
+        """Uzak klasörün karşılığını yedek klasöründe ya da arşivde oluştur"""
+        if self.archive_stream:
+            self.archive_stream.add_directory(local_path)
+        else:
+            os.makedirs(local_path, exist_ok=True)
+
+    def _finished_in_previous_run(self, item, local_path):
+        """Dosya sürdürülen işin önceki çalışmasında tamamlandıysa kaydını döndür
 
+        Doğrudan arşivlemede bu durum yalnızca yarıda kesilen uzak tar
+        akışından gelir; arşive yazılmış girdi geri alınamadığından dosya
+        listedeki boyut ve zamanı değişmiş olsa da yeniden yazılmaz.
+        """
+        if not self.resume_state:
+            return None
+        entry = self.resume_state['done'].get(item['path'])
+        if entry and self.archive_stream:
+            return entry
+        if not entry or entry[0] != item['size'] or entry[1] != item['mtime'] or not os.path.isfile(local_path):
+            return None
+        if item['size'] is not None and os.path.getsize(local_path) != item['size']:
+            return None
+        return entry
+
+    def _resume_offset(self, item, part_path):
+        """Yarım kalmış .part dosyasından devam edilecek bayt konumu"""
+        if not os.path.exists(part_path):
+            return 0
+        # Parçalı indirmenin .part dosyası baştan itibaren dolu değildir
+        segment_state_path = part_path[:-len('.part')] + '.segments'
+        if os.path.exists(segment_state_path):
+            os.remove(segment_state_path)
+            return 0
+        offset = os.path.getsize(part_path)
+        if item['size'] is not None and offset > item['size']:
+            return 0
+        if offset:
+            self._log(f"⏯️ {item['path']} {format_size(offset)} sonrasından devam ediyor")
+        return offset
+
+    def _segment_count(self, item, server_info):
+        """Dosyanın kaç parçaya bölünerek indirileceği (1: parçalama yok)"""
+        if item['size'] is None or item['size'] < SEGMENT_THRESHOLD:
+            return 1
         try:
-            self._log("🗄️ MySQL veritabanı yedekleniyor...")
-            
-            # Bağlantı kur
-            conn = mysql.connector.connect(
-                host=db_config['host'],
-                port=int(db_config.get('port', 3306)),
-                user=db_config['username'],
-                password=db_config['password'],
-                database=db_config['database']
-            )
-            
-            # Yedekleme dosyası
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = os.path.join(backup_path, f"mysql_backup_{timestamp}.sql")
-            
-            # mysqldump kullanarak yedek al
-            cmd = [
-                'mysqldump',
-                f"--host={db_config['host']}",
-                f"--port={db_config.get('port', 3306)}",
-                f"--user={db_config['username']}",
-                f"--password={db_config['password']}",
-                db_config['database']
-            ]
-            
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                subprocess.run(cmd, stdout=f, check=True)
-            
-            conn.close()
-            self._log(f"✅ MySQL yedekleme tamamlandı: {backup_file}")
+            segments = max(1, int(server_info.get('segments', DEFAULT_SEGMENTS)))
+        except (TypeError, ValueError):
+            segments = DEFAULT_SEGMENTS
+        return max(1, min(segments, item['size'] // SEGMENT_MIN_SIZE))
+
+    def _segmented_fetch(self, item, local_path, server_info, connect, close, fetch_range, controller):
+        """Büyük bir dosyayı bayt aralıklarına bölüp eşzamanlı indir
+
+        Parça oturumları da ConcurrencyController'dan yer alınarak açılır;
+        çağıran işçinin oturumu kendi yerini tuttuğundan toplam oturum sayısı
+        denetleyicinin sınırını aşmaz. Boş yer yoksa False döner ve dosya
+        işçinin kendi oturumuyla tek akışla indirilir.
+        """
+        if not controller.try_acquire():
+            return False
+        # Baştan ayrılan yer ilk parça işçisine verilir, diğerleri denetleyiciden yer ister
+        reserved = [1]
+        try:
+            return self._fetch_segments(item, local_path, server_info, connect, close, fetch_range, controller,
+                                        reserved)
+        finally:
+            if reserved[0]:
+                # Parça işçisi başlamadıysa (hata ya da kalan parça yok) ayrılan yer bırakılır
+                controller.release()
+
+    def _fetch_segments(self, item, local_path, server_info, connect, close, fetch_range, controller, reserved):
+        """Dosyanın parçalarını denetleyiciden alınan yerlerde açılan oturumlarla indir
+
+        Her parça kendi oturumunda (FTP'de REST, SFTP'de ofsetli okuma ile)
+        önceden tam boyuta genişletilmiş .part dosyasındaki yerine yazılır;
+        reddedilen oturumlar ve sınır hataları denetleyiciye bildirilir.
+        Tamamlanan parçalar .segments dosyasında tutulur, böylece yarıda kalan
+        indirme yalnızca eksik parçalarla sürdürülür. Hiç parça oturumu
+        açılamazsa False döner ve dosya tek akışla indirilir.
+
+        Parçalar sırasız yazıldığından özet yazılırken hesaplanamaz; bunun
+        yerine baştan kesintisiz tamamlanan parçalar, diğer parçalar inerken
+        .part dosyasından sırayla okunup özetlenir. Böylece birleşmeden sonra
+        dosyanın tamamı yeniden okunmaz, yalnızca en son biten parçalar kalır.
+        """
+        size = item['size']
+        count = self._segment_count(item, server_info)
+        segment_size = -(-size // count)
+        part_path = local_path + '.part'
+        state_path = local_path + '.segments'
+
+        done = set()
+        if os.path.exists(part_path) and os.path.exists(state_path):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if [state['size'], state['mtime'], state['count']] == [size, item['mtime'], count]:
+                    done = set(state['done'])
+            except (OSError, ValueError, KeyError):
+                done = set()
+
+        lock = threading.Lock()
+        # Özet tüm dosyanın özeti olmalı (depo blob adları); parçalar sırayla eklenir
+        digest = HashingWriter()
+        hash_lock = threading.Lock()
+        hashed = [0]
+
+        def hash_ready():
+            with hash_lock:
+                while True:
+                    with lock:
+                        if hashed[0] not in done:
+                            return
+                    offset = hashed[0] * segment_size
+                    digest.update_from(part_path, min(segment_size, size - offset), offset)
+                    hashed[0] += 1
+
+        def save_state():
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump({'size': size, 'mtime': item['mtime'], 'count': count, 'done': sorted(done)}, f)
+
+        if done:
+            self._log(f"⏯️ {item['path']} parçalı indirmesi sürdürülüyor ({len(done)}/{count} parça hazır)")
+        else:
+            with open(part_path, 'wb') as part_file:
+                part_file.truncate(size)
+            save_state()
+
+        pending = queue.Queue()
+        for index in range(count):
+            if index not in done:
+                pending.put((index, index * segment_size, min(segment_size, size - index * segment_size)))
+
+        self._log(f"🧩 {item['path']} {count} parça halinde indiriliyor ({format_size(size)})")
+        errors = []
+        opened = [0]
+        attempts = {}
+
+        def segment_worker():
+            with lock:
+                has_slot = reserved[0] > 0
+                reserved[0] -= has_slot
+            if not has_slot and not controller.try_acquire():
+                return
+            # Yer işçi boyunca tutulur; diğer parça işçileri çıksa da kalan parçalar bu işçiyle biter
+            try:
+                while self.is_running:
+                    try:
+                        segment = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    # Kısmen okunan oturum yeniden kullanılamaz, her parça kendi oturumunu açar
+                    success, conn = connect(server_info)
+                    if not success:
+                        pending.put(segment)
+                        controller.connection_error(conn, refused=True)
+                        with lock:
+                            errors.append(str(conn))
+                        return
+                    controller.connected()
+                    with lock:
+                        opened[0] += 1
+                    index, offset, length = segment
+                    try:
+                        fetch_range(conn, item, part_path, offset, length)
+                        with lock:
+                            done.add(index)
+                            save_state()
+                    except Exception as e:
+                        pending.put(segment)
+                        controller.connection_error(e)
+                        with lock:
+                            errors.append(str(e))
+                            attempts[index] = attempts.get(index, 0) + 1
+                        if not self._is_retryable(e) or attempts[index] >= RETRY_ATTEMPTS:
+                            return
+                        self._count_transfer('retries')
+                        self._log(f"🔁 {item['path']} parça {index + 1}/{count} alınamadı ({str(e)}), yeniden deneniyor")
+                    finally:
+                        close(conn)
+                        controller.disconnected(holds_slot=False)
+                    if index in done:
+                        # Oturum kapatıldıktan sonra özetlenir, özetleme sırasında sunucuda bağlantı tutulmaz
+                        hash_ready()
+                        continue
+                    # Oturum kapatıldıktan sonra beklenir, bekleme sırasında sunucuda bağlantı tutulmaz
+                    self._wait_before_retry(attempts[index])
+            finally:
+                controller.release()
+
+        threads = [threading.Thread(target=segment_worker, daemon=True) for _ in range(count - len(done))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if len(done) < count:
+            if not opened[0] and self.is_running:
+                self._log(f"⚠️ Parça oturumu açılamadı, {item['path']} tek akışla indirilecek: {errors[-1] if errors else ''}")
+                return False
+            raise Exception(f"{count - len(done)} parça indirilemedi: {errors[-1] if errors else 'işlem durduruldu'}")
+
+        # Henüz özetlenmemiş son parçalar (sürdürülen indirmede hazır parçalar da) eklenir
+        hash_ready()
+        os.replace(part_path, local_path)
+        os.remove(state_path)
+        self.inline_digests[item['path']] = digest.hexdigest()
+        return True
+
+    def _reuse_unchanged_file(self, item, local_path):
+        """Önceki yedekte aynı boyut ve mtime ile bulunan dosyayı oradan al
+
+        Önceki yedeğin klasörü duruyorsa dosya sabit bağlantı (mümkün değilse
+        kopya) ile eklenir; klasör arşivlenip silindiyse arşiv dizinindeki
+        konumundan (parçalı arşivde ilgili parçalardan) çıkarılır.
+        Böylece artımlı yedek de tek başına geri yüklenebilir tam bir kopya olur.
+        Dosya alındıysa önceki manifest kaydını, alınamadıysa None döndürür.
+        """
+        previous = self.previous_manifest
+        if not previous or item['size'] is None or item['mtime'] is None:
+            return None
+        entry = previous['files'].get(item['path'])
+        if not entry or entry[0] != item['size'] or entry[1] != item['mtime']:
+            return None
+
+        relative_path = item['path'].lstrip('/\\')
+        if previous.get('repository') and entry[2]:
+            blob_path = DedupRepository(previous['repository']).blob_path(entry[2])
+            if os.path.isfile(blob_path):
+                self._copy_into_backup(blob_path, item, local_path)
+                return entry
+
+        if previous.get('files_root'):
+            source = os.path.join(previous['files_root'], relative_path)
+            if os.path.isfile(source):
+                if self.archive_stream:
+                    self._copy_into_backup(source, item, local_path)
+                    return entry
+                try:
+                    os.link(source, local_path)
+                except OSError:
+                    shutil.copy2(source, local_path)
+                return entry
+
+        if self._previous_archive is not None:
+            arcname = previous['zip_prefix'] + os.path.normpath(relative_path).replace(os.sep, '/')
+            # Dizin bağlantısı ve açık tutulan TAR akışı iş parçacıkları arasında paylaşılır
+            with self._previous_archive_lock:
+                try:
+                    rows = self._previous_archive.locate(arcname)
+                except KeyError:
+                    return None
+                with self._local_output(item, local_path) as target:
+                    self._previous_archive.copy(rows, target)
+            return entry
+        return None
+
+    def _copy_into_backup(self, source_path, item, local_path):
+        """Yerel bir dosyayı yedekteki yerine (klasör ya da arşiv) kopyala"""
+        with open(source_path, 'rb') as source, self._local_output(item, local_path) as target:
+            shutil.copyfileobj(source, target, HASH_CHUNK)
+
+    def _ftp_fetch_file(self, ftp, item, local_path):
+        """Tek bir dosyayı verilen FTP oturumu üzerinden indir
+
+        Dosya önce .part uzantısıyla yazılır; yarım kalmış bir .part varsa
+        REST ile kalan kısım istenir ve sonuna eklenir.
+        """
+        item_path = item['path']
+        offset = self._resume_offset(item, local_path + '.part')
+        with self._local_output(item, local_path, offset) as local_file:
+            if not (offset and offset == item['size']):
+                def ftp_callback(data):
+                    local_file.write(data)
+                    self._report_bytes(len(data))
+
+                ftp.retrbinary(f'RETR {item_path}', ftp_callback, rest=offset or None)
+
+    def _ftp_fetch_range(self, ftp, item, part_path, offset, length):
+        """Dosyanın [offset, offset+length) aralığını REST ile indirip .part içindeki yerine yaz
+
+        Aralık dosya sonundan önce bittiğinde veri bağlantısı erken kapatılır;
+        oturumun yanıt sırası bozulacağından çağıran oturumu kapatmalıdır.
+        """
+        remaining = length
+        ftp.voidcmd('TYPE I')
+        with open(part_path, 'r+b') as local_file:
+            local_file.seek(offset)
+            with ftp.transfercmd(f"RETR {item['path']}", rest=offset) as data_conn:
+                while remaining > 0:
+                    data = data_conn.recv(min(FTP_READ_CHUNK, remaining))
+                    if not data:
+                        break
+                    local_file.write(data)
+                    remaining -= len(data)
+                    self._report_bytes(len(data))
+        if remaining:
+            raise Exception(f"Parça eksik alındı ({remaining} bayt kaldı)")
+
+    def _close_ftp(self, ftp):
+        """FTP oturumunu kapat, QUIT başarısız olursa soketi kapat"""
+        try:
+            ftp.quit()
+        except Exception:
+            ftp.close()
+
+    def _get_bandwidth_limit(self, server_info):
+        """Sunucu kaydındaki hız sınırını KB/s olarak oku (0 = sınırsız)"""
+        try:
+            return max(0, int(server_info.get('bandwidth_limit') or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _format_rate(self, rate):
+        return f"{format_size(rate)}/sn" if rate else "sınırsız"
+
+    def _get_max_connections(self, server_info):
+        """Uyarlanabilir denetleyicinin çıkabileceği en yüksek bağlantı sayısını oku"""
+        try:
+            return max(1, int(server_info.get('max_connections', MAX_ADAPTIVE_CONNECTIONS)))
+        except (TypeError, ValueError):
+            return MAX_ADAPTIVE_CONNECTIONS
+
+    def _get_connection_count(self, server_info):
+        """Sunucu kaydındaki eşzamanlı bağlantı sayısını oku"""
+        try:
+            return max(1, int(server_info.get('connections', DEFAULT_CONNECTIONS)))
+        except (TypeError, ValueError):
+            return DEFAULT_CONNECTIONS
+
+    def _sftp_worker_factory(self, sftp):
+        """Ek SFTP işçileri için (bağlan, kapat) fonksiyon çiftini oluştur
+
+        İşçiler önce mevcut SSH oturumu üzerinde yeni bir SFTP kanalı açar.
+        Sunucu kanal sayısını sınırlıyorsa sonraki işçiler doğrudan ayrı SSH
+        oturumları açar.
+        """
+        shared_transport = sftp.get_channel().get_transport()
+        channel_state = {'limited': False}
+
+        def open_worker_sftp(info):
+            if not channel_state['limited']:
+                try:
+                    channel_sftp = paramiko.SFTPClient.from_transport(
+                        shared_transport, window_size=sftp.tuning['window_size'], max_packet_size=sftp.tuning['packet_size']
+                    )
+                    if channel_sftp is not None:
+                        channel_sftp.tuning = sftp.tuning
+                        return True, channel_sftp
+                except (paramiko.ChannelException, paramiko.SSHException) as e:
+                    self._log(f"ℹ️ Sunucu ek SFTP kanalı açmaya izin vermiyor ({str(e)}), ayrı SSH oturumları kullanılacak")
+                channel_state['limited'] = True
+            return self._connect_sftp(info)
+
+        def close_worker_sftp(worker_sftp):
+            if worker_sftp.get_channel().get_transport() is shared_transport:
+                worker_sftp.close()
+            else:
+                self._close_sftp(worker_sftp)
+
+        return open_worker_sftp, close_worker_sftp
+
+    def _sftp_fetch_file(self, sftp, item, local_path):
+        """Tek bir dosyayı verilen SFTP kanalı üzerinden indir
+
+        Boyut tarama sırasında öğrenildiyse `sftp.get`'in yaptığı ek `stat`
+        isteği yapılmadan okuma önceden istenir (prefetch). Önden okuma
+        derinliği ve istek boyutu bağlantının `tuning` ayarlarından gelir.
+        Yarım kalmış bir .part dosyası varsa okuma kaldığı konumdan başlar.
+        """
+        tuning = sftp.tuning
+        offset = self._resume_offset(item, local_path + '.part')
+        with self._local_output(item, local_path, offset) as local_file:
+            if not (offset and offset == item['size']):
+                with sftp.open(item['path'], 'rb', tuning['buffer_size']) as remote_file:
+                    remote_file.MAX_REQUEST_SIZE = tuning['request_size']
+                    if self._bandwidth_limited() and item['size'] is not None:
+                        for data in self._sftp_read_blocks(remote_file, offset, item['size'] - offset, tuning):
+                            local_file.write(data)
+                            self._report_bytes(len(data))
+                    else:
+                        if offset:
+                            remote_file.seek(offset)
+                        remote_file.prefetch(item['size'], tuning['read_ahead'])
+                        while True:
+                            data = remote_file.read(tuning['buffer_size'])
+                            if not data:
+                                break
+                            local_file.write(data)
+                            self._report_bytes(len(data))
+
+    def _sftp_fetch_range(self, sftp, item, part_path, offset, length):
+        """Dosyanın [offset, offset+length) aralığını ofsetli okumalarla .part içindeki yerine yaz"""
+        tuning = sftp.tuning
+        with sftp.open(item['path'], 'rb', tuning['buffer_size']) as remote_file, open(part_path, 'r+b') as local_file:
+            remote_file.MAX_REQUEST_SIZE = tuning['request_size']
+            local_file.seek(offset)
+            received = 0
+            for data in self._sftp_read_blocks(remote_file, offset, length, tuning):
+                local_file.write(data)
+                received += len(data)
+                self._report_bytes(len(data))
+        if received != length:
+            raise Exception(f"Parça eksik alındı ({length - received} bayt kaldı)")
+
+    def _sftp_read_blocks(self, remote_file, offset, length, tuning):
+        """[offset, offset+length) aralığını readv ile boru hattı halinde oku
+
+        readv istekleri arka planda gönderir ve gelen yanıtları bellekte
+        biriktirir. Hız sınırı varken okuma yavaşladığından aralık, okuma önü
+        kadar bloktan oluşan pencerelerle istenir; böylece bekleyen veri
+        aralığın tamamı yerine tek bir pencereyle sınırlı kalır.
+        """
+        block = tuning['buffer_size']
+        chunks = [(position, min(block, offset + length - position))
+                  for position in range(offset, offset + length, block)]
+        window = max(1, tuning['read_ahead'] * tuning['request_size'] // block) if self._bandwidth_limited() else len(chunks)
+        for start in range(0, len(chunks), window or 1):
+            yield from remote_file.readv(chunks[start:start + window], tuning['read_ahead'])
+
+    def _close_sftp(self, sftp):
+        """SFTP kanalını ve bağlı olduğu SSH oturumunu kapat"""
+        transport = sftp.get_channel().get_transport()
+        try:
+            sftp.close()
+        finally:
+            transport.close()
+
+    def _compile_filter(self, backup_config):
+        """Yedekleme ayarlarındaki dahil etme/hariç tutma kurallarını derle"""
+        return FileFilter(backup_config.get('filter', '*.*'), backup_config.get('exclude', ''))
+
+    def _filter_items(self, items, file_filter):
+        """Öğeleri filtrele"""
+        if not isinstance(file_filter, FileFilter):
+            file_filter = FileFilter(file_filter)
+        return [item for item in items if file_filter.accepts(item)]
+    
+    def _create_backup_path(self, base_path):
+        """Yedekleme dizinini oluştur"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_path = os.path.join(base_path, f"backup_{timestamp}")
+        
+        os.makedirs(backup_path, exist_ok=True)
+        self._log(f"📂 Yedekleme dizini: {backup_path}")
+        
+        return backup_path
+
+
+class DatabaseManager:
+    """Veritabanı yedekleme sınıfı"""
+    
+    def __init__(self, progress_callback=None, log_callback=None):
+        self.progress_callback = progress_callback
+        self.log_callback = log_callback
+    
+    def _log(self, message):
+        if self.log_callback:
+            try:
+                self.log_callback(message)
+            except:
+                pass
+    
+    def backup_mysql(self, db_config, backup_path):
+        """MySQL veritabanı yedekle"""
+        # mysqldump komutunun sistemde var olup olmadığını kontrol et
+        if not shutil.which("mysqldump"):
+            error_msg = "❌ 'mysqldump' komutu bulunamadı. Lütfen MySQL/MariaDB client araçlarının yüklü ve sistem PATH'inde olduğundan emin olun."
+            self._log(error_msg)
+            return False, error_msg
+
+        try:
+            self._log("🗄️ MySQL veritabanı yedekleniyor...")
+            
+            # Bağlantı kur
+            conn = mysql.connector.connect(
+                host=db_config['host'],
+                port=int(db_config.get('port', 3306)),
+                user=db_config['username'],
+                password=db_config['password'],
+                database=db_config['database']
+            )
+            
+            # Yedekleme dosyası
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            backup_file = os.path.join(backup_path, f"mysql_backup_{timestamp}.sql")
+            
+            # mysqldump kullanarak yedek al
+            cmd = [
+                'mysqldump',
+                f"--host={db_config['host']}",
+                f"--port={db_config.get('port', 3306)}",
+                f"--user={db_config['username']}",
+                f"--password={db_config['password']}",
+                db_config['database']
+            ]
+            
+            with open(backup_file, 'w', encoding='utf-8') as f:
+                subprocess.run(cmd, stdout=f, check=True)
+            
+            conn.close()
+            self._log(f"✅ MySQL yedekleme tamamlandı: {backup_file}")
             return True, backup_file
             
         except Exception as e:
@@ -491,11 +1881,12 @@ class DatabaseManager:
 
 
 class ArchiveManager:
-    """ZIP arşivleme sınıfı"""
+    """Arşivleme sınıfı (ZIP, TAR, TAR+XZ, TAR+Zstandard)"""
     
-    def __init__(self, progress_callback=None, log_callback=None):
+    def __init__(self, progress_callback=None, log_callback=None, workers=None):
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.workers = workers or os.cpu_count() or 1
     
     def _log(self, message):
         if self.log_callback:
@@ -504,52 +1895,2235 @@ class ArchiveManager:
             except:
                 pass
     
-    def create_zip_archive(self, source_paths, output_zip):
+    def create_zip_archive(self, source_paths, output_zip, workers=None, members=None):
         """Birden fazla kaynağı ZIP arşivine dönüştür"""
+        return self.create_archive(source_paths, output_zip, 'zip', workers=workers, members=members)
+
+    def create_archive(self, source_paths, output_path, archive_format='zip', level=None, workers=None, members=None,
+                       volume_size=None, hashes=None):
+        """Birden fazla kaynağı seçilen biçimde arşivle
+
+        Eklenecek dosyalar (yol, arşiv adı, boyut, tek dosya mı) listesi
+        `members` ile verilebilir; verilmezse kaynaklar tek bir scandir
+        geçişiyle taranır. Ağaç iki kez gezilmez ve ilerleme bayt
+        cinsinden `progress_callback` ile bildirilir. ZIP'te birden fazla
+        iş parçacığı verilirse dosyalar parçalar halinde paralel
+        sıkıştırılır; Zstandard kendi iş parçacıklarını kullanır.
+
+        `volume_size` verilirse arşiv, her biri kendi başına açılabilen ve
+        bu boyutu aşmayan parçalar halinde yazılır; parça sınırı diske
+        yazılan gerçek bayt sayısına göre belirlenir, sınıra denk gelen
+        dosyalar `.partNNN` adlı parçalara bölünür. Bu durumda parça dizini
+        (`.volumes.json`) yolu döndürülür.
+
+        Arşivin yanına girdilerin konumlarını tutan `ArchiveIndex`
+        (`.index.db`) yazılır; `hashes` ile verilen (arşiv adı → özet)
+        değerleri dizine işlenir.
+        """
+        workers = max(1, int(workers or self.workers))
         try:
-            self._log("🗜️ ZIP arşivi oluşturuluyor...")
-            
-            with zipfile.ZipFile(output_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                total_files = self._count_files(source_paths)
-                processed_files = 0
-                
-                for source_path in source_paths:
-                    if os.path.isdir(source_path):
-                        # Klasörü ZIP'e ekle
-                        for root, dirs, files in os.walk(source_path):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.relpath(file_path, os.path.dirname(source_path))
-                                zipf.write(file_path, arcname)
-                                
-                                processed_files += 1
-                                if processed_files % 10 == 0:  # Her 10 dosyada bir log
-                                    self._log(f"📦 {processed_files}/{total_files} dosya arşive eklendi...")
-                    
-                    elif os.path.isfile(source_path):
-                        # Tek dosyayı ZIP'e ekle
-                        arcname = os.path.basename(source_path)
-                        zipf.write(source_path, arcname)
-                        processed_files += 1
-                        self._log(f"📦 Veritabanı yedeği arşive eklendi: {arcname}")
+            label = self._check_format(archive_format)
+            self._log(f"🗜️ {label} arşivi oluşturuluyor ({workers} iş parçacığı)...")
+            if members is None:
+                members = self._scan_members(source_paths)
+            self._start_progress(members)
+            policy = CompressionPolicy(compress=archive_format == 'zip') if archive_format.startswith('zip') else None
+            volumes = ArchiveVolumes(output_path, archive_format, volume_size) if volume_size else None
+            if volumes:
+                self._log(f"🧩 Arşiv en fazla {format_size(volumes.volume_size)} boyutunda parçalara bölünecek")
+            index = ArchiveIndex.create(output_path, archive_format, hashes)
+
+            try:
+                written = self._write_archive(members, output_path, archive_format, level, workers, policy, volumes)
+                for volume, infos in written:
+                    index.add_members(volume, infos, volumes.parts if volumes else None)
+                if volumes:
+                    output_path = volumes.save()
+            finally:
+                index.close()
+            self._log(f"🗂️ Arşiv dizini yazıldı: {index.path}")
             
-            self._log(f"✅ ZIP arşivi oluşturuldu: {output_zip}")
-            return True, output_zip
+            if policy:
+                self._log(policy.summary())
+            self._log(f"✅ Arşiv oluşturuldu: {output_path}")
+            return True, output_path
             
         except Exception as e:
-            self._log(f"❌ ZIP oluşturma hatası: {str(e)}")
+            self._log(f"❌ Arşiv oluşturma hatası: {str(e)}")
             return False, str(e)
-    
-    def _count_files(self, source_paths):
-        """Toplam dosya sayısını hesapla"""
-        count = 0
-        for path in source_paths:
-            if os.path.isdir(path):
-                for root, dirs, files in os.walk(path):
-                    count += len(files)
-            elif os.path.isfile(path):
-                count += 1
-        return count
+
+    def _check_format(self, archive_format):
+        """Biçimin kullanılabilir olduğunu doğrula, açıklamasını döndür"""
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Desteklenmeyen arşiv biçimi: {archive_format}")
+        if archive_format == 'tar.zst' and zstandard is None:
+            raise Exception("tar.zst için 'zstandard' paketi gerekli (pip install zstandard)")
+        return ARCHIVE_FORMATS[archive_format][1]
+
+    def _read_chunks(self, member, chunk_size):
+        """Üyenin verisini parçalar halinde oku"""
+        with open(member[0], 'rb') as source:
+            while True:
+                data = source.read(chunk_size)
+                if not data:
+                    break
+                yield data
+
+    def _zip_member_info(self, member, level):
+        zinfo = zipfile.ZipInfo.from_file(member[0], member[1])
+        zinfo._compresslevel = level
+        return zinfo
+
+    def _write_archive(self, members, output_path, archive_format, level, workers, policy=None, volumes=None):
+        """Dosyaları biçime uygun yazıcıyla arşive (`volumes` verilirse parçalara) yaz
+
+        Yazılan (parça adı, girdiler) listesini döndürür. Yazım yarıda
+        kesilirse açık akışlar kapatılır ve yarım arşiv silinir.
+        """
+        if archive_format.startswith('zip'):
+            policy = policy or CompressionPolicy(compress=archive_format == 'zip')
+            writer = ZipVolumeWriter(output_path, level, volumes, self._volume_done)
+        else:
+            writer = TarVolumeWriter(output_path, archive_format, level, workers, volumes, self._volume_done)
+        try:
+            if archive_format.startswith('zip'):
+                self._write_zip(writer, members, workers, policy)
+            else:
+                for member in members:
+                    size = writer.add(member[0], member[1])
+                    self._member_done(member[1], size, member[3])
+            return writer.close()
+        except BaseException:
+            writer.abort()
+            raise
+
+    def _volume_done(self, volume_path):
+        self._log(f"📀 Parça tamamlandı: {os.path.basename(volume_path)} ({format_size(os.path.getsize(volume_path))})")
+
+    def compare_formats(self, members, workers=None, sample_bytes=ARCHIVE_SAMPLE_BYTES):
+        """Yedeğin bir örneğini tüm biçimlerle arşivleyip süre ve oranı raporla
+
+        Örnek, ağacın tamamını temsil etmesi için dosya listesinden eşit
+        aralıklarla seçilir. Tahmini süre örnekteki hızın tüm yedeğe
+        oranlanmasıyla bulunur. Sonuçlar log'a tablo olarak yazılır ve
+        liste olarak döndürülür.
+        """
+        workers = max(1, int(workers or self.workers))
+        files = [member for member in members if member[2]]
+        total_bytes = sum(member[2] for member in files)
+        if not total_bytes:
+            self._log("ℹ️ Karşılaştırma için arşivlenecek veri yok")
+            return []
+
+        step = max(1, total_bytes // sample_bytes)
+        sample = []
+        sampled_bytes = 0
+        for member in files[::step]:
+            if sampled_bytes >= sample_bytes:
+                break
+            sample.append(member)
+            sampled_bytes += member[2]
+
+        self._log(f"🔬 Arşiv biçimleri karşılaştırılıyor: {len(sample)} dosyalık {format_size(sampled_bytes)} örnek")
+        results = []
+        saved_progress, self.archive_progress = getattr(self, 'archive_progress', None), None
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                for archive_format, (extension, label) in ARCHIVE_FORMATS.items():
+                    try:
+                        self._check_format(archive_format)
+                    except Exception as e:
+                        self._log(f"   {label:<22} atlandı: {str(e)}")
+                        continue
+                    output_path = os.path.join(temp_dir, 'sample' + extension)
+                    started = time.perf_counter()
+                    self._write_archive(sample, output_path, archive_format, None, workers)
+                    seconds = time.perf_counter() - started
+                    size = os.path.getsize(output_path)
+                    os.remove(output_path)
+                    result = {'format': archive_format, 'seconds': seconds, 'size': size,
+                              'ratio': size / sampled_bytes,
+                              'estimated_seconds': seconds * total_bytes / sampled_bytes,
+                              'estimated_size': int(size * total_bytes / sampled_bytes)}
+                    results.append(result)
+                    self._log(f"   {label:<22} oran %{result['ratio'] * 100:5.1f}   {seconds:6.2f} sn   "
+                              f"tüm yedek için ≈ {result['estimated_seconds']:.0f} sn, "
+                              f"{format_size(result['estimated_size'])}")
+        finally:
+            self.archive_progress = saved_progress
+        return results
+
+    def verify_volumes(self, index_path, workers=None):
+        """Parçalı arşivin tüm parçalarını paralel özetleyip dizindeki değerlerle karşılaştır
+
+        Bozuk ya da eksik parçaların listesini döndürür.
+        """
+        workers = max(1, int(workers or self.workers))
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        directory = os.path.dirname(index_path)
+        self._log(f"🔍 {len(index['volumes'])} arşiv parçası doğrulanıyor...")
+
+        def check(volume):
+            volume_path = os.path.join(directory, volume['name'])
+            if not os.path.isfile(volume_path):
+                return "bulunamadı"
+            if os.path.getsize(volume_path) != volume['size']:
+                return "boyut uyuşmuyor"
+            if DedupRepository.hash_file(volume_path) != volume['hash']:
+                return "özet uyuşmuyor"
+            return None
+
+        problems = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for volume, problem in zip(index['volumes'], pool.map(check, index['volumes'])):
+                if problem:
+                    problems.append((volume['name'], problem))
+                    self._log(f"❌ {volume['name']}: {problem}")
+        if not problems:
+            self._log("✅ Tüm arşiv parçaları sağlam")
+        return problems
+
+    def verify_backup(self, backup_path, workers=None):
+        """Yedeği yeniden okuyup indirme sırasında hesaplanan özetlerle karşılaştır
+
+        Klasör yedeğinde (klasör ya da içindeki manifest.json verilebilir)
+        manifestteki her dosya paralel özetlenir. Arşivde önce varsa parça
+        dizinindeki parça özetleri, sonra arşiv dizinindeki her dosyanın
+        boyutu, CRC'si ve özeti doğrulanır. (ad, sorun) listesi döndürülür.
+        """
+        workers = max(1, int(workers or self.workers))
+        if os.path.isdir(backup_path):
+            backup_path = os.path.join(backup_path, "manifest.json")
+        self._log(f"🔍 Yedek doğrulanıyor: {backup_path}")
+        started = time.time()
+
+        if os.path.basename(backup_path) == "manifest.json":
+            problems, checked = self._verify_folder(backup_path, workers)
+        else:
+            problems = []
+            volumes_path = ArchiveIndex.path_for(backup_path)[:-len('.index.db')] + '.volumes.json'
+            if os.path.isfile(volumes_path):
+                problems.extend(self.verify_volumes(volumes_path, workers))
+            index = ArchiveIndex.open(backup_path)
+            try:
+                checked = index.summary()['files']
+                self._log(f"🔍 Arşivdeki {checked} dosya {workers} iş parçacığıyla özetleniyor...")
+                for name, problem in index.verify(workers):
+                    problems.append((name, problem))
+                    self._log(f"❌ {name}: {problem}")
+            finally:
+                index.close_reader()
+
+        if problems:
+            self._log(f"⚠️ Doğrulama tamamlandı: {checked} dosyadan {len(problems)} sorun bulundu "
+                      f"({time.time() - started:.1f} sn)")
+        else:
+            self._log(f"✅ Doğrulama tamamlandı: {checked} dosya sağlam ({time.time() - started:.1f} sn)")
+        return problems
+
+    def _verify_folder(self, manifest_path, workers):
+        """Klasör yedeğindeki dosyaları manifestteki boyut ve özetlerle karşılaştır"""
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        # Yedek taşınmış olabilir; dosyalar manifestin yanındaki göreli konumda aranır
+        files_root = os.path.join(os.path.dirname(manifest_path), manifest.get('zip_prefix', 'files/'))
+        files = list(manifest.get('files', {}).items())
+        self._log(f"🔍 Klasördeki {len(files)} dosya {workers} iş parçacığıyla özetleniyor...")
+
+        def check(item):
+            remote_path, (size, _mtime, digest) = item
+            local_path = os.path.join(files_root, remote_path.lstrip('/\\'))
+            if not os.path.isfile(local_path):
+                return "bulunamadı"
+            # Özet yazılan baytlardan hesaplandığı için listedeki boyuttan önceliklidir
+            if digest:
+                return "özet uyuşmuyor" if DedupRepository.hash_file(local_path) != digest else None
+            if size is not None and os.path.getsize(local_path) != size:
+                return "boyut uyuşmuyor"
+            return None
+
+        problems = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for (remote_path, _entry), problem in zip(files, pool.map(check, files)):
+                if problem:
+                    problems.append((remote_path, problem))
+                    self._log(f"❌ {remote_path}: {problem}")
+        return problems, len(files)
+
+    def _scan_members(self, source_paths):
+        """Kaynakları tek geçişte tarayıp arşive eklenecek dosyaları boyutlarıyla listele"""
+        members = []
+        for source_path in source_paths:
+            if os.path.isdir(source_path):
+                # Klasörü ZIP'e ekle
+                base = os.path.dirname(source_path)
+                pending = [source_path]
+                while pending:
+                    with os.scandir(pending.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                members.append((entry.path, os.path.relpath(entry.path, base),
+                                                entry.stat().st_size, False))
+            elif os.path.isfile(source_path):
+                # Tek dosyayı ZIP'e ekle
+                members.append((source_path, os.path.basename(source_path), os.path.getsize(source_path), True))
+        return members
+
+    def _start_progress(self, members):
+        self.archive_progress = {'files': 0, 'bytes': 0, 'total_files': len(members),
+                                 'total_bytes': sum(member[2] or 0 for member in members),
+                                 'percent': -1, 'logged': time.time()}
+        self._log(f"📋 Arşivlenecek: {len(members)} dosya, {format_size(self.archive_progress['total_bytes'])}")
+
+    def _member_done(self, arcname, size, single):
+        """Arşive eklenen dosyayı ilerlemeye işle; bildirimleri seyrek tut"""
+        progress = self.archive_progress
+        if progress is None:
+            return
+        progress['files'] += 1
+        progress['bytes'] += size
+        total_bytes = max(progress['total_bytes'], progress['bytes'])
+        if single:
+            self._log(f"📦 Veritabanı yedeği arşive eklendi: {arcname}")
+        elif time.time() - progress['logged'] >= ARCHIVE_LOG_INTERVAL:
+            progress['logged'] = time.time()
+            self._log(f"📦 {progress['files']}/{progress['total_files']} dosya arşive eklendi "
+                      f"({format_size(progress['bytes'])} / {format_size(total_bytes)})...")
+
+        percent = progress['bytes'] * 100 // total_bytes if total_bytes else 100
+        if self.progress_callback and percent != progress['percent']:
+            progress['percent'] = percent
+            try:
+                self.progress_callback(progress['bytes'], total_bytes)
+            except Exception as e:
+                print(f"Progress hatası: {e}")
+
+    @staticmethod
+    def _deflate_chunk(data, zdict, last, level):
+        """Bir parçayı ham deflate akışı olarak sıkıştır, harcanan CPU süresiyle döndür
+
+        Son parça dışındakiler SYNC_FLUSH ile bayt sınırında bitirilir; böylece
+        ardışık parçaların çıktıları uç uca eklenince tek geçerli bir deflate
+        akışı oluşur (pigz yöntemi).
+        """
+        started = time.thread_time()
+        if zdict:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+        return compressed, time.thread_time() - started
+
+    def _write_zip(self, writer, members, workers, policy):
+        """Dosyaları parçalara bölüp paralel sıkıştır, arşive sırayla yaz
+
+        zlib sıkıştırma sırasında GIL'i bıraktığından iş parçacıkları tüm
+        çekirdekleri kullanır. Okuma ve yazma ana iş parçacığında yapılır;
+        sırada bekleyen parça sayısı sınırlı olduğundan bellek kullanımı
+        dosya boyutundan bağımsızdır. Politikanın sıkıştırmadan saklanmasına
+        karar verdiği dosyaların parçaları havuza gönderilmeden olduğu gibi
+        yazılır. Girdi başlıkları, CRC ve parça sınırları `ZipVolumeWriter`
+        tarafından yönetilir.
+        """
+        pending = deque()
+        current = {}
+
+        def write_next():
+            kind, value, data = pending.popleft()
+            if kind == 'begin':
+                zinfo, member = value, data
+                writer.begin(zinfo, member[2])
+                current.update(member=member, cpu=0.0, store=zinfo.compress_type == zipfile.ZIP_STORED)
+                return
+
+            if value is None:
+                compressed = data
+            else:
+                compressed, cpu_seconds = value.result()
+                current['cpu'] += cpu_seconds
+            writer.write(data, compressed, kind == 'last')
+            if kind == 'last':
+                file_size, compress_size = writer.end()
+                policy.record(current['store'], file_size, compress_size, current['cpu'])
+                self._member_done(current['member'][1], file_size, current['member'][3])
+
+        limit = workers * ZIP_PIPELINE_DEPTH
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for member in members:
+                zinfo = self._zip_member_info(member, writer.level)
+                chunks = self._read_chunks(member, ZIP_CHUNK_SIZE)
+                zdict = b''
+                data = next(chunks, b'')
+                store = policy.should_store(zinfo.filename, data[:ENTROPY_SAMPLE_SIZE])
+                zinfo.compress_type = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+                pending.append(('begin', zinfo, member))
+                while True:
+                    next_data = next(chunks, b'') if data else b''
+                    last = not next_data
+                    future = None if store else pool.submit(self._deflate_chunk, data, zdict, last, writer.level)
+                    pending.append(('last' if last else 'chunk', future, data))
+                    while len(pending) > limit:
+                        write_next()
+                    if last:
+                        break
+                    zdict = data[-ZIP_DICTIONARY_SIZE:]
+                    data = next_data
+
+            while pending:
+                write_next()
+
+
+class HashingWriter:
+    """Yazılan veriyi hedefe aktarırken içerik özetini ve boyutunu da hesaplayan sarmalayıcı
+
+    Hedef verilmezse veri yalnızca özetlenir (doğrulamada kullanılır).
+    """
+
+    def __init__(self, target=None):
+        self.target = target
+        self.hasher = DedupRepository.new_hasher()
+        self.size = 0
+
+    def write(self, data):
+        self.hasher.update(data)
+        self.size += len(data)
+        if self.target is not None:
+            self.target.write(data)
+        return len(data)
+
+    def update_from(self, file_path, length, offset=0):
+        """Dosyanın `offset` konumundan başlayan `length` baytını yazmadan özete ekle
+
+        Sürdürülen indirmelerde diskteki ilk kısım, parçalı indirmelerde
+        tamamlanan parçalar bu yolla özetlenir.
+        """
+        with open(file_path, 'rb') as source:
+            source.seek(offset)
+            while length > 0:
+                data = source.read(min(HASH_CHUNK, length))
+                if not data:
+                    break
+                self.hasher.update(data)
+                self.size += len(data)
+                length -= len(data)
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+
+class ZipVolumeWriter:
+    """ZIP girdilerini ham deflate parçaları olarak yazan, gerekirse arşivi parçalara bölen yazıcı
+
+    Girdinin yerel başlığı önce yer tutucu olarak yazılır, veri bitince CRC
+    ve boyutlarla düzeltilir. Parçalı arşivde her veri parçası yazılmadan
+    önce diske yazılmış gerçek bayt sayısı ve merkezi dizin payı sınırla
+    karşılaştırılır. Sıkıştırılmamış boyutu parçanın kalanına sığmayan
+    dosya baştan `.partNNN` adıyla yazılır ve sınıra gelince sonraki
+    parçada sürer; böyle bir dosya sıkıştırılınca sığarsa tek parçalı
+    kalır. Kesilen deflate akışı boş bir son blokla kapatılır, yeni
+    parçanın başındaki veri önceki parçada kalan sözlük kullanılmadan
+    yeniden sıkıştırılır.
+    """
+
+    def __init__(self, output_path, level=None, volumes=None, on_volume=None):
+        self.output_path = output_path
+        self.level = DEFAULT_ARCHIVE_LEVELS['zip'] if level is None else level
+        self.volumes = volumes
+        self.on_volume = on_volume
+        # Kapanan parçaların (ad, girdiler) listesi; arşiv dizini bunlardan yazılır
+        self.written = []
+        self.paths = []
+        self.entry = self.part = None
+        self.zip = self._open()
+
+    def _open(self):
+        path = self.volumes.next_path() if self.volumes else self.output_path
+        self.paths.append(path)
+        # Merkezi dizin parça kapanırken yazılır; yeri girdi eklendikçe ayrılır
+        self.directory_size = 0
+        return zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+
+    @staticmethod
+    def _directory_record(name):
+        return VOLUME_ENTRY_OVERHEAD + len(name.encode('utf-8'))
+
+    def _room(self):
+        """Parçada veri için kalan yer (parçasız arşivde sınırsız)"""
+        if not self.volumes:
+            return math.inf
+        return self.volumes.budget - self.zip.fp.tell() - self.directory_size
+
+    def fits(self, name, size):
+        """`size` baytlık dosya parçanın kalanına bölünmeden sığar mı"""
+        if not self.volumes:
+            return True
+        if size is None:
+            return False
+        # Yerel başlık merkezi dizin kaydından büyük değildir
+        return 2 * self._directory_record(name) + size + size // VOLUME_EXPANSION <= self._room()
+
+    def _close_volume(self):
+        self.zip.close()
+        self.written.append((os.path.basename(self.zip.filename), self.zip.infolist()))
+        if self.volumes:
+            self.volumes.add(self.zip.filename, self.zip.namelist())
+            if self.on_volume:
+                self.on_volume(self.zip.filename)
+
+    def _roll(self):
+        self._close_volume()
+        self.zip = self._open()
+
+    def add_directory(self, info):
+        """Veri içermeyen klasör girdisini ekle"""
+        if self.zip.filelist and not self.fits(info.filename, 0):
+            self._roll()
+        self.directory_size += self._directory_record(info.filename)
+        self.zip.writestr(info, b'')
+
+    def begin(self, zinfo, size):
+        """Girdiyi başlat; parçanın kalanına sığmayacak dosya parçalı adla başlar"""
+        split = False
+        if not self.fits(zinfo.filename, size):
+            if self.zip.filelist and self._room() < self.volumes.min_part:
+                self._roll()
+            split = not self.fits(zinfo.filename, size)
+        self.entry = {'info': zinfo, 'size': size, 'split': split, 'parts': 0, 'offset': 0, 'compressed': 0}
+        self._start_part()
+
+    def _start_part(self):
+        entry = self.entry
+        zinfo = entry['info']
+        limit = entry['size']
+        if entry['split']:
+            entry['parts'] += 1
+            part = zipfile.ZipInfo(f"{zinfo.filename}.part{entry['parts']:03d}", zinfo.date_time)
+            part.compress_type = zinfo.compress_type
+            part.external_attr = zinfo.external_attr
+            part._compresslevel = zinfo._compresslevel
+            zinfo = part
+            limit = min(limit or self.volumes.budget, self.volumes.budget)
+        zinfo.header_offset = self.zip.fp.tell()
+        zinfo.CRC = zinfo.compress_size = 0
+        self.zip._writecheck(zinfo)
+        self.zip._didModify = True
+        self.part = {'info': zinfo, 'crc': 0, 'size': 0, 'compressed': 0, 'tail': b'', 'finished': False,
+                     'zip64': limit is None or limit * 1.05 > zipfile.ZIP64_LIMIT}
+        self.directory_size += self._directory_record(zinfo.filename)
+        self.zip.fp.write(zinfo.FileHeader(self.part['zip64']))
+
+    def _compress(self, data, last):
+        # Sözlük olarak yalnızca aynı parçaya yazılmış veri kullanılabilir
+        return ArchiveManager._deflate_chunk(data, self.part['tail'], last, self.level)[0]
+
+    def write(self, data, compressed, last):
+        """Girdinin bir veri parçasını yaz
+
+        `compressed`, verinin önceki veri parçasının son 32 KB'ı sözlük
+        verilerek sıkıştırılmış halidir (saklanan girdide verinin kendisi).
+        """
+        store = self.entry['info'].compress_type == zipfile.ZIP_STORED
+        if not store and self.entry['offset'] and self.part['size'] < ZIP_DICTIONARY_SIZE:
+            # Sözlüğün bir kısmı önceki parçada kaldı
+            compressed = self._compress(data, last)
+        while self.entry['split'] and data and len(compressed) + len(ZIP_DEFLATE_END) > self._room():
+            room = self._room() - len(ZIP_DEFLATE_END)
+            if room >= self.volumes.min_part or not self.part['size']:
+                # Sığmayan verinin parçanın kalanına sığacak kadarı bu parçaya yazılır
+                head = data[:max(1, room - room // VOLUME_EXPANSION - VOLUME_ENTRY_OVERHEAD)]
+                self._emit(head, head if store else self._compress(head, False), False)
+                data = data[len(head):]
+            else:
+                self._next_part()
+            compressed = data if store else self._compress(data, last)
+        self._emit(data, compressed, last)
+
+    def _emit(self, data, compressed, last):
+        part = self.part
+        self.zip.fp.write(compressed)
+        part['crc'] = zlib.crc32(data, part['crc'])
+        part['size'] += len(data)
+        part['compressed'] += len(compressed)
+        part['tail'] = (part['tail'] + data[-ZIP_DICTIONARY_SIZE:])[-ZIP_DICTIONARY_SIZE:]
+        part['finished'] = last
+
+    def _next_part(self):
+        """Parçayı sınırda bitirip girdiyi sonraki arşiv parçasında sürdür"""
+        if self.entry['info'].compress_type != zipfile.ZIP_STORED and not self.part['finished']:
+            self.zip.fp.write(ZIP_DEFLATE_END)
+            self.part['compressed'] += len(ZIP_DEFLATE_END)
+        self._end_part()
+        self._roll()
+        self._start_part()
+
+    def _end_part(self):
+        part, entry = self.part, self.entry
+        zinfo = part['info']
+        zinfo.CRC = part['crc']
+        zinfo.file_size = part['size']
+        zinfo.compress_size = part['compressed']
+        if not part['zip64'] and max(zinfo.file_size, zinfo.compress_size) > zipfile.ZIP64_LIMIT:
+            raise RuntimeError(f"{zinfo.filename} arşivlenirken boyutu değişti")
+        fp = self.zip.fp
+        self.zip.start_dir = fp.tell()
+        fp.seek(zinfo.header_offset)
+        fp.write(zinfo.FileHeader(part['zip64']))
+        fp.seek(self.zip.start_dir)
+        self.zip.filelist.append(zinfo)
+        self.zip.NameToInfo[zinfo.filename] = zinfo
+        if entry['split']:
+            self.volumes.parts.setdefault(entry['info'].filename, []).append(
+                [len(self.volumes.volumes) + 1, zinfo.filename, entry['offset'], part['size']])
+        entry['offset'] += part['size']
+        entry['compressed'] += part['compressed']
+
+    def end(self):
+        """Girdiyi bitir, (boyut, sıkıştırılmış boyut) döndür"""
+        self._end_part()
+        entry, self.entry, self.part = self.entry, None, None
+        return entry['offset'], entry['compressed']
+
+    def discard(self):
+        """Yazılmakta olan girdiyi arşivden sil (parça değiştirmemiş girdiler için)"""
+        header_offset = self.part['info'].header_offset
+        self.zip.fp.seek(header_offset)
+        self.zip.fp.truncate()
+        self.zip.start_dir = header_offset
+        self.directory_size -= self._directory_record(self.part['info'].filename)
+        self.entry = self.part = None
+
+    def close(self):
+        """Son parçayı kapat, yazılan (parça adı, girdiler) listesini döndür"""
+        self._close_volume()
+        return self.written
+
+    def abort(self):
+        """Yarım kalan arşivi kapatıp yazılan parçalarla birlikte sil"""
+        try:
+            self.zip.close()
+        except Exception:
+            pass
+        if self.volumes:
+            self.volumes.hasher.shutdown(wait=False)
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ZipEntryStream:
+    """`ZipVolumeWriter`'da açılan girdiye yazılan veriyi parçalara bölüp sıkıştıran dosya benzeri akış"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.store = writer.entry['info'].compress_type == zipfile.ZIP_STORED
+        self.buffer = bytearray()
+        self.zdict = b''
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) > ZIP_CHUNK_SIZE:
+            chunk = bytes(self.buffer[:ZIP_CHUNK_SIZE])
+            del self.buffer[:ZIP_CHUNK_SIZE]
+            self._write_chunk(chunk, False)
+        return len(data)
+
+    def _write_chunk(self, chunk, last):
+        if self.store:
+            compressed = chunk
+        else:
+            compressed = ArchiveManager._deflate_chunk(chunk, self.zdict, last, self.writer.level)[0]
+        self.writer.write(chunk, compressed, last)
+        self.zdict = chunk[-ZIP_DICTIONARY_SIZE:]
+
+    def close(self):
+        """Kalan veriyi yazıp girdiyi bitir, (boyut, sıkıştırılmış boyut) döndür"""
+        self._write_chunk(bytes(self.buffer), True)
+        self.buffer = bytearray()
+        return self.writer.end()
+
+
+class TarVolumeWriter:
+    """TAR arşivini (xz/Zstandard ile sıkıştırarak) yazan, gerekirse parçalara bölen yazıcı
+
+    tarfile'a dosya olarak kendisi verilir; yazılan veri sıkıştırıcıdan
+    geçirilip parçaya aktarılır. Sıkıştırılmış akışta diskteki boyut ancak
+    sıkıştırıcı boşaltılınca kesinleşir: parça sınırına yaklaşınca akış
+    boşaltılır (Zstandard'da blok sonu, xz'de yeni bir akış) ve gerçek
+    boyut ölçülür. Parçanın kalanına sığmayan dosya `.partNNN` adlı
+    aralıklara bölünür. TAR başlığı veri boyunu önceden içerdiğinden aralık
+    uzunluğu parçanın kalanı kadar sıkıştırılmamış veri olarak seçilir;
+    verinin sıkışmasıyla açılan yer aynı parçada sonraki aralıkla doldurulur.
+    """
+
+    def __init__(self, output_path, archive_format, level=None, workers=1, volumes=None, on_volume=None):
+        self.output_path = output_path
+        self.archive_format = archive_format
+        self.level = DEFAULT_ARCHIVE_LEVELS.get(archive_format) if level is None else level
+        self.workers = workers
+        self.volumes = volumes
+        self.on_volume = on_volume
+        self.written = []
+        self.paths = []
+        self._open()
+
+    def _open(self):
+        path = self.volumes.next_path() if self.volumes else self.output_path
+        self.paths.append(path)
+        self.raw = open(path, 'wb')
+        if self.archive_format == 'tar.zst':
+            # Zstandard sıkıştırmayı kendi iş parçacıklarına dağıtır
+            self.stream = zstandard.ZstdCompressor(level=self.level, threads=self.workers).stream_writer(
+                self.raw, closefd=False)
+        elif self.archive_format == 'tar.xz':
+            self.stream = lzma.LZMACompressor(preset=self.level)
+        else:
+            self.stream = None
+        self.position = 0
+        # Son boşaltmadan beri sıkıştırıcıya verilen bayt; parça en fazla bu kadar büyüyebilir
+        self.unflushed = 0
+        self.tar = tarfile.open(fileobj=self, mode='w')
+
+    def write(self, data):
+        """tarfile'ın yazdığı veriyi (sıkıştırarak) parçaya aktar"""
+        size = len(data)
+        self.position += size
+        if self.stream is None:
+            self.raw.write(data)
+        else:
+            self.unflushed += size
+            if self.archive_format == 'tar.xz':
+                self.raw.write(self.stream.compress(data))
+            else:
+                self.stream.write(data)
+        return size
+
+    def tell(self):
+        return self.position
+
+    def _flush(self):
+        """Sıkıştırıcıyı boşaltıp parçanın diskteki boyutunu kesinleştir"""
+        if not self.unflushed:
+            return
+        if self.archive_format == 'tar.xz':
+            # Ardışık xz akışları tek dosya olarak açılır
+            self.raw.write(self.stream.flush())
+            self.stream = lzma.LZMACompressor(preset=self.level)
+        else:
+            self.stream.flush(zstandard.FLUSH_BLOCK)
+        self.unflushed = 0
+
+    def _room(self, exact=False):
+        if exact:
+            self._flush()
+        return self.volumes.budget - self.raw.tell() - self.unflushed
+
+    def _space(self, tarinfo, size):
+        """Girdinin başlık ve dolgu dahil arşivde kaplayacağı en fazla yer"""
+        space = len(tarinfo.tobuf(self.tar.format, self.tar.encoding, self.tar.errors))
+        space += math.ceil(size / tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+        return space + (space // VOLUME_EXPANSION if self.stream else 0)
+
+    def _fits(self, tarinfo):
+        if not self.volumes:
+            return True
+        space = self._space(tarinfo, tarinfo.size)
+        return space <= self._room() or space <= self._room(exact=True)
+
+    def _addfile(self, tarinfo, source):
+        self.tar.addfile(tarinfo, source)
+        # Yazma kipinde tarfile veri konumunu tutmaz; dizin için dolgulu veri boyu geri alınarak bulunur
+        self.tar.members[-1].offset_data = (self.tar.offset -
+                                            math.ceil(tarinfo.size / tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE)
+
+    def add(self, file_path, arcname):
+        """Dosyayı arşive ekle, parçaya sığmıyorsa aralıklara böl; dosya boyutunu döndür"""
+        tarinfo = self.tar.gettarinfo(file_path, arcname)
+        with open(file_path, 'rb') as source:
+            if not self._fits(tarinfo) and self.tar.members and self._room() < self.volumes.min_part:
+                self._roll()
+            if self._fits(tarinfo):
+                self._addfile(tarinfo, source)
+                return tarinfo.size
+
+            offset = 0
+            parts = self.volumes.parts.setdefault(tarinfo.name, [])
+            while offset < tarinfo.size:
+                part = copy.copy(tarinfo)
+                part.name = f"{tarinfo.name}.part{len(parts) + 1:03d}"
+                room = self._room(exact=True) - self._space(part, 0)
+                if self.stream:
+                    room -= room // VOLUME_EXPANSION
+                room = room // tarfile.BLOCKSIZE * tarfile.BLOCKSIZE
+                if room < min(self.volumes.min_part, tarinfo.size - offset):
+                    self._roll()
+                    continue
+                part.size = min(tarinfo.size - offset, room)
+                self._addfile(part, source)
+                parts.append([len(self.volumes.volumes) + 1, part.name, offset, part.size])
+                offset += part.size
+        return tarinfo.size
+
+    def _close_volume(self):
+        self.tar.close()
+        if self.archive_format == 'tar.xz':
+            self.raw.write(self.stream.flush())
+        elif self.stream is not None:
+            self.stream.close()
+        self.raw.close()
+        self.written.append((os.path.basename(self.raw.name), self.tar.members))
+        if self.volumes:
+            self.volumes.add(self.raw.name, [member.name for member in self.tar.members])
+            if self.on_volume:
+                self.on_volume(self.raw.name)
+
+    def _roll(self):
+        self._close_volume()
+        self._open()
+
+    def close(self):
+        """Son parçayı kapat, yazılan (parça adı, girdiler) listesini döndür"""
+        self._close_volume()
+        return self.written
+
+    def abort(self):
+        """Yarım kalan arşivi kapatıp yazılan parçalarla birlikte sil"""
+        self.raw.close()
+        if self.volumes:
+            self.volumes.hasher.shutdown(wait=False)
+        for path in self.paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ZipStreamWriter:
+    """İndirilen verileri ara klasör olmadan doğrudan ZIP arşivine yazan sınıf
+
+    Dosyalar yerel yedek klasöründeki yollarına göre (`base_path`'e göreli)
+    arşive eklenir. ZIP aynı anda tek girdi yazabildiğinden indirilen
+    dosyalar bellekte (büyükse geçici dosyada) toplanıp sıraya alınır ve o
+    an arşive yazan iş parçacığı tarafından eklenir; indirme iş
+    parçacıkları arşivi beklemez. Büyük bir dosya yalnızca başka indirilen
+    girdi yokken doğrudan girdiye akıtılır. Bu yüzden eşzamanlı indirmelerde
+    doğrudan modda da veri geçici dosyalarda bekletilir; bekleyen veri
+    ZIP_SPOOL_LIMIT'i aşarsa yeni girdiler arşivi bekleyip doğrudan yazılır,
+    böylece geçici disk kullanımı sınırlı kalır. Sıkıştırılıp
+    sıkıştırılmayacağına `CompressionPolicy` karar verir; doğrudan akıtılan
+    dosyalarda yalnızca uzantıya bakılabilir. Parçalı arşivde parçaya
+    bölünmeden sığmayabilecek dosyalar her zaman geçici dosyadan kopyalanır.
+    """
+
+    def __init__(self, zip_path, base_path, policy=None, level=None, volume_size=None):
+        self.zip_path = zip_path
+        self.base_path = base_path
+        self.policy = policy or CompressionPolicy()
+        self.level = level
+        self.volumes = ArchiveVolumes(zip_path, 'zip', volume_size) if volume_size else None
+        self.writer = ZipVolumeWriter(zip_path, level, self.volumes)
+        # Arşive yazma kilidi; yalnızca yazan iş parçacığı tutar, diğerleri girdilerini sıraya bırakır
+        self.lock = threading.Lock()
+        self.queue = deque()
+        self.queue_lock = threading.Lock()
+        self.queued_memory = 0
+        # Açık (verisi gelmekte olan) girdi sayısı ve geçici dosyalarda bekleyen veri
+        self.active = 0
+        self.spooled = 0
+        self.directories = set()
+
+    def arcname(self, local_path):
+        """Yerel yedek yolunu arşivdeki girdi adına çevir"""
+        return os.path.relpath(local_path, self.base_path).replace(os.sep, '/')
+
+    def _zip_info(self, arcname, mtime):
+        # ZIP 1980 öncesi tarihleri saklayamaz
+        timestamp = max(mtime or time.time(), ZIP_MIN_TIMESTAMP)
+        info = zipfile.ZipInfo(arcname, time.localtime(timestamp)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        # Açıkça verilen ZipInfo'larda ZipFile'ın varsayılan seviyesi kullanılmaz
+        info._compresslevel = self.level
+        return info
+
+    def add_directory(self, local_path):
+        """Boş klasörlerin de geri yüklenebilmesi için klasör girdisi ekle"""
+        arcname = self.arcname(local_path).rstrip('/') + '/'
+        with self.queue_lock:
+            if arcname in self.directories:
+                return
+            self.directories.add(arcname)
+        info = self._zip_info(arcname, None)
+        info.compress_type = zipfile.ZIP_STORED
+        info.external_attr = (0o40755 << 16) | 0x10
+        self._enqueue(info)
+
+    def add_file(self, source_path, arcname):
+        """Yerel bir dosyayı (veritabanı dökümü, manifest) arşive ekle"""
+        info = self._zip_info(arcname, os.path.getmtime(source_path))
+        with open(source_path, 'rb') as source:
+            self._set_compression(info, source.read(ENTROPY_SAMPLE_SIZE))
+            source.seek(0)
+            self.lock.acquire()
+            try:
+                self._copy(info, source, os.path.getsize(source_path))
+            finally:
+                self._release()
+
+    def _copy(self, info, source, size):
+        """Hazır veriyi arşive girdi olarak kopyala (kilit tutulurken çağrılır)"""
+        started = time.thread_time()
+        self.writer.begin(info, size)
+        target = ZipEntryStream(self.writer)
+        shutil.copyfileobj(source, target, HASH_CHUNK)
+        file_size, compress_size = target.close()
+        self.policy.record(target.store, file_size, compress_size, time.thread_time() - started)
+
+    def _enqueue(self, info, source=None, reserved=0):
+        """Girdiyi arşive yazılmak üzere sıraya al; arşive yazan yoksa sırayı hemen yaz
+
+        `reserved` girdi indirilirken geçici dosya payı olarak ayrılan boyuttur,
+        burada gerçek boyutla değiştirilir.
+        """
+        size = memory = 0
+        if source is not None:
+            size = source.tell()
+            source.seek(0)
+            self._set_compression(info, source.read(ENTROPY_SAMPLE_SIZE))
+            source.seek(0)
+            if size <= ZIP_MEMORY_BUFFER:
+                with self.queue_lock:
+                    if self.queued_memory + size <= ZIP_QUEUE_MEMORY:
+                        memory = size
+                        self.queued_memory += memory
+                if not memory:
+                    source.rollover()
+            with self.queue_lock:
+                self.spooled += (0 if memory else size) - reserved
+        self.queue.append((info, source, size, memory))
+        self._flush_queue()
+
+    def _write_queue(self):
+        """Sırada bekleyen girdileri arşive yaz (kilit tutulurken çağrılır)"""
+        while self.queue:
+            info, source, size, memory = self.queue.popleft()
+            if source is None:
+                self.writer.add_directory(info)
+                continue
+            with source:
+                self._copy(info, source, size)
+            with self.queue_lock:
+                if memory:
+                    self.queued_memory -= memory
+                else:
+                    self.spooled -= size
+
+    def _flush_queue(self):
+        # Kilit doluysa tutan iş parçacığı bırakmadan önce sırayı yazar; bıraktıktan sonra sıra yeniden kontrol edilir
+        while self.queue and self.lock.acquire(blocking=False):
+            self._release()
+
+    def _release(self):
+        """Sırayı yazıp kilidi bırak"""
+        try:
+            self._write_queue()
+        finally:
+            self.lock.release()
+        self._flush_queue()
+
+    @contextmanager
+    def entry(self, local_path, size, mtime):
+        """Dosya verisinin yazılacağı arşiv girdisini aç
+
+        Büyük dosya yalnızca başka açık girdi yokken doğrudan yazılır; aksi
+        halde arşiv kilidi dosyanın ağdan inişi boyunca tutulur ve diğer
+        girdiler onu bekler. Geçici dosyalarda bekleyen veri ZIP_SPOOL_LIMIT'i
+        aşacaksa girdi arşivin boşalmasını bekleyip doğrudan yazılır.
+        Blok içinde hata oluşursa girdi arşive eklenmez, böylece yeniden
+        deneme aynı dosyayı baştan yazabilir.
+        """
+        info = self._zip_info(self.arcname(local_path), mtime)
+        large = size is None or size > ZIP_MEMORY_BUFFER
+        with self.queue_lock:
+            alone = not self.active
+            self.active += 1
+        try:
+            yield from self._entry(info, size, large, alone)
+        finally:
+            with self.queue_lock:
+                self.active -= 1
+
+    def _entry(self, info, size, large, alone):
+        direct = large and alone and not self.queue and self.lock.acquire(blocking=False)
+        reserved = 0
+        if large and not direct:
+            with self.queue_lock:
+                if self.spooled + (size or 0) <= ZIP_SPOOL_LIMIT:
+                    reserved = size or 0
+                    self.spooled += reserved
+            if not reserved and size:
+                self.lock.acquire()
+                direct = True
+        if direct and not self.writer.fits(info.filename, size):
+            # Parçaya bölünmesi gerekebilecek girdi geri alınamayacağından önce geçici dosyaya alınır
+            self._release()
+            direct = False
+        if direct:
+            try:
+                # Veri henüz gelmediğinden entropi örneği alınamaz, karar uzantıyla verilir
+                store = self._set_compression(info)
+                started = time.thread_time()
+                self.writer.begin(info, size)
+                target = ZipEntryStream(self.writer)
+                try:
+                    yield target
+                except BaseException:
+                    self.writer.discard()
+                    raise
+                file_size, compress_size = target.close()
+                self.policy.record(store, file_size, compress_size, time.thread_time() - started)
+            finally:
+                self._release()
+            return
+
+        spool = tempfile.SpooledTemporaryFile(ZIP_MEMORY_BUFFER)
+        try:
+            yield spool
+        except BaseException:
+            spool.close()
+            with self.queue_lock:
+                self.spooled -= reserved
+            raise
+        self._enqueue(info, spool, reserved)
+
+    def _set_compression(self, info, sample=None):
+        store = self.policy.should_store(info.filename, sample)
+        info.compress_type = zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED
+        return store
+
+    def close(self, finish=True, hashes=None):
+        """Arşivi kapat, arşiv dizinini yaz; parçalı arşivde parça dizinini yazıp yolunu döndür
+
+        `finish` False ise (yarıda kalan iş) arşiv ve parça dizinleri yazılmaz.
+        """
+        with self.lock:
+            if self.writer is None:
+                return None
+            if finish:
+                self._write_queue()
+            while self.queue:
+                source = self.queue.popleft()[1]
+                if source is not None:
+                    source.close()
+            writer, self.writer = self.writer, None
+            written = writer.close()
+            if not finish:
+                if self.volumes:
+                    self.volumes.hasher.shutdown(wait=False)
+                return None
+
+            index = ArchiveIndex.create(self.zip_path, 'zip', hashes)
+            try:
+                for volume, infos in written:
+                    index.add_members(volume, infos, self.volumes.parts if self.volumes else None)
+            finally:
+                index.close()
+            if not self.volumes:
+                return self.zip_path
+            return self.volumes.save()
+
+
+class ArchiveIndex:
+    """Arşivin yanına yazılan, girdilerin konumlarını tutan SQLite dizini
+
+    `backup_X.zip` (ya da parçalı arşivde `backup_X.001.zip`...) için dizin
+    `backup_X.index.db` olarak yazılır. Her girdinin yolu, boyutu, zamanı,
+    CRC/özeti, bulunduğu parça ve parça içindeki konumu tutulur; klasörler
+    ayrı bir tabloda yer alır. Böylece arşiv açılmadan içerik klasör klasör
+    listelenebilir ve tek bir dosya merkezi dizin taranmadan, doğrudan
+    konumundan okunarak çıkarılabilir.
+    """
+
+    def __init__(self, path, conn):
+        self.path = path
+        self.conn = conn
+        self.rows = []
+        self.directories = set()
+        self.hashes = {}
+        self.archive_format = None
+        # Sıkıştırılmış TAR'da en son okunan parçanın açık akışı: [parça yolu, kapatıcı, akış, konum]
+        self.tar_stream = None
+
+    @staticmethod
+    def path_for(archive_path):
+        """Arşiv, parça dizini ya da dizin dosyası yolundan dizin dosyasının yolunu bul"""
+        suffixes = ['.index.db', '.volumes.json'] + sorted({ext for ext, _ in ARCHIVE_FORMATS.values()},
+                                                            key=len, reverse=True)
+        for suffix in suffixes:
+            if archive_path.endswith(suffix):
+                archive_path = archive_path[:-len(suffix)]
+                break
+        return archive_path + '.index.db'
+
+    @classmethod
+    def create(cls, archive_path, archive_format, hashes=None):
+        """Yeni (boş) bir dizin oluştur"""
+        path = cls.path_for(archive_path)
+        if os.path.exists(path):
+            os.remove(path)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.executescript('''
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE directories (path TEXT PRIMARY KEY, parent TEXT NOT NULL, name TEXT NOT NULL);
+            CREATE TABLE entries (
+                path TEXT PRIMARY KEY, parent TEXT NOT NULL, name TEXT NOT NULL,
+                size INTEGER, mtime INTEGER, crc INTEGER, hash TEXT,
+                volume TEXT NOT NULL, offset INTEGER NOT NULL, compressed_size INTEGER, method TEXT NOT NULL,
+                part_of TEXT, part_offset INTEGER
+            );
+        ''')
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ('format', archive_format), ('created', datetime.now().isoformat(timespec='seconds'))])
+        index = cls(path, conn)
+        index.hashes = hashes or {}
+        index.archive_format = archive_format
+        return index
+
+    @classmethod
+    def open(cls, archive_path):
+        """Var olan dizini salt okunur aç"""
+        path = cls.path_for(archive_path)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Arşiv dizini bulunamadı: {path}")
+        conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        return cls(path, conn)
+
+    @staticmethod
+    def _split(path):
+        parent, _, name = path.rstrip('/').rpartition('/')
+        return parent, name
+
+    def _add_directory(self, path):
+        while path and path not in self.directories:
+            self.directories.add(path)
+            parent, name = self._split(path)
+            self.conn.execute("INSERT OR IGNORE INTO directories (path, parent, name) VALUES (?, ?, ?)",
+                              (path, parent, name))
+            path = parent
+
+    def add_members(self, volume, infos, parts=None):
+        """Bir arşive (parçaya) yazılan ZIP/TAR girdilerini dizine ekle"""
+        part_names = {}
+        for original, entries in (parts or {}).items():
+            for _volume_number, part_name, offset, _length in entries:
+                part_names[part_name] = (original, offset)
+
+        for info in infos:
+            if isinstance(info, zipfile.ZipInfo):
+                if info.is_dir():
+                    self._add_directory(info.filename.rstrip('/'))
+                    continue
+                path, size, crc = info.filename, info.file_size, info.CRC
+                mtime = int(time.mktime(info.date_time + (0, 0, -1)))
+                offset, compressed_size = info.header_offset, info.compress_size
+                method = 'stored' if info.compress_type == zipfile.ZIP_STORED else 'deflate'
+            else:
+                if info.isdir():
+                    self._add_directory(info.name.rstrip('/'))
+                    continue
+                path, size, crc, mtime = info.name, info.size, None, int(info.mtime)
+                offset, compressed_size = info.offset_data, None
+                method = self.archive_format
+
+            part_of, part_offset = part_names.get(path, (None, None))
+            parent, name = self._split(path)
+            self._add_directory(self._split(part_of)[0] if part_of else parent)
+            self.rows.append((path, parent, name, size, mtime, crc, self.hashes.get(part_of or path), volume,
+                              offset, compressed_size, method, part_of, part_offset))
+            if len(self.rows) >= INDEX_BATCH_SIZE:
+                self._flush()
+
+    def _flush(self):
+        self.conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                              self.rows)
+        self.rows = []
+
+    def close(self):
+        """Bekleyen satırları yaz, sorgu indekslerini oluşturup dizini kapat"""
+        self._flush()
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_part_of ON entries (part_of)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent)")
+        self.conn.commit()
+        self.conn.close()
+
+    def summary(self):
+        """Dizindeki dosya sayısı ve toplam boyut"""
+        files, total = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE part_of IS NULL").fetchone()
+        split_files, split_total = self.conn.execute(
+            "SELECT COUNT(DISTINCT part_of), COALESCE(SUM(size), 0) FROM entries WHERE part_of IS NOT NULL").fetchone()
+        return {'files': files + split_files, 'bytes': total + split_total}
+
+    def list_dir(self, parent=''):
+        """Bir klasörün alt klasörlerini ve dosyalarını (ad, boyut, zaman) döndür
+
+        Parçalara bölünmüş dosyalar tek bir dosya olarak listelenir.
+        """
+        directories = [row[0] for row in self.conn.execute(
+            "SELECT name FROM directories WHERE parent = ? ORDER BY name", (parent,))]
+        files = self.conn.execute(
+            "SELECT name, size, mtime FROM entries WHERE parent = ? AND part_of IS NULL", (parent,)).fetchall()
+        for part_of, size, mtime in self.conn.execute(
+                "SELECT part_of, SUM(size), MAX(mtime) FROM entries WHERE parent = ? AND part_of IS NOT NULL "
+                "GROUP BY part_of", (parent,)):
+            files.append((self._split(part_of)[1], size, mtime))
+        return directories, sorted(files)
+
+    def extract(self, path, target_dir):
+        """Tek bir dosyayı arşivin ilgili parçasından doğrudan okuyup `target_dir` altına yaz
+
+        ZIP'te girdinin yerel başlığına atlanıp yalnızca o girdinin verisi
+        okunur ve CRC ile doğrulanır; sıkıştırılmamış TAR'da veri doğrudan
+        konumundan okunur. Sıkıştırılmış TAR akışlarında konuma kadar açılan
+        veri atlanır.
+        """
+        rows = self.locate(path)
+        target_path = os.path.join(target_dir, *path.split('/'))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with open(target_path + '.part', 'wb') as target:
+            self.copy(rows, target)
+        os.replace(target_path + '.part', target_path)
+        return target_path
+
+    def locate(self, path):
+        """Dosyanın arşivdeki kayıtlarını (bölünmüşse parçalarını sırasıyla) bul; yoksa KeyError"""
+        query = "SELECT volume, offset, size, compressed_size, method, crc FROM entries WHERE "
+        rows = self.conn.execute(query + "path = ? AND part_of IS NULL", (path,)).fetchall()
+        if not rows:
+            rows = self.conn.execute(query + "part_of = ? ORDER BY part_offset", (path,)).fetchall()
+        if not rows:
+            raise KeyError(f"Arşivde bulunamadı: {path}")
+        return rows
+
+    def copy(self, rows, target):
+        """`locate` ile bulunan dosyanın verisini arşivden okuyup `target`'a yaz"""
+        archive_dir = os.path.dirname(self.path)
+        for volume, *row in rows:
+            self._copy_entry(os.path.join(archive_dir, volume), *row, target)
+
+    def _copy_entry(self, volume_path, offset, size, compressed_size, method, crc, target):
+        volume_name = os.path.basename(volume_path)
+        if method in ('stored', 'deflate'):
+            with open(volume_path, 'rb') as source:
+                source.seek(offset)
+                header = ZIP_LOCAL_HEADER.unpack(source.read(ZIP_LOCAL_HEADER.size))
+                if header[0] != b'PK\x03\x04':
+                    raise ValueError(f"{volume_name}: girdi başlığı beklenen konumda değil")
+                # Ad ve ek alan uzunlukları başlığın son iki alanıdır
+                source.seek(header[-2] + header[-1], os.SEEK_CUR)
+                decompressor = zlib.decompressobj(-15) if method == 'deflate' else None
+                remaining, checksum = compressed_size, 0
+                while remaining > 0:
+                    data = source.read(min(HASH_CHUNK, remaining))
+                    if not data:
+                        raise ValueError(f"{volume_name}: girdi verisi eksik")
+                    remaining -= len(data)
+                    if decompressor:
+                        data = decompressor.decompress(data)
+                    checksum = zlib.crc32(data, checksum)
+                    target.write(data)
+                if decompressor:
+                    data = decompressor.flush()
+                    checksum = zlib.crc32(data, checksum)
+                    target.write(data)
+            if crc is not None and checksum != crc:
+                raise ValueError(f"{volume_name}: CRC uyuşmuyor")
+            return
+
+        if method == 'tar':
+            with self._open_tar_stream(volume_path, method) as source:
+                source.seek(offset)
+                self._copy_stream(source, size, target, volume_name)
+            return
+
+        # Sıkıştırılmış akışta rastgele erişim yok; konuma kadar açılan veri atlanır. Girdiler çoğunlukla
+        # arşivdeki sırayla istendiğinden akış açık tutulup kaldığı yerden ileri sarılır.
+        stream = self.tar_stream
+        if stream is None or stream[0] != volume_path or stream[3] > offset:
+            self.close_reader(keep_connection=True)
+            closer = ExitStack()
+            stream = [volume_path, closer, closer.enter_context(self._open_tar_stream(volume_path, method)), 0]
+            self.tar_stream = stream
+        try:
+            self._copy_stream(stream[2], offset - stream[3], None, volume_name)
+            self._copy_stream(stream[2], size, target, volume_name)
+        except BaseException:
+            self.close_reader(keep_connection=True)
+            raise
+        stream[3] = offset + size
+
+    def close_reader(self, keep_connection=False):
+        """Okuma için açık tutulan TAR akışını (ve istenirse dizin bağlantısını) kapat"""
+        if self.tar_stream is not None:
+            self.tar_stream[1].close()
+            self.tar_stream = None
+        if not keep_connection:
+            self.conn.close()
+
+    @staticmethod
+    @contextmanager
+    def _open_tar_stream(volume_path, method):
+        """TAR parçasını (gerekirse açarak) baştan okunacak bir akış olarak aç"""
+        with open(volume_path, 'rb') as raw:
+            if method == 'tar.xz':
+                with lzma.LZMAFile(raw) as source:
+                    yield source
+            elif method == 'tar.zst':
+                if zstandard is None:
+                    raise Exception("tar.zst için 'zstandard' paketi gerekli (pip install zstandard)")
+                with zstandard.ZstdDecompressor().stream_reader(raw) as source:
+                    yield source
+            else:
+                yield raw
+
+    @staticmethod
+    def _copy_stream(source, length, target, volume_name):
+        """Akıştan `length` bayt oku; hedef yoksa okunan veri atlanır"""
+        while length > 0:
+            data = source.read(min(HASH_CHUNK, length))
+            if not data:
+                raise ValueError(f"{volume_name}: girdi verisi eksik")
+            length -= len(data)
+            if target is not None:
+                target.write(data)
+
+    def verify(self, workers=1):
+        """Tüm dosyaları arşivden okuyup boyut, CRC ve özetlerini dizindekilerle karşılaştır
+
+        ZIP ve sıkıştırılmamış TAR'da dosyalar konumlarından okunarak paralel
+        özetlenir. Sıkıştırılmış TAR parçaları baştan sona tek geçişte
+        açılır; parçalar birbirinden bağımsızsa paralel, bölünmüş dosya varsa
+        sırayla işlenir. (yol, sorun) listesi döndürülür.
+        """
+        files = {}
+        for logical, volume, offset, size, compressed_size, method, crc, digest in self.conn.execute(
+                "SELECT COALESCE(part_of, path), volume, offset, size, compressed_size, method, crc, hash "
+                "FROM entries ORDER BY COALESCE(part_of, path), part_offset"):
+            entry = files.setdefault(logical, {'rows': [], 'size': 0, 'hash': digest})
+            entry['rows'].append((volume, offset, size, compressed_size, method, crc))
+            entry['size'] += size or 0
+        if not files:
+            return []
+
+        archive_dir = os.path.dirname(self.path)
+        method = next(iter(files.values()))['rows'][0][4]
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            if method in ('tar.xz', 'tar.zst'):
+                by_volume = {}
+                for logical, entry in files.items():
+                    for volume, offset, size, *_rest in entry['rows']:
+                        by_volume.setdefault(volume, []).append((offset, size, logical))
+                volumes = sorted(by_volume)
+                split = any(len(entry['rows']) > 1 for entry in files.values())
+                groups = [volumes] if split else [[volume] for volume in volumes]
+
+                def scan(group):
+                    # Bölünmüş dosyanın parçaları sırayla geldiği için özetleyici parçalar arasında taşınır
+                    writers = {}
+                    for volume in group:
+                        try:
+                            with self._open_tar_stream(os.path.join(archive_dir, volume), method) as source:
+                                position = 0
+                                for offset, size, logical in sorted(by_volume[volume]):
+                                    writer = writers.setdefault(logical, HashingWriter())
+                                    self._copy_stream(source, offset - position, None, volume)
+                                    # Önceki parçası okunamayan dosyanın verisi atlanır
+                                    self._copy_stream(source, size, None if isinstance(writer, Exception) else writer,
+                                                      volume)
+                                    position = offset + size
+                        except Exception as e:
+                            for _offset, _size, logical in by_volume[volume]:
+                                writers[logical] = e
+                    return writers
+
+                for writers in pool.map(scan, groups):
+                    results.update(writers)
+            else:
+                def digest(entry):
+                    writer = HashingWriter()
+                    try:
+                        for volume, *row in entry['rows']:
+                            self._copy_entry(os.path.join(archive_dir, volume), *row, writer)
+                    except Exception as e:
+                        return e
+                    return writer
+
+                results = dict(zip(files, pool.map(digest, files.values())))
+
+        problems = []
+        for logical, entry in files.items():
+            result = results.get(logical)
+            if result is None:
+                problem = "arşivde bulunamadı"
+            elif isinstance(result, Exception):
+                problem = str(result)
+            elif result.size != entry['size']:
+                problem = "boyut uyuşmuyor"
+            elif entry['hash'] and result.hexdigest() != entry['hash']:
+                problem = "özet uyuşmuyor"
+            else:
+                continue
+            problems.append((logical, problem))
+        return problems
+
+
+class ArchiveVolumes:
+    """Parçalı arşivin parça adlarını, dağılımını ve dizin dosyasını yöneten sınıf
+
+    `backup_X.zip` için parçalar `backup_X.001.zip`, `backup_X.002.zip`...
+    adlarıyla, dizin `backup_X.volumes.json` olarak yazılır. Dizin her
+    parçanın boyutunu, özetini ve içerdiği girdileri, parça sınırına
+    denk gelip bölünen dosyaların da parçalarını sırasıyla tutar. Parçalar
+    `ZipVolumeWriter` / `TarVolumeWriter` tarafından diske yazılan gerçek
+    bayt sayısına göre doldurulur.
+    """
+
+    def __init__(self, output_path, archive_format, volume_size):
+        self.archive_format = archive_format
+        # Parça en azından kapanış payını, bir girdi başlığını ve bir miktar veri alabilmeli
+        self.volume_size = max(int(volume_size), VOLUME_RESERVE * 2)
+        # Parçaya yazılabilecek en fazla veri; kalanı kapanış kayıtları ve sıkıştırma çerçevesi için ayrılır
+        self.budget = self.volume_size - VOLUME_RESERVE
+        self.min_part = min(VOLUME_MIN_PART, self.budget // 8)
+        self.extension = ARCHIVE_FORMATS[archive_format][0]
+        self.base = output_path[:-len(self.extension)] if output_path.endswith(self.extension) else output_path
+        self.index_path = self.base + '.volumes.json'
+        self.volumes = []
+        self.parts = {}
+        # Biten parçaların özeti arka planda hesaplanır
+        self.hasher = ThreadPoolExecutor(max_workers=1)
+
+    def next_path(self):
+        return f"{self.base}.{len(self.volumes) + 1:03d}{self.extension}"
+
+    def add(self, volume_path, entries):
+        """Yazımı biten parçayı dizine ekle ve özetini arka planda hesaplat"""
+        self.volumes.append({'name': os.path.basename(volume_path), 'size': os.path.getsize(volume_path),
+                             'entries': entries, 'hash': self.hasher.submit(DedupRepository.hash_file, volume_path)})
+
+    def save(self):
+        """Parça özetlerini bekleyip dizin dosyasını yaz, yolunu döndür"""
+        for volume in self.volumes:
+            volume['hash'] = volume['hash'].result()
+        self.hasher.shutdown()
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': self.archive_format, 'volume_size': self.volume_size,
+                       'created': datetime.now().isoformat(timespec='seconds'),
+                       'volumes': self.volumes, 'parts': self.parts}, f, ensure_ascii=False)
+        return self.index_path
+
+
+class CompressionPolicy:
+    """Arşive eklenecek dosyanın sıkıştırılıp sıkıştırılmayacağına karar veren politika
+
+    Uzantısı bilinen sıkıştırılmış biçimler (resim, video, arşiv) ve ilk
+    bloğunun entropisi yüksek olan dosyalar sıkıştırılmadan saklanır.
+    Çalışma boyunca kazanılan bayt ve harcanan CPU süresi toplanır.
+    `compress` False ise (sıkıştırmasız ZIP) tüm dosyalar saklanır.
+    """
+
+    def __init__(self, compress=True):
+        self.compress = compress
+        self.lock = threading.Lock()
+        self.stats = {'compressed_files': 0, 'input_bytes': 0, 'output_bytes': 0, 'cpu_seconds': 0.0,
+                      'stored_files': 0, 'stored_bytes': 0}
+
+    @staticmethod
+    def entropy(sample):
+        """Örneğin bayt başına Shannon entropisini (0-8 bit) hesapla"""
+        total = len(sample)
+        return -sum(count / total * math.log2(count / total) for count in Counter(sample).values())
+
+    def should_store(self, name, sample=None):
+        """Dosya sıkıştırılmadan saklanmalıysa True döndür"""
+        if not self.compress:
+            return True
+        extension = name.rsplit('.', 1)[-1].lower() if '.' in os.path.basename(name) else ''
+        if extension in COMPRESSED_EXTENSIONS:
+            return True
+        return bool(sample) and len(sample) >= ENTROPY_MIN_SAMPLE and self.entropy(sample) >= ENTROPY_THRESHOLD
+
+    def record(self, stored, input_bytes, output_bytes, cpu_seconds=0.0):
+        with self.lock:
+            if stored:
+                self.stats['stored_files'] += 1
+                self.stats['stored_bytes'] += input_bytes
+            else:
+                self.stats['compressed_files'] += 1
+                self.stats['input_bytes'] += input_bytes
+                self.stats['output_bytes'] += output_bytes
+                self.stats['cpu_seconds'] += cpu_seconds
+
+    def summary(self):
+        stats = self.stats
+        saved = stats['input_bytes'] - stats['output_bytes']
+        return (f"📊 Sıkıştırma: {stats['compressed_files']} dosya sıkıştırıldı "
+                f"({format_size(stats['input_bytes'])} → {format_size(stats['output_bytes'])}, "
+                f"{format_size(max(saved, 0))} kazanç, {stats['cpu_seconds']:.1f} sn CPU); "
+                f"{stats['stored_files']} dosya sıkıştırılmadan saklandı ({format_size(stats['stored_bytes'])})")
+
+
+class JobJournal:
+    """Yedekleme işinin ilerlemesini JSON satırları olarak kaydeden iş günlüğü
+
+    Günlük ~/.backupmaster/jobs altında sunucu başına tutulur. Alınan dizin
+    listeleri ve tamamlanan dosyalar her biri bir satır olarak eklenir; iş
+    başarıyla bitince günlük silinir. Yarıda kalan bir iş yeniden
+    başlatıldığında listelenmiş dizinler tekrar taranmaz, tamamlanmış dosyalar
+    tekrar indirilmez.
+    """
+
+    def __init__(self, server_info, journal_dir=None):
+        journal_dir = journal_dir or os.path.join(STATE_DIR, "jobs")
+        os.makedirs(journal_dir, exist_ok=True)
+        self.journal_path = os.path.join(journal_dir, f"{server_state_key(server_info)}.jsonl")
+        self.lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """Yarım kalmış işin durumunu oku, yoksa None döndür"""
+        if not os.path.exists(self.journal_path):
+            return None
+
+        state = {'listings': {}, 'done': {}}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Çökme anında yarım yazılmış son satır
+                    continue
+                event = record.pop('event')
+                if event == 'start':
+                    state.update(record)
+                elif event == 'files_root':
+                    state['files_root'] = record['path']
+                elif event == 'listing':
+                    state['listings'][record['path']] = record['items']
+                elif event == 'done':
+                    state['done'][record['path']] = record['entry']
+        return state if 'backup_path' in state else None
+
+    def start(self, backup_path, backup_config):
+        """Yeni bir iş için günlüğü sıfırla"""
+        self.close()
+        self._file = open(self.journal_path, 'w', encoding='utf-8')
+        self.record('start', backup_path=backup_path, target_path=backup_config['target_path'],
+                    type=backup_config.get('type'), created=datetime.now().isoformat(timespec='seconds'))
+
+    def resume(self):
+        """Var olan günlüğe eklemeye devam et"""
+        self.close()
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+
+    def record(self, event, **fields):
+        if self._file is None:
+            return
+        line = json.dumps(dict(event=event, **fields), ensure_ascii=False)
+        with self.lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finish(self):
+        """İş tamamlandı; günlüğü sil"""
+        self.close()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+class FileFilter:
+    """Tarama sırasında uygulanan derlenmiş dahil etme/hariç tutma kuralları
+
+    Kurallar noktalı virgül, virgül ya da boşlukla ayrılır:
+      *.php           dosya adına uyan glob
+      wp-content/*    '/' içeren glob yolun sonuna göre eşleşir ('/' ile başlarsa kökten)
+      cache/          '/' ile biten kural yalnızca klasörlere uyar
+      <50MB, >1KB     dosya boyutu sınırı
+      age<30d, age>1y değişiklik zamanı sınırı (s, m, h, d, w, y)
+    Dahil etme kuralları yalnızca dosyalara uygulanır; hariç tutma kurallarına
+    (exclude ya da '!' ile başlayan kural) uyan klasörlerin içine inilmez,
+    hariç tutma listesindeki boyut/yaş sınırları ise tersine okunur.
+    Globlar tek bir düzenli ifadede birleştirilir, öğe başına tek eşleştirme yapılır.
+    """
+
+    # fnmatch gibi, büyük/küçük harf duyarlılığı yerel dosya sistemine uyar
+    flags = re.IGNORECASE if os.path.normcase('A') == 'a' else 0
+
+    def __init__(self, include='*.*', exclude=''):
+        include_globs, exclude_globs = [], []
+        self.min_size = self.max_size = None
+        self.newer_than = self.older_than = None
+        now = time.time()
+
+        rules = [(rule, False) for rule in FILTER_SEPARATOR_RE.split(include or '')]
+        rules += [(rule.lstrip('!'), True) for rule in FILTER_SEPARATOR_RE.split(exclude or '')]
+        for rule, excluded in rules:
+            if rule.startswith('!'):
+                rule, excluded = rule[1:], True
+            if not rule:
+                continue
+            size_match = SIZE_RULE_RE.match(rule)
+            age_match = AGE_RULE_RE.match(rule)
+            # Hariç tutma listesindeki sınır tersine çevrilir: ">500MB" büyük dosyaları dışarıda bırakır
+            flip = {'<': '>', '>': '<'} if excluded else {'<': '<', '>': '>'}
+            if size_match:
+                limit = float(size_match.group(2)) * SIZE_UNITS[size_match.group(3).upper()]
+                if flip[size_match.group(1)] == '<':
+                    self.max_size = limit
+                else:
+                    self.min_size = limit
+            elif age_match:
+                cutoff = now - float(age_match.group(2)) * AGE_UNITS[age_match.group(3).lower()]
+                if flip[age_match.group(1)] == '<':
+                    self.newer_than = cutoff
+                else:
+                    self.older_than = cutoff
+            elif excluded:
+                exclude_globs.append(rule)
+            elif rule not in ('*', '*.*'):
+                include_globs.append(rule)
+
+        self.exclude_globs = exclude_globs
+        self.include = self._compile(include_globs)
+        self.exclude = self._compile([glob for glob in exclude_globs if not glob.endswith('/')])
+        self.exclude_dirs = self._compile([glob for glob in exclude_globs if glob.endswith('/')])
+
+    def _compile(self, globs):
+        """Globları tek bir düzenli ifadede birleştir"""
+        if not globs:
+            return None
+        patterns = []
+        for glob in globs:
+            glob = glob.rstrip('/')
+            if glob.startswith('/'):
+                patterns.append(fnmatch.translate(glob.lstrip('/')))
+            else:
+                # Adla eşleşen kural her derinlikte uygulanır
+                patterns.append('(?:.*/)?' + fnmatch.translate(glob))
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), self.flags)
+
+    def accepts(self, item):
+        """Öğe yedeğe alınmalı mı"""
+        path = item['path']
+        if path.startswith('./'):
+            path = path[2:]
+        path = path.lstrip('/')
+        if self.exclude and self.exclude.match(path):
+            return False
+        if item['is_dir']:
+            return not (self.exclude_dirs and self.exclude_dirs.match(path))
+        if self.include and not self.include.match(path):
+            return False
+        size, mtime = item['size'], item['mtime']
+        if size is not None:
+            if self.max_size is not None and size >= self.max_size:
+                return False
+            if self.min_size is not None and size <= self.min_size:
+                return False
+        if mtime is not None:
+            if self.newer_than is not None and mtime < self.newer_than:
+                return False
+            if self.older_than is not None and mtime > self.older_than:
+                return False
+        return True
+
+
+class BandwidthLimiter:
+    """Aktarım hızını sınırlayan, iş parçacıkları arasında paylaşılan kova
+
+    Kota saniyede `rate` bayt dolar ve en fazla BANDWIDTH_BURST_SECONDS
+    saniyelik hız kadar birikir. Aktarılan veri kotadan düşülür; kota eksiye
+    düşerse çağıran işçi borç kapanana kadar bekler. Hız 0 ise sınır yoktur
+    ve hız çalışma sırasında `set_rate` ile değiştirilebilir.
+    """
+
+    registry_lock = threading.Lock()
+
+    def __init__(self, rate=0):
+        self.lock = threading.Lock()
+        self.rate = 0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Saniyedeki bayt sınırını değiştir (0 = sınırsız)"""
+        with self.lock:
+            self._refill()
+            self.rate = max(0, int(rate or 0))
+            self.tokens = min(self.tokens, self.rate * BANDWIDTH_BURST_SECONDS)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self.tokens = min(self.rate * BANDWIDTH_BURST_SECONDS, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def consume(self, byte_count, stopped=None):
+        """Aktarılan baytları kotadan düş, gerekirse kota yetene kadar bekle"""
+        with self.lock:
+            if not self.rate:
+                return
+            self._refill()
+            self.tokens -= byte_count
+        while True:
+            with self.lock:
+                if not self.rate:
+                    return
+                self._refill()
+                if self.tokens >= 0:
+                    return
+                wait = -self.tokens / self.rate
+            if stopped and stopped():
+                return
+            time.sleep(min(wait, BANDWIDTH_MAX_SLEEP))
+
+
+# Aynı anda çalışan tüm yedekleme işlerinin paylaştığı genel sınır
+GLOBAL_BANDWIDTH_LIMITER = BandwidthLimiter()
+# server_state_key -> o sunucudaki işlerin paylaştığı sınırlayıcı
+SERVER_BANDWIDTH_LIMITERS = {}
+
+
+class ConcurrencyController:
+    """Aktarım bağlantılarının sayısını sunucunun kaldırabildiği düzeyde tutar
+
+    Her ölçüm aralığında toplam verim artmaya devam ettikçe bir bağlantı
+    eklenir; eklenen bağlantı verimi artırmıyorsa geri alınır ve bir süre
+    sonra yeniden denenir. "421 Too many connections" ya da kanal reddi gibi
+    hatalarda sınır açık bağlantı sayısına indirilir. Bir çalışmada tekrar
+    tekrar sınıra takılındıysa bu tavan sunucu başına
+    ~/.backupmaster/concurrency.json içinde saklanır. Sonraki yedeklemeler
+    sunucu kaydındaki bağlantı sayısıyla başlar; öğrenilen tavan yalnızca
+    bu sayıyı sınırlar.
+    """
+
+    file_lock = threading.Lock()
+
+    def __init__(self, server_info, initial, maximum, log_callback=None, state_path=None):
+        self.state_path = state_path or os.path.join(STATE_DIR, "concurrency.json")
+        self.key = server_state_key(server_info)
+        self.log_callback = log_callback
+        self.lock = threading.Lock()
+        self.maximum = maximum
+        self.ceiling = maximum
+
+        learned = self._load().get(self.key, {})
+        if learned.get('ceiling') and time.time() - learned.get('updated', 0) < CONTROLLER_CEILING_TTL:
+            self.ceiling = max(1, min(maximum, learned['ceiling']))
+        self.limit = max(1, min(self.ceiling, initial))
+        if self.limit < initial:
+            self._log(f"🚦 Sunucunun öğrenilmiş bağlantı tavanı {self.ceiling}, eşzamanlı bağlantı {initial} yerine "
+                      f"{self.limit} olarak başlıyor")
+        # Bu çalışmada görülen sınır hatası sayısı; tavan ancak tekrar eden hatalarla kaydedilir
+        self.limit_hits = 0
+
+        self.active = 0
+        self.open_connections = 0
+        self.window_bytes = 0
+        self.window_start = time.monotonic()
+        self.previous_rate = None
+        self.probing = False
+        self.settled = False
+        self.settled_intervals = 0
+
+    def _log(self, message):
+        if self.log_callback:
+            try:
+                self.log_callback(message)
+            except:
+                pass
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Tekrar eden sınır hatalarıyla öğrenilen tavanı sonraki yedeklemeler için kaydet
+
+        Tek seferlik bir hata tavanı yalnızca bu çalışma için düşürür;
+        önceden kaydedilmiş tavan süresi dolana kadar geçerli kalır.
+        """
+        if self.limit_hits < CONTROLLER_CEILING_HITS or self.ceiling >= self.maximum:
+            return
+        with ConcurrencyController.file_lock:
+            data = self._load()
+            data[self.key] = {
+                'ceiling': self.ceiling,
+                'updated': time.time()
+            }
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.state_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def add_bytes(self, byte_count):
+        with self.lock:
+            self.window_bytes += byte_count
+
+    def try_acquire(self):
+        """Sınırın altındaysa yeni bir bağlantı için yer ayır"""
+        with self.lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+    def should_release(self):
+        """Sınır düşürüldüyse çağıran işçinin yerini bırakmasını iste"""
+        with self.lock:
+            if self.active <= self.limit:
+                return False
+            self.active -= 1
+            return True
+
+    def connected(self):
+        with self.lock:
+            self.open_connections += 1
+
+    def disconnected(self, holds_slot=True):
+        with self.lock:
+            self.open_connections -= 1
+            if holds_slot:
+                self.active -= 1
+
+    def connection_error(self, error, refused=False):
+        """Hata sunucunun bağlantı sınırını gösteriyorsa sınırı ve tavanı düşür
+
+        refused: yeni oturum açılamadı; iletiden bağımsız olarak sınır kabul edilir.
+        """
+        if not refused and not CONNECTION_LIMIT_RE.search(str(error)):
+            return False
+        with self.lock:
+            self.limit_hits += 1
+            self.ceiling = max(1, min(self.ceiling, self.open_connections))
+            changed = self.limit > self.ceiling
+            self.limit = min(self.limit, self.ceiling)
+            self.probing = False
+            self.settled = True
+            self.settled_intervals = 0
+            limit = self.limit
+        if changed:
+            self._log(f"🚦 Sunucu bağlantı sınırına ulaşıldı ({str(error)}), eşzamanlı bağlantı {limit} olarak düşürüldü")
+        return True
+
+    def evaluate(self, backlog):
+        """Ölçüm aralığı dolduysa verime göre sınırı bir artır ya da geri al"""
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.window_start
+            if elapsed < CONTROLLER_INTERVAL:
+                return
+            rate = self.window_bytes / elapsed
+            self.window_bytes = 0
+            self.window_start = now
+
+            # Bekleyen iş yokken ya da bağlantılar henüz açılmamışken ölçüm sınır hakkında bilgi vermez
+            if not backlog or rate == 0 or self.open_connections < self.limit:
+                return
+
+            message = None
+            if self.probing:
+                self.probing = False
+                if rate < self.previous_rate * (1 + CONTROLLER_MIN_GAIN):
+                    self.limit -= 1
+                    self.settled = True
+                    self.settled_intervals = 0
+                    message = f"🚦 Ek bağlantı verimi artırmadı, eşzamanlı bağlantı {self.limit} olarak kaldı"
+                else:
+                    self.settled = False
+                self.previous_rate = rate
+            elif self.limit < self.ceiling and (not self.settled or self.settled_intervals >= CONTROLLER_REPROBE_INTERVALS):
+                self.previous_rate = rate
+                self.limit += 1
+                self.probing = True
+                self.settled_intervals = 0
+                message = f"🚦 Verim {format_size(rate)}/sn, eşzamanlı bağlantı {self.limit} olarak deneniyor"
+            else:
+                self.settled_intervals += 1
+                self.previous_rate = rate
+
+        if message:
+            self._log(message)
+
+
+class ManifestManager:
+    """Tamamlanan yedeklerin dosya manifestlerini yönetir
+
+    Her manifest yedeklenen her dosya için [boyut, mtime, hash] bilgisini ve
+    dosyaların yerel konumunu (klasör ve/veya arşiv) tutar. Sunucu başına son
+    manifestin bir kopyası ~/.backupmaster/manifests altında saklanır.
+    """
+
+    def __init__(self, manifest_dir=None):
+        self.manifest_dir = manifest_dir or os.path.join(STATE_DIR, "manifests")
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    def _manifest_file(self, server_info):
+        return os.path.join(self.manifest_dir, f"{server_state_key(server_info)}.json")
+
+    def load_latest(self, server_info):
+        """Sunucunun son tamamlanan yedeğine ait manifesti yükle"""
+        manifest_file = self._manifest_file(server_info)
+        if not os.path.exists(manifest_file):
+            return None
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, server_info, manifest, backup_path):
+        """Manifesti yedek klasörüne ve sunucunun son manifesti olarak kaydet"""
+        manifest_path = os.path.join(backup_path, "manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        shutil.copyfile(manifest_path, self._manifest_file(server_info))
+        return manifest_path
+
+    def record_archive(self, server_info, archive_path, archive_format):
+        """Yedeğin yazıldığı arşivin gerçek yolunu, biçimini ve parçalarını sunucunun son manifestine işle
+
+        Manifest arşivin içine de eklendiğinden arşivden önce yazılır; arşiv
+        yolu (parçalı arşivde `.volumes.json`) ancak arşiv bitince bilinir.
+        """
+        manifest = self.load_latest(server_info)
+        if manifest is None:
+            return
+        volumes = None
+        if archive_path.endswith('.volumes.json'):
+            with open(archive_path, 'r', encoding='utf-8') as f:
+                volumes = [volume['name'] for volume in json.load(f)['volumes']]
+        manifest.update(archive_path=archive_path, archive_format=archive_format, archive_volumes=volumes)
+        with open(self._manifest_file(server_info), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+
+class TreeCache:
+    """Sunucunun son tam taramasını (dizin listelerini) diskte saklar
+
+    Liste ~/.backupmaster/trees altında sunucu başına sıkıştırılmış JSON
+    olarak tutulur; her dizin için dizinin mtime'ı ve öğeleri
+    [ad, klasör_mü, boyut, mtime] dizileri halinde saklanır. Önceki tarama
+    ilerlemenin ön boyutlandırılmasında, indirmeden değişiklik raporunda ve
+    mtime'ı değişmemiş dizinlerin yeniden listelenmemesinde kullanılır.
+    """
+
+    def __init__(self, server_info, cache_dir=None):
+        cache_dir = cache_dir or os.path.join(STATE_DIR, "trees")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_path = os.path.join(cache_dir, f"{server_state_key(server_info)}.json.gz")
+        self.lock = threading.Lock()
+        self.root = None
+        self.created = None
+        self.dirs = {}
+        # Bu çalışmada alınan listeler; tarama tamamlanınca önceki taramanın yerini alır
+        self.listings = {}
+
+    def load(self):
+        """Önceki taramayı oku; yoksa ya da okunamazsa False döndür"""
+        if not os.path.exists(self.cache_path):
+            return False
+        try:
+            with gzip.open(self.cache_path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            self.root, self.created, self.dirs = data['root'], data['created'], data['dirs']
+        except (OSError, ValueError, KeyError):
+            return False
+        return True
+
+    def _entries(self, path, compact):
+        return [make_item(os.path.join(path, name).replace('\\', '/'), bool(is_dir), size, mtime)
+                for name, is_dir, size, mtime in compact]
+
+    def lookup(self, path, dir_mtime):
+        """Dizinin mtime'ı önceki taramadakiyle aynıysa önceki listesini döndür"""
+        cached = self.dirs.get(path)
+        if dir_mtime is None or not cached or cached[0] != dir_mtime:
+            return None
+        return self._entries(path, cached[1])
+
+    def record(self, path, dir_mtime, entries):
+        compact = [[os.path.basename(entry['path']), int(entry['is_dir']), entry['size'], entry['mtime']]
+                   for entry in entries]
+        with self.lock:
+            self.listings[path] = [dir_mtime, compact]
+
+    def changes(self, file_filter=None):
+        """Önceki taramaya göre bu çalışmada (eklenen, silinen, değişen) dosyalar"""
+        return self.diff(self.files(file_filter), self.files(file_filter, current=True))
+
+    def save(self, root):
+        """Bu çalışmanın listelerini sunucunun son taraması olarak kaydet"""
+        data = {'root': root, 'created': datetime.now().isoformat(timespec='seconds'), 'dirs': self.listings}
+        temp_path = self.cache_path + '.tmp'
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.cache_path)
+
+    def files(self, file_filter=None, current=False):
+        """Önceki (current=True ise bu çalışmadaki) taramanın öğelerini filtreyle, hariç tutulan klasörlere inmeden döndür"""
+        dirs = self.listings if current else self.dirs
+        if self.root is None:
+            return []
+        items = []
+        pending = [self.root]
+        while pending:
+            path = pending.pop()
+            cached = dirs.get(path)
+            if not cached:
+                continue
+            entries = self._entries(path, cached[1])
+            if file_filter is not None:
+                entries = [entry for entry in entries if file_filter.accepts(entry)]
+            items.extend(entries)
+            pending.extend(entry['path'] for entry in entries if entry['is_dir'])
+        return items
+
+    def summary(self, file_filter=None):
+        """Önceki taramaya göre (öğe, dosya, bayt) tahmini"""
+        items = self.files(file_filter)
+        sizes = [item['size'] or 0 for item in items if not item['is_dir']]
+        return len(items), len(sizes), sum(sizes)
+
+    @staticmethod
+    def diff(old_items, new_items):
+        """İki taramadaki dosyaları karşılaştır: (eklenen, silinen, değişen) öğe listeleri"""
+        old_files = {item['path']: item for item in old_items if not item['is_dir']}
+        new_files = {item['path']: item for item in new_items if not item['is_dir']}
+        added = [item for path, item in new_files.items() if path not in old_files]
+        removed = [item for path, item in old_files.items() if path not in new_files]
+        changed = [item for path, item in new_files.items() if path in old_files and
+                   (item['size'], item['mtime']) != (old_files[path]['size'], old_files[path]['mtime'])]
+        return added, removed, changed
+
+
+class DedupRepository:
+    """İçerik adresli, tekilleştirilmiş yedek deposu
+
+    Dosya içerikleri blake2b özetleriyle blobs/ altında yalnızca bir kez
+    saklanır; her yedek snapshots/ altında bu bloblara işaret eden küçük bir
+    JSON dizinidir. Aynı depoyu kullanan tüm sunucular blobları paylaşır;
+    bu yüzden aktarım ve budama, eşzamanlı işler birbirinin henüz anlık
+    görüntüye yazılmamış bloblarını silmesin diye depo kilidi altında yapılır.
+    """
+
+    def __init__(self, root, log_callback=None):
+        self.root = root
+        self.log_callback = log_callback
+        self.blobs_dir = os.path.join(root, "blobs")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+    def _log(self, message):
+        if self.log_callback:
+            try:
+                self.log_callback(message)
+            except:
+                pass
+
+    def blob_path(self, digest):
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    @contextmanager
+    def locked(self):
+        """Depoyu diğer yedekleme işlerine (başka süreçlerdekiler dahil) karşı kilitle
+
+        Kilit işletim sisteminin dosya kilididir; süreç çökerse kendiliğinden
+        bırakılır, geride bayat kilit kalmaz.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "lock"), 'a+b') as lock_file:
+            if not self._try_lock(lock_file):
+                self._log("⏳ Depo başka bir yedekleme tarafından kullanılıyor, bekleniyor...")
+                while not self._try_lock(lock_file, blocking=True):
+                    pass
+            try:
+                yield self
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                elif msvcrt:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    @staticmethod
+    def _try_lock(lock_file, blocking=False):
+        if fcntl:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                return True
+            except OSError:
+                return False
+        if msvcrt:
+            # LK_LOCK yaklaşık 10 sn dener, sonra OSError verir; çağıran yeniden dener
+            lock_file.seek(0)
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                return False
+        return True
+
+    @staticmethod
+    def new_hasher():
+        """Blob adlarında ve manifestlerde kullanılan özet fonksiyonu"""
+        return hashlib.blake2b(digest_size=BLOB_DIGEST_SIZE)
+
+    @staticmethod
+    def hash_file(file_path):
+        """Dosyanın içerik özetini hesapla"""
+        hasher = DedupRepository.new_hasher()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def store_file(self, file_path, digest=None):
+        """Dosyayı depoya ekle, (özet, yeni_blob_mu) döndür"""
+        digest = digest or self.hash_file(file_path)
+        blob_path = self.blob_path(digest)
+        if os.path.exists(blob_path):
+            return digest, False
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+        shutil.copyfile(file_path, temp_path)
+        os.replace(temp_path, blob_path)
+        return digest, True
+
+    def create_snapshot(self, server_info, source_dir, known_digests=None):
+        """source_dir içeriğini depoya aktar ve anlık görüntü dizinini yaz
+
+        known_digests göreli yol -> özet eşlemesidir; özeti indirme sırasında
+        hesaplanmış dosyalar yeniden okunmaz, blobu yoksa bu özetle kopyalanır.
+        """
+        known_digests = known_digests or {}
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        files = {}
+        dirs = []
+        new_blobs = 0
+        new_bytes = 0
+        total_bytes = 0
+
+        for root, dir_names, file_names in os.walk(source_dir):
+            for dir_name in dir_names:
+                dirs.append(os.path.relpath(os.path.join(root, dir_name), source_dir).replace(os.sep, '/'))
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                relative_path = os.path.relpath(file_path, source_dir).replace(os.sep, '/')
+                size = os.path.getsize(file_path)
+                digest, is_new = self.store_file(file_path, known_digests.get(relative_path))
+                files[relative_path] = [size, digest]
+                total_bytes += size
+                if is_new:
+                    new_blobs += 1
+                    new_bytes += size
+
+        server_key = re.sub(r'[^\w.-]', '_', server_info.get('name', 'server'))
+        snapshot_path = os.path.join(self.snapshots_dir, f"{server_key}_{os.path.basename(source_dir)}.json")
+        with open(snapshot_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'server': server_info.get('name'),
+                'host': server_info.get('host'),
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'dirs': dirs,
+                'files': files
+            }, f, ensure_ascii=False)
+
+        self._log(f"🧩 Anlık görüntü kaydedildi: {len(files)} dosya ({format_size(total_bytes)}), "
+                  f"{new_blobs} yeni blob ({format_size(new_bytes)})")
+        return snapshot_path, files
+
+    def list_snapshots(self, server_name=None):
+        """Depodaki anlık görüntüleri eskiden yeniye listele"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        snapshots = []
+        for file_name in sorted(os.listdir(self.snapshots_dir)):
+            if not file_name.endswith('.json'):
+                continue
+            snapshot_path = os.path.join(self.snapshots_dir, file_name)
+            if server_name is not None:
+                with open(snapshot_path, 'r', encoding='utf-8') as f:
+                    if json.load(f).get('server') != server_name:
+                        continue
+            snapshots.append(snapshot_path)
+        return snapshots
+
+    def restore_snapshot(self, snapshot_path, target_dir):
+        """Anlık görüntüyü bloblardan target_dir altına geri oluştur"""
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        for relative_dir in snapshot.get('dirs', []):
+            os.makedirs(os.path.join(target_dir, relative_dir), exist_ok=True)
+        for relative_path, (size, digest) in snapshot['files'].items():
+            local_path = os.path.join(target_dir, relative_path)
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            shutil.copyfile(self.blob_path(digest), local_path)
+        self._log(f"✅ {len(snapshot['files'])} dosya geri oluşturuldu: {target_dir}")
+        return True, target_dir
+
+    def prune(self, server_name, keep_last):
+        """Sunucunun en yeni keep_last anlık görüntüsü dışındakileri ve artık
+        hiçbir anlık görüntünün işaret etmediği blobları sil
+
+        Depo kilidi altında çağrılmalıdır. Yazılmakta olan .tmp dosyalarına
+        ve budama başladıktan sonra eklenen bloblara dokunulmaz.
+        """
+        started = time.time()
+        removed_snapshots = 0
+        if keep_last and keep_last > 0:
+            for snapshot_path in self.list_snapshots(server_name)[:-keep_last]:
+                os.remove(snapshot_path)
+                removed_snapshots += 1
+
+        referenced = set()
+        for snapshot_path in self.list_snapshots():
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                referenced.update(digest for _size, digest in json.load(f)['files'].values())
+
+        removed_blobs = 0
+        freed_bytes = 0
+        if os.path.isdir(self.blobs_dir):
+            for prefix in os.listdir(self.blobs_dir):
+                prefix_dir = os.path.join(self.blobs_dir, prefix)
+                for blob_name in os.listdir(prefix_dir):
+                    if blob_name not in referenced and not blob_name.endswith('.tmp'):
+                        blob_path = os.path.join(prefix_dir, blob_name)
+                        if os.path.getmtime(blob_path) >= started:
+                            continue
+                        freed_bytes += os.path.getsize(blob_path)
+                        os.remove(blob_path)
+                        removed_blobs += 1
+
+        self._log(f"🧹 Budama: {removed_snapshots} anlık görüntü, {removed_blobs} blob silindi ({format_size(freed_bytes)} boşaltıldı)")
+        return removed_snapshots, removed_blobs
 
 
 class AdvancedBackupManager(BackupManager):
@@ -559,6 +4133,7 @@ class AdvancedBackupManager(BackupManager):
         super().__init__(progress_callback, log_callback)
         self.db_manager = DatabaseManager(progress_callback, log_callback)
         self.archive_manager = ArchiveManager(progress_callback, log_callback)
+        self.manifest_manager = ManifestManager()
         self.backup_history = []
 
     def create_complete_backup(self, server_info, backup_config, db_configs=None):
@@ -578,15 +4153,62 @@ class AdvancedBackupManager(BackupManager):
         try:
             backup_type = backup_config.get('type', 'files_only')
             self._log(f"🚀 Yedekleme işlemi başlatılıyor: {backup_type}")
+            self.transfer_stats = {'retries': 0, 'failed': 0}
+            self.last_archive_path = None
+
+            use_repository = backup_config.get('repository', False)
+            archive_format, archive_level = self._get_archive_format(server_info)
+            try:
+                volume_size = int(float(backup_config.get('volume_size_mb') or 0) * 1024 * 1024)
+            except ValueError:
+                volume_size = 0
+            stream_to_zip = backup_config.get('stream_to_zip', False) and backup_config.get('create_zip', False) \
+                and not use_repository
+            if stream_to_zip and not archive_format.startswith('zip'):
+                self._log(f"ℹ️ Doğrudan arşivleme yalnızca ZIP biçiminde desteklenir, {archive_format} için ara klasör kullanılacak")
+                stream_to_zip = False
+
+            # Yedekleme için ana dizini oluştur; aynı hedefe yarım kalmış bir iş varsa onu sürdür.
+            # Doğrudan arşivlemede yarım kalan ZIP sürdürülemez, iş günlüğü tutulmaz.
+            self.resume_state = None
+            self.job_journal = None
+            if backup_type in ['files_only', 'full_backup'] and not stream_to_zip:
+                self.job_journal = JobJournal(server_info)
+                self.resume_state = self._load_resume_state(self.job_journal, backup_config)
 
-            # Yedekleme için ana dizini oluştur
-            backup_path = self._create_backup_path(backup_config['target_path'])
+            if self.resume_state:
+                backup_path = self.resume_state['backup_path']
+                self.job_journal.resume()
+                self._log(f"⏯️ Yarım kalan yedekleme sürdürülüyor ({self.resume_state.get('created')}): "
+                          f"{len(self.resume_state['done'])} dosya tamamlanmış, "
+                          f"{len(self.resume_state['listings'])} dizin listelenmiş")
+            else:
+                backup_path = self._create_backup_path(backup_config['target_path'])
+                if self.job_journal:
+                    self.job_journal.start(backup_path, backup_config)
             
             # Dosyaların indirileceği alt klasör (eğer dosya yedeklemesi varsa)
             files_backup_path = os.path.join(backup_path, "files")
             
             db_backups = []
             has_critical_error = False
+            files_root = None
+            self.manifest_files = {}
+            self.previous_manifest = None
+
+            zip_output_path = None
+            if backup_config.get('create_zip', False) and not use_repository:
+                zip_filename = f"backup_{os.path.basename(backup_path)}{ARCHIVE_FORMATS[archive_format][0]}"
+                zip_output_path = os.path.join(os.path.dirname(backup_path), zip_filename)
+            if stream_to_zip:
+                self.archive_stream = ZipStreamWriter(zip_output_path, backup_path,
+                                                      CompressionPolicy(compress=archive_format == 'zip'), archive_level,
+                                                      volume_size)
+                self._log(f"🗜️ Dosyalar doğrudan arşive yazılacak: {zip_output_path}")
+
+            # Artımlı yedeklemede önceki manifestle karşılaştırılacak
+            if backup_config.get('incremental', False) and backup_type in ['files_only', 'full_backup']:
+                self._load_previous_manifest(server_info)
 
             # 1. Dosyaları yedekle (eğer isteniyorsa)
             if backup_type in ['files_only', 'full_backup']:
@@ -604,13 +4226,16 @@ class AdvancedBackupManager(BackupManager):
                 self._log("✅ Sunucu bağlantısı başarılı!")
                 self._progress(20, 100)
                 
-                # Dosyaları `files_backup_path` içine indir
+                # Dosyaları `files_backup_path` içine (ya da doğrudan arşive) indir
                 os.makedirs(files_backup_path, exist_ok=True)
-                if server_info['protocol'] == 'ftp': self._perform_ftp_backup(conn, server_info, {'target_path': files_backup_path, 'filter': backup_config.get('filter', '*.*')})
-                else: self._perform_sftp_backup(conn, server_info, {'target_path': files_backup_path, 'filter': backup_config.get('filter', '*.*')})
+                files_config = {'target_path': files_backup_path, 'filter': backup_config.get('filter', '*.*'),
+                                'exclude': backup_config.get('exclude', ''), 'fast_rescan': backup_config.get('fast_rescan', False)}
+                if server_info['protocol'] == 'ftp': files_root = self._perform_ftp_backup(conn, server_info, files_config)
+                else: files_root = self._perform_sftp_backup(conn, server_info, files_config)
                 
-                if server_info['protocol'] == 'ftp': conn.quit()
-                else: conn.close()
+                if server_info['protocol'] == 'ftp': self._close_ftp(conn)
+                else: self._close_sftp(conn)
+                self._close_previous_archive()
 
             # 2. Veritabanlarını yedekle (eğer isteniyorsa)
             if backup_type in ['db_only', 'full_backup'] and db_configs:
@@ -635,36 +4260,204 @@ class AdvancedBackupManager(BackupManager):
             if not self.is_running:
                 raise Exception("İşlem durduruldu.")
 
+            try:
+                zip_workers = int(backup_config.get('zip_workers') or 0)
+            except ValueError:
+                zip_workers = 0
+
+            # İstenirse arşiv biçimleri indirilen verinin bir örneği üzerinde karşılaştırılır
+            if backup_config.get('compare_formats', False):
+                if self.archive_stream:
+                    self._log("ℹ️ Doğrudan arşivlemede yerel kopya olmadığından biçim karşılaştırması yapılamadı")
+                else:
+                    self.archive_manager.compare_formats(self._archive_members(backup_path, files_root, db_backups),
+                                                         zip_workers)
+
+            # Tekilleştirilmiş depo kullanılıyorsa yedeği depoya aktar
+            repository = None
+            if use_repository:
+                self._progress(95, 100)
+                repository = self._store_in_repository(server_info, backup_config, backup_path, files_root)
+
+            # Sonraki artımlı yedeklemeler için manifesti kaydet
+            manifest_path = None
+            if files_root:
+                manifest_path = self.manifest_manager.save(server_info, {
+                    'server': server_info.get('name'),
+                    'created': datetime.now().isoformat(timespec='seconds'),
+                    'files_root': None if repository else files_root,
+                    # Arşivin gerçek yolu (parçalı arşivde parça dizini) arşiv yazıldıktan sonra işlenir
+                    'archive_path': None,
+                    'archive_format': archive_format if zip_output_path else None,
+                    'zip_prefix': os.path.relpath(files_root, backup_path).replace(os.sep, '/') + '/',
+                    'repository': repository.root if repository else None,
+                    'files': self.manifest_files
+                }, backup_path)
+
             # 3. ZIP arşivi oluştur (eğer isteniyorsa)
-            if backup_config.get('create_zip', False):
+            archived = True
+            if self.archive_stream:
+                # Dosyalar zaten arşivde; veritabanı dökümleri ve manifest eklenip arşiv kapatılır
+                self._progress(95, 100)
+                for source_path in db_backups + ([manifest_path] if manifest_path else []):
+                    self.archive_stream.add_file(source_path, os.path.basename(source_path))
+                archive_path = self.archive_stream.close(hashes=self._archive_hashes(backup_path, files_root))
+                self.last_archive_path = archive_path
+                if manifest_path:
+                    self.manifest_manager.record_archive(server_info, archive_path, archive_format)
+                self._log(self.archive_stream.policy.summary())
+                self.archive_stream = None
+                self._log(f"✅ ZIP arşivi oluşturuldu: {archive_path}")
+                self._log("🧹 Geçici dosyalar temizleniyor...")
+                shutil.rmtree(backup_path, ignore_errors=True)
+            elif zip_output_path:
                 self._progress(95, 100)
-                zip_filename = f"backup_{os.path.basename(backup_path)}.zip"
-                zip_output_path = os.path.join(os.path.dirname(backup_path), zip_filename)
                 
                 # Arşivlenecek kaynakları topla
                 sources_to_archive = []
                 if os.path.exists(files_backup_path) and os.listdir(files_backup_path):
                     sources_to_archive.append(files_backup_path)
                 sources_to_archive.extend(db_backups)
+                if manifest_path:
+                    sources_to_archive.append(manifest_path)
 
-                success, result = self.archive_manager.create_zip_archive(sources_to_archive, zip_output_path)
+                # İndirilen dosyaların listesi ve boyutları zaten biliniyor; klasör yeniden taranmaz
+                members = self._archive_members(backup_path, files_root, db_backups + ([manifest_path] if manifest_path else []))
+                success, result = self.archive_manager.create_archive(sources_to_archive, zip_output_path, archive_format,
+                                                                      archive_level, zip_workers, members, volume_size,
+                                                                      self._archive_hashes(backup_path, files_root))
                 
+                archived = success
                 if success:
+                    self.last_archive_path = result
+                    if manifest_path:
+                        self.manifest_manager.record_archive(server_info, result, archive_format)
                     self._log(f"🧹 Geçici dosyalar temizleniyor...")
                     # Ana yedekleme klasörünü ve içindekileri sil
                     if os.path.exists(backup_path): 
                         shutil.rmtree(backup_path)
+
+            # Arşiv ya da depo aktarımı bittiyse iş tamamlandı; iş günlüğüne artık gerek yok.
+            # Arşivleme başarısız olursa günlük ve klasör kalır, sonraki çalışma yalnızca arşivlemeyi yineler.
+            if self.job_journal and archived:
+                self.job_journal.finish()
+
+            if repository:
+                # Depoya aktarılan geçici yedek klasörüne artık gerek yok
+                shutil.rmtree(backup_path, ignore_errors=True)
             
             if self.is_running:
-                self._log("✅ Yedekleme başarıyla tamamlandı!")
                 self._progress(100, 100)
-                if hasattr(self, 'on_complete_callback'): self.on_complete_callback("Tamamlandı")
+                status = self._completion_status()
+                if hasattr(self, 'on_complete_callback'): self.on_complete_callback(status)
         except Exception as e:
             self._log(f"❌ Beklenmeyen hata: {str(e)}")
-            if hasattr(self, 'on_complete_callback'): self.on_complete_callback("Başarısız")
+            # Kullanıcı durdurduysa stop_backup "Durduruldu" olarak zaten bildirdi
+            if self.is_running and hasattr(self, 'on_complete_callback'): self.on_complete_callback("Başarısız")
         finally:
+            self._close_previous_archive()
+            if self.archive_stream:
+                self.archive_stream.close(finish=False)
+                self.archive_stream = None
+            if self.job_journal:
+                self.job_journal.close()
             self.is_running = False
 
+    def _get_archive_format(self, server_info):
+        """Sunucu kaydındaki arşiv biçimini ve sıkıştırma seviyesini oku"""
+        archive_format = str(server_info.get('archive_format') or 'zip').strip().lower()
+        if archive_format not in ARCHIVE_FORMATS:
+            self._log(f"⚠️ Bilinmeyen arşiv biçimi '{archive_format}', ZIP kullanılacak")
+            archive_format = 'zip'
+        try:
+            archive_level = int(server_info.get('archive_level'))
+        except (TypeError, ValueError):
+            archive_level = None
+        return archive_format, archive_level
+
+    def _archive_members(self, backup_path, files_root, extra_files):
+        """Aktarım sırasında tutulan manifestten arşive eklenecek dosya listesini oluştur"""
+        members = []
+        if files_root:
+            for remote_path, entry in self.manifest_files.items():
+                local_path = os.path.join(files_root, remote_path.lstrip('/\\'))
+                members.append((local_path, os.path.relpath(local_path, backup_path), entry[0], False))
+        for file_path in extra_files:
+            members.append((file_path, os.path.basename(file_path), os.path.getsize(file_path), True))
+        return members
+
+    def _archive_hashes(self, backup_path, files_root):
+        """Manifestte özeti bilinen dosyaların yedek klasörüne göreli adlarıyla özetleri"""
+        hashes = {}
+        if files_root:
+            for remote_path, (_size, _mtime, digest) in self.manifest_files.items():
+                if digest:
+                    local_path = os.path.join(files_root, remote_path.lstrip('/\\'))
+                    hashes[os.path.relpath(local_path, backup_path).replace(os.sep, '/')] = digest
+        return hashes
+
+    def _load_resume_state(self, journal, backup_config):
+        """Aynı hedef ve türdeki yarım kalmış işin durumunu getir"""
+        state = journal.load()
+        if not state:
+            return None
+        if (state.get('target_path') != backup_config['target_path'] or state.get('type') != backup_config.get('type')
+                or not os.path.isdir(state['backup_path'])):
+            self._log("ℹ️ Önceki yarım kalan iş farklı bir hedefe ait, yeni yedekleme başlatılıyor")
+            return None
+        return state
+
+    def _store_in_repository(self, server_info, backup_config, backup_path, files_root):
+        """İndirilen yedeği tekilleştirilmiş depoya anlık görüntü olarak aktar"""
+        repository = DedupRepository(os.path.join(backup_config['target_path'], "repository"), self.log_callback)
+        self._log(f"🧩 Yedek tekilleştirilmiş depoya aktarılıyor: {repository.root}")
+
+        try:
+            keep_last = int(backup_config.get('repository_keep') or 0)
+        except ValueError:
+            keep_last = 0
+
+        # Depo sunucular arasında paylaşılır; eşzamanlı işin budaması henüz anlık
+        # görüntüye yazılmamış blobları silmesin diye aktarım ve budama kilit altında yapılır
+        with repository.locked():
+            # Önceki yedekten alınan dosyaların özetleri zaten biliniyor
+            _snapshot_path, files = repository.create_snapshot(server_info, backup_path,
+                                                               self._archive_hashes(backup_path, files_root))
+            if keep_last > 0:
+                repository.prune(server_info.get('name'), keep_last)
+
+        # Depodaki özetleri manifeste işle; sonraki artımlı çalışma bloblardan kopyalar
+        if files_root:
+            for remote_path, entry in self.manifest_files.items():
+                local_path = os.path.join(files_root, remote_path.lstrip('/\\'))
+                stored = files.get(os.path.relpath(local_path, backup_path).replace(os.sep, '/'))
+                if stored:
+                    entry[2] = stored[1]
+        return repository
+
+    def _load_previous_manifest(self, server_info):
+        """Artımlı yedekleme için sunucunun son manifestini yükle"""
+        previous = self.manifest_manager.load_latest(server_info)
+        if not previous:
+            self._log("ℹ️ Önceki manifest bulunamadı, tam yedekleme yapılacak")
+            return
+
+        self.previous_manifest = previous
+        # Eski manifestlerde arşiv yolu 'zip_path' alanında tutuluyordu
+        archive_path = previous.get('archive_path') or previous.get('zip_path')
+        if archive_path:
+            try:
+                self._previous_archive = ArchiveIndex.open(archive_path)
+            except (OSError, sqlite3.Error) as e:
+                self._log(f"⚠️ Önceki arşivin dizini açılamadı, değişmeyen dosyalar yeniden indirilecek: {str(e)}")
+        self._log(f"♻️ Artımlı yedekleme: {len(previous['files'])} dosyalık önceki manifest ({previous.get('created')}) ile karşılaştırılacak")
+
+    def _close_previous_archive(self):
+        """Artımlı yedekleme için açılan önceki arşivin dizinini kapat"""
+        if self._previous_archive is not None:
+            self._previous_archive.close_reader()
+            self._previous_archive = None
+
 
 # Demo modu için basit bir yedekleyici
 class DemoBackupManager(BackupManager):
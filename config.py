@@ -47,6 +47,23 @@ class ConfigManager:
         except:
             return []
 
+    def load_settings(self):
+        """Genel uygulama ayarlarını oku"""
+        if not os.path.exists(self.config_file):
+            return {}
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_settings(self, **settings):
+        """Verilen ayarları mevcut ayarlarla birleştirip kaydet"""
+        data = self.load_settings()
+        data.update(settings)
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
     def export_servers(self, filepath):
         """Sunucuları dışa aktar (şifresiz JSON olarak)"""
         try:
@@ -25,7 +25,7 @@ except ImportError:
 
 from server_manager import ServerManager
 from config import ConfigManager
-from backup_manager import AdvancedBackupManager, BackupManager, DatabaseManager
+from backup_manager import AdvancedBackupManager, ArchiveIndex, ArchiveManager, BackupManager, DatabaseManager, DEFAULT_CONNECTIONS, DEFAULT_SEGMENTS, MAX_ADAPTIVE_CONNECTIONS, GLOBAL_BANDWIDTH_LIMITER, format_size
 
 class EmailManager:
     def __init__(self):
@@ -82,6 +82,8 @@ class RestoreManager:
     def __init__(self, progress_callback=None, log_callback=None):
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        # Geri yükleme sekmesinde göz atılan arşivin dizini
+        self.index = None
     
     def restore_backup(self, zip_path, restore_config):
         if self.log_callback:
@@ -105,6 +107,27 @@ class RestoreManager:
         
         return True, "Geri yükleme tamamlandı"
 
+    def open_index(self, archive_path):
+        """Arşivin yanındaki dizini aç; arşivin kendisi okunmaz"""
+        self.close_index()
+        self.index = ArchiveIndex.open(archive_path)
+        return self.index
+
+    def close_index(self):
+        if self.index:
+            self.index.close_reader()
+        self.index = None
+
+    def extract_file(self, path, target_dir):
+        """Tek bir dosyayı dizindeki konumundan okuyarak çıkar"""
+        try:
+            target_path = self.index.extract(path, target_dir)
+            if self.log_callback:
+                self.log_callback(f"📤 Dosya çıkarıldı: {target_path}")
+            return True, target_path
+        except Exception as e:
+            return False, f"Dosya çıkarılamadı: {str(e)}"
+
 class HistoryManager:
     def __init__(self, db_path):
         self.db_path = db_path
@@ -120,7 +143,7 @@ class HistoryManager:
                 server_name TEXT NOT NULL,
                 start_time TEXT NOT NULL,
                 end_time TEXT,
-                status TEXT NOT NULL, -- 'Çalışıyor', 'Tamamlandı', 'Başarısız', 'Durduruldu'
+                status TEXT NOT NULL, -- 'Çalışıyor', 'Tamamlandı', 'Kısmen Tamamlandı', 'Başarısız', 'Durduruldu'
                 backup_type TEXT,
                 zip_path TEXT
             )
@@ -134,6 +157,12 @@ class HistoryManager:
                 FOREIGN KEY (history_id) REFERENCES backup_history (id)
             )
         ''')
+        # Eski veritabanlarına yeniden deneme ve alınamayan öğe sayaçlarını ekle
+        cursor.execute("PRAGMA table_info(backup_history)")
+        columns = [row[1] for row in cursor.fetchall()]
+        for column in ('retries', 'failed_items'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE backup_history ADD COLUMN {column} INTEGER DEFAULT 0")
         self.conn.commit()
 
     def start_backup_record(self, server_name, backup_type):
@@ -155,18 +184,20 @@ class HistoryManager:
         )
         self.conn.commit()
 
-    def update_backup_status(self, history_id, status, zip_path=None):
+    def update_backup_status(self, history_id, status, zip_path=None, retries=0, failed_items=0):
         end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         cursor = self.conn.cursor()
         cursor.execute(
-            "UPDATE backup_history SET status = ?, end_time = ?, zip_path = ? WHERE id = ?",
-            (status, end_time, zip_path, history_id)
+            "UPDATE backup_history SET status = ?, end_time = ?, zip_path = ?, retries = ?, failed_items = ? WHERE id = ?",
+            (status, end_time, zip_path, retries, failed_items, history_id)
         )
         self.conn.commit()
 
     def get_history(self):
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id, server_name, start_time, status, backup_type FROM backup_history ORDER BY id DESC")
+        cursor.execute(
+            "SELECT id, server_name, start_time, status, backup_type, retries, failed_items, zip_path FROM backup_history ORDER BY id DESC"
+        )
         return cursor.fetchall()
 
     def get_logs_for_history(self, history_id):
@@ -203,6 +234,11 @@ class ModernBackupMaster:
         self.history_manager = HistoryManager(db_path)
         
         self.servers = self.config_manager.load_servers()
+        # Tüm yedeklemelerin paylaştığı genel hız sınırı (KB/s)
+        try:
+            GLOBAL_BANDWIDTH_LIMITER.set_rate(int(self.config_manager.load_settings().get('bandwidth_limit', 0)) * 1024)
+        except (TypeError, ValueError):
+            pass
         # Zamanlayıcıyı başlat
         self.scheduler_thread = threading.Thread(target=self.run_scheduler, daemon=True)
         self.scheduler_thread.start()
@@ -214,8 +250,11 @@ class ModernBackupMaster:
 
         # Hız hesaplama için değişkenler
         self.last_speed_check_time = 0
-        self.last_bytes_transferred = 0
         self.total_bytes_transferred_session = 0
+        self.bytes_since_speed_check = 0
+        self.total_bytes_expected = 0
+        # Paralel indirme işçileri byte ilerlemesini aynı anda bildirir
+        self.byte_progress_lock = threading.Lock()
 
         
         # Event binding için değişkenler
@@ -506,8 +545,21 @@ class ModernBackupMaster:
             ("Port", "port", "21"),
             ("Kullanıcı Adı", "username", ""),
             ("Şifre", "password", ""),
-            ("Web Dizini", "web_root", "/public_html")
+            ("Web Dizini", "web_root", "/public_html"),
+            ("Bağlantı Sayısı", "connections", str(DEFAULT_CONNECTIONS)),
+            ("En Fazla Bağlantı", "max_connections", str(MAX_ADAPTIVE_CONNECTIONS)),
+            ("Dosya Parçası", "segments", str(DEFAULT_SEGMENTS)),
+            ("Hız Sınırı (KB/s)", "bandwidth_limit", "0"),
+            ("SFTP Okuma Önü", "read_ahead", "otomatik"),
+            ("SFTP İstek Boyutu", "request_size", "otomatik"),
+            ("SFTP Pencere", "window_size", "otomatik"),
+            ("SFTP Tampon", "buffer_size", "otomatik"),
+            ("SSH Tar Akışı", "remote_tar", "hayır"),
+            ("Arşiv Biçimi", "archive_format", "zip"),
+            ("Arşiv Seviyesi", "archive_level", "varsayılan")
         ]
+        # Eski kayıtlarda bulunmayan alanlar için gösterilecek varsayılanlar
+        self.form_defaults = {key: default for _, key, default in form_rows if default}
         
         for i, (label, key, default) in enumerate(form_rows):
             row_frame = tk.Frame(form_card, bg=self.colors['surface'])
@@ -515,7 +567,7 @@ class ModernBackupMaster:
             
             tk.Label(row_frame, text=label, font=self.fonts['body'],
                     bg=self.colors['surface'], fg=self.colors['text_primary'],
-                    width=12, anchor='w').pack(side=tk.LEFT)
+                    width=16, anchor='w').pack(side=tk.LEFT)
             
             if key == "password":
                 widget = ttk.Entry(row_frame, style='Modern.TEntry', show="•")
@@ -533,7 +585,7 @@ class ModernBackupMaster:
         
         tk.Label(protocol_frame, text="Protokol", font=self.fonts['body'],
                 bg=self.colors['surface'], fg=self.colors['text_primary'],
-                width=12, anchor='w').pack(side=tk.LEFT)
+                width=14, anchor='w').pack(side=tk.LEFT)
         
         protocol_btn_frame = tk.Frame(protocol_frame, bg=self.colors['surface'])
         protocol_btn_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(8, 0))
@@ -724,12 +776,23 @@ class ModernBackupMaster:
         self.file_filter.pack(fill=tk.X, pady=(4, 0))
         self.file_filter.set("*.*")
         
+        # Hariç tutulanlar; '/' ile biten klasörlerin içine hiç inilmez
+        exclude_frame = tk.Frame(settings_card, bg=self.colors['surface'])
+        exclude_frame.pack(fill=tk.X, pady=6)
+        
+        tk.Label(exclude_frame, text="Hariç Tutulanlar (ör. cache/ node_modules/ *.log >500MB)", font=self.fonts['body'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(anchor='w')
+        
+        self.exclude_filter = ttk.Entry(exclude_frame, style='Modern.TEntry')
+        self.exclude_filter.pack(fill=tk.X, pady=(4, 0))
+        
         # Seçenekler
         options_frame = tk.Frame(settings_card, bg=self.colors['surface'])
         options_frame.pack(fill=tk.X, pady=6)
         
         self.create_zip = tk.BooleanVar(value=True)
         self.send_email = tk.BooleanVar(value=False)
+        self.incremental = tk.BooleanVar(value=False)
         
         cb1 = tk.Checkbutton(options_frame, text="Yedekleri ZIP dosyası olarak paketle",
                       variable=self.create_zip, font=self.fonts['body'],
@@ -737,18 +800,81 @@ class ModernBackupMaster:
                       selectcolor=self.colors['surface'])
         cb1.pack(anchor='w', pady=2)
         
+        self.stream_to_zip = tk.BooleanVar(value=False)
+        cb6 = tk.Checkbutton(options_frame, text="ZIP'e doğrudan yaz (ara klasör olmadan)",
+                      variable=self.stream_to_zip, font=self.fonts['body'],
+                      bg=self.colors['surface'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['surface'])
+        cb6.pack(anchor='w', pady=2)
+        
+        zip_workers_frame = tk.Frame(options_frame, bg=self.colors['surface'])
+        zip_workers_frame.pack(fill=tk.X)
+        
+        tk.Label(zip_workers_frame, text="Sıkıştırma iş parçacığı sayısı:", font=self.fonts['body'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(side=tk.LEFT)
+        
+        self.zip_workers = ttk.Entry(zip_workers_frame, style='Modern.TEntry', width=4)
+        self.zip_workers.pack(side=tk.LEFT, padx=4, pady=2)
+        self.zip_workers.insert(0, str(os.cpu_count() or 1))
+        
+        tk.Label(zip_workers_frame, text="Parça boyutu (MB, 0 = bölme):", font=self.fonts['body'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(side=tk.LEFT, padx=(12, 0))
+        
+        self.volume_size = ttk.Entry(zip_workers_frame, style='Modern.TEntry', width=6)
+        self.volume_size.pack(side=tk.LEFT, padx=4, pady=2)
+        self.volume_size.insert(0, "0")
+        
         cb2 = tk.Checkbutton(options_frame, text="Yedekleri email ile gönder",
                       variable=self.send_email, font=self.fonts['body'],
                       bg=self.colors['surface'], fg=self.colors['text_primary'],
                       selectcolor=self.colors['surface'])
         cb2.pack(anchor='w', pady=2)
         
+        cb3 = tk.Checkbutton(options_frame, text="Artımlı yedekleme (değişmeyen dosyaları indirme)",
+                      variable=self.incremental, font=self.fonts['body'],
+                      bg=self.colors['surface'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['surface'])
+        cb3.pack(anchor='w', pady=2)
+        
+        self.compare_formats = tk.BooleanVar(value=False)
+        cb7 = tk.Checkbutton(options_frame, text="Arşiv biçimlerini yedeğin bir örneğiyle karşılaştır (süre/oran raporu)",
+                      variable=self.compare_formats, font=self.fonts['body'],
+                      bg=self.colors['surface'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['surface'])
+        cb7.pack(anchor='w', pady=2)
+        
+        self.fast_rescan = tk.BooleanVar(value=False)
+        cb5 = tk.Checkbutton(options_frame, text="Hızlı tarama (tarihi değişmeyen klasörleri yeniden listeleme)",
+                      variable=self.fast_rescan, font=self.fonts['body'],
+                      bg=self.colors['surface'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['surface'])
+        cb5.pack(anchor='w', pady=2)
+        
+        self.use_repository = tk.BooleanVar(value=False)
+        repository_frame = tk.Frame(options_frame, bg=self.colors['surface'])
+        repository_frame.pack(fill=tk.X)
+        
+        cb4 = tk.Checkbutton(repository_frame, text="Tekilleştirilmiş depoya kaydet, son",
+                      variable=self.use_repository, font=self.fonts['body'],
+                      bg=self.colors['surface'], fg=self.colors['text_primary'],
+                      selectcolor=self.colors['surface'])
+        cb4.pack(side=tk.LEFT, pady=2)
+        
+        self.repository_keep = ttk.Entry(repository_frame, style='Modern.TEntry', width=4)
+        self.repository_keep.pack(side=tk.LEFT, padx=4)
+        self.repository_keep.insert(0, "7")
+        
+        tk.Label(repository_frame, text="yedeği sakla", font=self.fonts['body'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(side=tk.LEFT)
+        
         # Buton
         action_card = self.create_card(backup_tab, padding=15)
         action_card.pack(fill=tk.X, padx=10, pady=(8, 10))
         
         ttk.Button(action_card, text="Yedeklemeyi Başlat", style='Primary.TButton',
                   command=self.start_backup).pack(fill=tk.X)
+        ttk.Button(action_card, text="Son Yedekten Bu Yana Değişenleri Göster", style='Secondary.TButton',
+                  command=self.preview_changes).pack(fill=tk.X, pady=(8, 0))
     
     def setup_email_tab(self):
         """Email ayarları sekmesi"""
@@ -800,6 +926,7 @@ class ModernBackupMaster:
         """Geri yükleme sekmesi"""
         restore_tab = ttk.Frame(self.notebook, style='Modern.TFrame')
         self.notebook.add(restore_tab, text="🔄 Geri Yükleme")
+        self.restore_tab = restore_tab
         
         form_card = self.create_card(restore_tab, padding=15)
         form_card.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -811,7 +938,7 @@ class ModernBackupMaster:
         zip_frame = tk.Frame(form_card, bg=self.colors['surface'])
         zip_frame.pack(fill=tk.X, pady=8)
         
-        tk.Label(zip_frame, text="Yedek ZIP Dosyası", font=self.fonts['body'],
+        tk.Label(zip_frame, text="Yedek Arşivi", font=self.fonts['body'],
                 bg=self.colors['surface'], fg=self.colors['text_primary']).pack(anchor='w')
         
         zip_input_frame = tk.Frame(zip_frame, bg=self.colors['surface'])
@@ -848,6 +975,36 @@ class ModernBackupMaster:
         
         ttk.Button(btn_frame, text="Geri Yüklemeyi Başlat", style='Primary.TButton',
                   command=self.start_restore).pack(fill=tk.X)
+        ttk.Button(btn_frame, text="Yedeği Doğrula", style='Secondary.TButton',
+                  command=self.verify_backup).pack(fill=tk.X, pady=(8, 0))
+
+        # Arşiv içeriği: yanındaki dizinden okunur, klasörler açıldıkça yüklenir
+        contents_frame = tk.Frame(form_card, bg=self.colors['surface'])
+        contents_frame.pack(fill=tk.BOTH, expand=True, pady=(16, 0))
+
+        contents_header = tk.Frame(contents_frame, bg=self.colors['surface'])
+        contents_header.pack(fill=tk.X, pady=(0, 8))
+        tk.Label(contents_header, text="Arşiv İçeriği", font=self.fonts['subtitle'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(side=tk.LEFT)
+        self.archive_summary_label = tk.Label(contents_header, text="", font=self.fonts['caption'],
+                                              bg=self.colors['surface'], fg=self.colors['text_secondary'])
+        self.archive_summary_label.pack(side=tk.LEFT, padx=(12, 0))
+        ttk.Button(contents_header, text="Seçili Dosyayı Çıkar", style='Secondary.TButton',
+                  command=self.extract_selected_file).pack(side=tk.RIGHT)
+        ttk.Button(contents_header, text="İçeriği Göster", style='Secondary.TButton',
+                  command=self.load_archive_contents).pack(side=tk.RIGHT, padx=(0, 8))
+
+        self.archive_tree = ttk.Treeview(contents_frame, columns=("size", "mtime"), style='Modern.Treeview')
+        self.archive_tree.heading("#0", text="Ad")
+        self.archive_tree.heading("size", text="Boyut")
+        self.archive_tree.heading("mtime", text="Değiştirilme")
+        self.archive_tree.column("size", width=100, anchor='e')
+        self.archive_tree.column("mtime", width=140, anchor='center')
+        archive_scrollbar = ttk.Scrollbar(contents_frame, orient=tk.VERTICAL, command=self.archive_tree.yview)
+        self.archive_tree.configure(yscrollcommand=archive_scrollbar.set)
+        self.archive_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        archive_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.archive_tree.bind('<<TreeviewOpen>>', self.on_archive_dir_open)
     
     def setup_history_tab(self):
         """Yedekleme geçmişi sekmesi"""
@@ -870,19 +1027,28 @@ class ModernBackupMaster:
                                command=self.clear_history)
         clear_btn.pack(side=tk.RIGHT, anchor='ne')
 
+        ttk.Button(history_list_card, text="Arşiv İçeriğini Göster", style='Secondary.TButton',
+                   command=self.show_history_archive).pack(side=tk.RIGHT, anchor='ne', padx=(0, 8))
+
 
         
         history_tree_frame = tk.Frame(history_list_card, bg=self.colors['surface'])
         history_tree_frame.pack(fill=tk.BOTH, expand=True)
 
-        columns = ("server", "time", "status", "type")
+        columns = ("server", "time", "status", "type", "retries", "failed")
         self.history_tree = ttk.Treeview(history_tree_frame, columns=columns, show='headings')
         self.history_tree.heading("server", text="Sunucu")
         self.history_tree.heading("time", text="Başlangıç Zamanı")
         self.history_tree.heading("status", text="Durum")
         self.history_tree.heading("type", text="Tür")
+        self.history_tree.heading("retries", text="Yeniden Deneme")
+        self.history_tree.heading("failed", text="Alınamayan")
+        self.history_tree.column("retries", width=110, anchor='center')
+        self.history_tree.column("failed", width=90, anchor='center')
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.history_tree.bind('<<TreeviewSelect>>', self.on_history_select)
+        # Geçmiş kaydı id'si → arşiv yolu
+        self.history_archives = {}
         
         # Alt panel: Log detayları
         log_details_card = self.create_card(paned_window, padding=15)
@@ -968,6 +1134,7 @@ class ModernBackupMaster:
         """İlerleme sekmesi"""
         progress_tab = ttk.Frame(self.notebook, style='Modern.TFrame')
         self.notebook.add(progress_tab, text="📊 İlerleme")
+        self.progress_tab = progress_tab
         
         # İstatistikler
         stats_card = self.create_card(progress_tab, padding=15)
@@ -980,7 +1147,8 @@ class ModernBackupMaster:
         stats_frame.pack(fill=tk.X)
         
         self.stats_labels = {}
-        stats = [("Durum", "status"), ("İşlenen Dosya", "processed"), ("Hız", "speed"), ("İlerleme", "progress")]
+        stats = [("Durum", "status"), ("İşlenen Dosya", "processed"), ("Aktarılan", "transferred"),
+                 ("Hız", "speed"), ("Kalan Süre", "eta"), ("İlerleme", "progress")]
         
         for i, (label, key) in enumerate(stats):
             row_frame = tk.Frame(stats_frame, bg=self.colors['surface'])
@@ -994,6 +1162,29 @@ class ModernBackupMaster:
                                             bg=self.colors['surface'], fg=self.colors['text_primary'])
             self.stats_labels[key].pack(side=tk.LEFT)
         
+        # Bant genişliği sınırları (çalışan yedeklemeye anında uygulanır)
+        bandwidth_card = self.create_card(progress_tab, padding=15)
+        bandwidth_card.pack(fill=tk.X, padx=10, pady=8)
+        
+        tk.Label(bandwidth_card, text="Hız Sınırı (KB/s, 0 = sınırsız)", font=self.fonts['subtitle'],
+                bg=self.colors['surface'], fg=self.colors['text_primary']).pack(anchor='w', pady=(0, 8))
+        
+        bandwidth_frame = tk.Frame(bandwidth_card, bg=self.colors['surface'])
+        bandwidth_frame.pack(fill=tk.X)
+        
+        self.bandwidth_widgets = {}
+        for label, key in [("Genel", "global"), ("Bu Sunucu", "server")]:
+            tk.Label(bandwidth_frame, text=f"{label}:", font=self.fonts['body_bold'],
+                    bg=self.colors['surface'], fg=self.colors['text_secondary']).pack(side=tk.LEFT)
+            widget = ttk.Entry(bandwidth_frame, style='Modern.TEntry', width=10)
+            widget.pack(side=tk.LEFT, padx=(6, 16))
+            self.bandwidth_widgets[key] = widget
+        self.bandwidth_widgets['global'].insert(0, str(GLOBAL_BANDWIDTH_LIMITER.rate // 1024))
+        self.bandwidth_widgets['server'].insert(0, "0")
+        
+        ttk.Button(bandwidth_frame, text="Uygula", style='Secondary.TButton',
+                  command=self.apply_bandwidth_limits).pack(side=tk.LEFT)
+        
         # İlerleme çubuğu
         progress_card = self.create_card(progress_tab, padding=15)
         progress_card.pack(fill=tk.X, padx=10, pady=8)
@@ -1249,8 +1440,12 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
                 widget.delete(0, tk.END)
                 if key in self.current_server:
                     widget.insert(0, self.current_server[key])
+                elif key in self.form_defaults:
+                    widget.insert(0, self.form_defaults[key])
             
             self.protocol.set(self.current_server.get('protocol', 'ftp'))
+            self.bandwidth_widgets['server'].delete(0, tk.END)
+            self.bandwidth_widgets['server'].insert(0, self.current_server.get('bandwidth_limit') or "0")
     
     def load_databases_list(self):
         """Veritabanı listesini yükle"""
@@ -1292,8 +1487,10 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
             self.history_tree.delete(item)
         
         history_data = self.history_manager.get_history()
+        self.history_archives = {record[0]: record[7] for record in history_data}
         for record in history_data:
-            self.history_tree.insert("", "end", iid=record[0], values=(record[1], record[2], record[3], record[4]))
+            self.history_tree.insert("", "end", iid=record[0], values=(record[1], record[2], record[3], record[4],
+                                                                      record[5] or 0, record[6] or 0))
 
     def on_history_select(self, event):
         """Geçmişten bir kayıt seçildiğinde logları yükle"""
@@ -1308,6 +1505,21 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
                 self.history_log_text.insert(tk.END, log_entry)
             self.history_log_text.see(tk.END)
 
+    def show_history_archive(self):
+        """Seçili geçmiş kaydının arşivini geri yükleme sekmesinde aç"""
+        selection = self.history_tree.selection()
+        if not selection:
+            messagebox.showwarning("Uyarı", "❌ Lütfen geçmişten bir yedek seçin!")
+            return
+        archive_path = self.history_archives.get(int(selection[0]))
+        if not archive_path:
+            messagebox.showinfo("Bilgi", "Bu yedek için kayıtlı bir arşiv yok.")
+            return
+        self.restore_zip_path.delete(0, tk.END)
+        self.restore_zip_path.insert(0, archive_path)
+        self.notebook.select(self.restore_tab)
+        self.load_archive_contents()
+
     def load_schedule_details(self):
         """Zamanlama detaylarını yükle"""
         if self.current_server and 'schedule' in self.current_server:
@@ -1347,6 +1559,10 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
         self.current_server = {
             'name': 'Yeni Sunucu', 'protocol': 'ftp', 'host': '',
             'port': '21', 'username': '', 'password': '', 'web_root': '/public_html',
+            'connections': str(DEFAULT_CONNECTIONS), 'max_connections': str(MAX_ADAPTIVE_CONNECTIONS),
+            'segments': str(DEFAULT_SEGMENTS), 'bandwidth_limit': '0',
+            'read_ahead': 'otomatik', 'request_size': 'otomatik', 'window_size': 'otomatik', 'buffer_size': 'otomatik',
+            'remote_tar': 'hayır', 'archive_format': 'zip', 'archive_level': 'varsayılan',
             'databases': []
         }
         self.servers.append(self.current_server)
@@ -1411,6 +1627,15 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
         self.form_widgets['server_name'].insert(0, "Yeni Sunucu")
         self.form_widgets['port'].insert(0, "21")
         self.form_widgets['web_root'].insert(0, "/public_html")
+        self.form_widgets['connections'].insert(0, str(DEFAULT_CONNECTIONS))
+        self.form_widgets['max_connections'].insert(0, str(MAX_ADAPTIVE_CONNECTIONS))
+        self.form_widgets['segments'].insert(0, str(DEFAULT_SEGMENTS))
+        self.form_widgets['bandwidth_limit'].insert(0, "0")
+        for key in ('read_ahead', 'request_size', 'window_size', 'buffer_size'):
+            self.form_widgets[key].insert(0, "otomatik")
+        self.form_widgets['remote_tar'].insert(0, "hayır")
+        self.form_widgets['archive_format'].insert(0, "zip")
+        self.form_widgets['archive_level'].insert(0, "varsayılan")
         self.load_databases_list()
         self.clear_database_details()
         self.load_schedule_details()
@@ -1454,7 +1679,18 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
                 'port': self.form_widgets['port'].get(),
                 'username': self.form_widgets['username'].get(),
                 'password': self.form_widgets['password'].get(),
-                'web_root': self.form_widgets['web_root'].get()
+                'web_root': self.form_widgets['web_root'].get(),
+                'connections': self.form_widgets['connections'].get(),
+                'max_connections': self.form_widgets['max_connections'].get(),
+                'segments': self.form_widgets['segments'].get(),
+                'bandwidth_limit': self.form_widgets['bandwidth_limit'].get(),
+                'read_ahead': self.form_widgets['read_ahead'].get(),
+                'request_size': self.form_widgets['request_size'].get(),
+                'window_size': self.form_widgets['window_size'].get(),
+                'buffer_size': self.form_widgets['buffer_size'].get(),
+                'remote_tar': self.form_widgets['remote_tar'].get(),
+                'archive_format': self.form_widgets['archive_format'].get(),
+                'archive_level': self.form_widgets['archive_level'].get()
             })
     
     def save_server(self):
@@ -1548,15 +1784,77 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
             self.backup_target.insert(0, path)
     
     def browse_restore_file(self):
-        file_path = filedialog.askopenfilename(filetypes=[("ZIP files", "*.zip")])
+        file_path = filedialog.askopenfilename(filetypes=[
+            ("Yedek arşivleri", "*.zip *.tar *.tar.xz *.tar.zst *.volumes.json *.index.db"), ("ZIP files", "*.zip"),
+            ("Klasör yedeği manifesti", "manifest.json")])
         if file_path:
             self.restore_zip_path.delete(0, tk.END)
             self.restore_zip_path.insert(0, file_path)
+            if os.path.basename(file_path) != "manifest.json":
+                self.load_archive_contents()
+
+    def load_archive_contents(self):
+        """Seçili arşivin içeriğini dizininden yükle (arşiv açılmaz)"""
+        archive_path = self.restore_zip_path.get()
+        if not archive_path:
+            messagebox.showwarning("Uyarı", "❌ Lütfen bir yedek arşivi seçin!")
+            return
+        for item in self.archive_tree.get_children():
+            self.archive_tree.delete(item)
+        try:
+            index = self.restore_manager.open_index(archive_path)
+        except Exception as e:
+            self.archive_summary_label.config(text="")
+            messagebox.showerror("Hata", f"Arşiv dizini açılamadı: {str(e)}")
+            return
+        summary = index.summary()
+        self.archive_summary_label.config(text=f"{summary['files']} dosya, {format_size(summary['bytes'])}")
+        self._fill_archive_dir('', '')
+
+    def _fill_archive_dir(self, node, parent):
+        # Klasör düğümleri '/' ile biter; açılana kadar içlerinde yer tutucu bir düğüm bulunur
+        directories, files = self.restore_manager.index.list_dir(parent)
+        prefix = f"{parent}/" if parent else ""
+        for name in directories:
+            item = self.archive_tree.insert(node, "end", iid=f"{prefix}{name}/", text=f"📁 {name}", values=("", ""))
+            self.archive_tree.insert(item, "end", text="...")
+        for name, size, mtime in files:
+            self.archive_tree.insert(node, "end", iid=f"{prefix}{name}", text=name, values=(
+                format_size(size or 0), datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M') if mtime else ""))
+
+    def on_archive_dir_open(self, event):
+        """Açılan klasörün içeriğini dizinden yükle"""
+        node = self.archive_tree.focus()
+        if not node.endswith('/'):
+            return
+        children = self.archive_tree.get_children(node)
+        if len(children) == 1 and self.archive_tree.item(children[0], 'text') == "...":
+            self.archive_tree.delete(children[0])
+            self._fill_archive_dir(node, node.rstrip('/'))
+
+    def extract_selected_file(self):
+        """Arşiv içeriğinde seçili dosyayı seçilen klasöre çıkar"""
+        selection = self.archive_tree.selection()
+        if not selection or selection[0].endswith('/') or not self.restore_manager.index:
+            messagebox.showwarning("Uyarı", "❌ Lütfen arşiv içeriğinden bir dosya seçin!")
+            return
+        target_dir = filedialog.askdirectory()
+        if not target_dir:
+            return
+        success, message = self.restore_manager.extract_file(selection[0], target_dir)
+        if success:
+            messagebox.showinfo("Başarılı", f"Dosya çıkarıldı:\n{message}")
+        else:
+            messagebox.showerror("Hata", message)
 
     def on_backup_complete(self, status, zip_path=None):
         """Yedekleme tamamlandığında çağrılır."""
         if self.current_history_id:
-            self.history_manager.update_backup_status(self.current_history_id, status, zip_path)
+            transfer_stats = getattr(self.backup_manager, 'transfer_stats', None) or {}
+            self.history_manager.update_backup_status(
+                self.current_history_id, status, zip_path,
+                transfer_stats.get('retries', 0), transfer_stats.get('failed', 0)
+            )
             self.current_history_id = None
         self.root.after(0, self.load_history) # GUI'yi güncelle
         self.root.after(0, self.stats_labels['status'].config, text=status)
@@ -1564,15 +1862,17 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
 
         # İşlem bitince hız ve ilerleme göstergelerini sıfırla
         if status != "Çalışıyor":
+            self.total_bytes_expected = 0
             self.root.after(0, self.update_speed, 0)
+            self.root.after(0, self.update_transfer_stats, 0, 0)
             self.root.after(0, self.update_file_progress, 0, 0)
             self.root.after(0, self.update_progress, 0, 100)
         
         # Bildirim gönder
-        if status in ["Tamamlandı", "Başarısız", "Durduruldu"]:
+        if status in ["Tamamlandı", "Kısmen Tamamlandı", "Başarısız", "Durduruldu"]:
             title = f"Yedekleme {status}"
             message = f"'{self.current_server['name']}' sunucusu için yedekleme işlemi {status.lower()}."
-            if status == "Başarısız":
+            if status in ["Başarısız", "Kısmen Tamamlandı"]:
                 self.send_notification(title, message, "error")
             else:
                 self.send_notification(title, message, "info")
@@ -1707,7 +2007,16 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
             'type': self.backup_type.get(),
             'target_path': self.backup_target.get(),
             'filter': self.file_filter.get(),
+            'exclude': self.exclude_filter.get(),
             'create_zip': self.create_zip.get(),
+            'stream_to_zip': self.stream_to_zip.get(),
+            'zip_workers': self.zip_workers.get().strip() or 0,
+            'volume_size_mb': self.volume_size.get().strip() or 0,
+            'compare_formats': self.compare_formats.get(),
+            'incremental': self.incremental.get(),
+            'fast_rescan': self.fast_rescan.get(),
+            'repository': self.use_repository.get(),
+            'repository_keep': self.repository_keep.get().strip() or 0,
             'send_email': self.send_email.get()
         }
         
@@ -1727,8 +2036,9 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
 
         # Hız hesaplaması için sıfırlama
         self.last_speed_check_time = time.time()
-        self.last_bytes_transferred = 0
         self.total_bytes_transferred_session = 0
+        self.bytes_since_speed_check = 0
+        self.total_bytes_expected = 0
         self.update_file_progress(0, 0) # Dosya sayacını sıfırla
 
         
@@ -1739,6 +2049,10 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
         )
         self.backup_manager.byte_progress_callback = self.handle_byte_progress
         self.backup_manager.file_progress_callback = self.update_file_progress
+        self.backup_manager.total_bytes_callback = self.set_total_bytes
+        self.backup_manager.scan_progress_callback = self.update_scan_progress
+        self.backup_manager.on_complete_callback = lambda status: self.root.after(
+            0, self.on_backup_complete, status, getattr(self.backup_manager, 'last_archive_path', None))
         
         def backup_thread():
             backup_type = backup_config['type']
@@ -1757,7 +2071,7 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
             # GUI güncellemelerini ana thread'e gönder
             if success:
                 self.root.after(0, self.update_status, "Yedekleme başlatıldı")
-                self.root.after(0, self.notebook.select, 6)  # İlerleme sekmesine git
+                self.root.after(0, self.notebook.select, self.progress_tab)  # İlerleme sekmesine git
                 self.root.after(0, self.stats_labels['status'].config, {'text': "Çalışıyor"})
             else:
                 self.root.after(0, messagebox.showerror, "Hata", message)
@@ -1767,6 +2081,55 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
         # Yedeklemeyi ayrı bir thread'de başlat
         threading.Thread(target=backup_thread, daemon=True).start()
 
+    def verify_backup(self):
+        """Seçili yedeği yeniden okuyup indirme sırasında hesaplanan özetlerle karşılaştır"""
+        backup_path = self.restore_zip_path.get()
+        if not backup_path:
+            messagebox.showwarning("Uyarı", "❌ Lütfen bir yedek arşivi ya da manifest.json seçin!")
+            return
+        try:
+            workers = int(self.zip_workers.get().strip() or 0)
+        except ValueError:
+            workers = 0
+        archive_manager = ArchiveManager(log_callback=self.update_log)
+        self.notebook.select(self.progress_tab)  # İlerleme sekmesine git
+
+        def verify_thread():
+            try:
+                problems = archive_manager.verify_backup(backup_path, workers)
+            except Exception as e:
+                self.root.after(0, messagebox.showerror, "Hata", f"Doğrulama yapılamadı: {str(e)}")
+                return
+            if problems:
+                self.root.after(0, messagebox.showwarning, "Doğrulama",
+                                f"{len(problems)} dosyada sorun bulundu, ayrıntılar log'da.")
+            else:
+                self.root.after(0, messagebox.showinfo, "Doğrulama", "Yedek sağlam, tüm özetler eşleşiyor.")
+
+        threading.Thread(target=verify_thread, daemon=True).start()
+
+    def preview_changes(self):
+        """Seçili sunucuda son yedekten bu yana değişen dosyaları indirmeden listele"""
+        if not self.current_server:
+            messagebox.showwarning("Uyarı", "❌ Lütfen önce bir sunucu seçin!")
+            return
+        
+        preview_config = {
+            'filter': self.file_filter.get(),
+            'exclude': self.exclude_filter.get(),
+            'fast_rescan': self.fast_rescan.get()
+        }
+        preview_manager = AdvancedBackupManager(log_callback=self.update_log)
+        server = self.current_server
+        self.notebook.select(self.progress_tab)  # İlerleme sekmesine git
+        
+        def preview_thread():
+            success, message = preview_manager.preview_changes(server, preview_config)
+            if not success:
+                self.root.after(0, messagebox.showerror, "Hata", message)
+        
+        threading.Thread(target=preview_thread, daemon=True).start()
+    
     def start_restore(self):
         if not self.restore_zip_path.get():
             messagebox.showwarning("Uyarı", "❌ Lütfen bir ZIP dosyası seçin!")
@@ -1789,11 +2152,39 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
         
         if success:
             self.update_status("Geri yükleme başlatıldı")
-            self.notebook.select(6)
+            self.notebook.select(self.progress_tab)
             self.stats_labels['status'].config(text="Geri Yükleniyor")
         else:
             messagebox.showerror("Hata", message)
     
+    def apply_bandwidth_limits(self):
+        """İlerleme sekmesindeki hız sınırlarını uygula
+
+        Genel sınır tüm işlere hemen uygulanır ve kaydedilir. Sunucu sınırı
+        çalışan yedeklemeye uygulanır ve seçili sunucunun kaydına yazılır.
+        """
+        try:
+            global_limit = max(0, int(self.bandwidth_widgets['global'].get() or 0))
+            server_limit = max(0, int(self.bandwidth_widgets['server'].get() or 0))
+        except ValueError:
+            messagebox.showwarning("Uyarı", "❌ Hız sınırı KB/s cinsinden bir tam sayı olmalıdır!")
+            return
+        
+        GLOBAL_BANDWIDTH_LIMITER.set_rate(global_limit * 1024)
+        self.config_manager.save_settings(bandwidth_limit=global_limit)
+        
+        if self.backup_manager and self.backup_manager.is_running:
+            self.backup_manager.set_bandwidth_limit(server_limit)
+        if self.current_server:
+            self.current_server['bandwidth_limit'] = str(server_limit)
+            self.config_manager.save_servers(self.servers)
+            if 'bandwidth_limit' in self.form_widgets:
+                self.form_widgets['bandwidth_limit'].delete(0, tk.END)
+                self.form_widgets['bandwidth_limit'].insert(0, str(server_limit))
+        
+        self.update_log(f"🐢 Hız sınırı güncellendi: genel {global_limit or 'sınırsız'} KB/s, "
+                        f"sunucu {server_limit or 'sınırsız'} KB/s")
+    
     def update_progress(self, value, max_value):
         percentage = int((value / max_value) * 100) if max_value > 0 else 0
         self.root.after(0, self._update_progress_gui, percentage)
@@ -1807,28 +2198,45 @@ JSON Dışa Aktar: Sunucuları JSON formatında dışa aktarır
     def update_file_progress(self, processed_count, total_count):
         self.root.after(0, lambda: self.stats_labels['processed'].config(text=f"{processed_count} / {total_count}"))
 
-    def handle_byte_progress(self, bytes_chunk, total_bytes=None, is_new_file=False):
-        """FTP'den gelen chunk veya SFTP'den gelen toplam byte'ı işler."""
-        if is_new_file: # SFTP
-            # SFTP her dosya için sıfırdan `bytes_so_far` gönderir.
-            # Bu yüzden bir önceki dosyanın boyutunu ekleyip devam ediyoruz.
-            increment = bytes_chunk - self.last_bytes_transferred
-            if increment < 0: # Yeni dosya başladı
-                self.total_bytes_transferred_session += self.last_bytes_transferred
-                self.last_bytes_transferred = bytes_chunk
-                increment = bytes_chunk
-            else:
-                 self.last_bytes_transferred = bytes_chunk
-        else: # FTP
-            increment = bytes_chunk
+    def update_scan_progress(self, discovered_count):
+        self.root.after(0, lambda: self.stats_labels['processed'].config(text=f"Taranıyor: {discovered_count} öğe bulundu"))
 
-        current_time = time.time()
-        time_diff = current_time - self.last_speed_check_time
+    def handle_byte_progress(self, bytes_chunk):
+        """FTP ve SFTP işçilerinden gelen byte artışlarını işler."""
+        with self.byte_progress_lock:
+            increment = bytes_chunk
+            self.total_bytes_transferred_session += increment
+
+            # Hız, son ölçümden bu yana tüm işçilerin aktardığı toplam byte'tan hesaplanır
+            self.bytes_since_speed_check += increment
+            current_time = time.time()
+            time_diff = current_time - self.last_speed_check_time
+
+            if time_diff > 0.5: # Hızı saniyenin yarısında bir güncelle
+                speed_bytes_per_sec = self.bytes_since_speed_check / time_diff
+                self.root.after(0, self.update_speed, speed_bytes_per_sec)
+                self.root.after(0, self.update_transfer_stats, self.total_bytes_transferred_session, speed_bytes_per_sec)
+                self.last_speed_check_time = current_time
+                self.bytes_since_speed_check = 0
+
+    def set_total_bytes(self, total_bytes):
+        """Aktarım başlamadan bildirilen toplam boyutu kaydet"""
+        self.total_bytes_expected = total_bytes
+        self.root.after(0, self.update_transfer_stats, self.total_bytes_transferred_session, 0)
+
+    def update_transfer_stats(self, transferred_bytes, speed_bytes_per_sec):
+        """Aktarılan miktarı ve kalan süre tahminini güncelle"""
+        total = self.total_bytes_expected
+        if total:
+            self.stats_labels['transferred'].config(text=f"{format_size(transferred_bytes)} / {format_size(total)}")
+        else:
+            self.stats_labels['transferred'].config(text=format_size(transferred_bytes))
 
-        if time_diff > 0.5: # Hızı saniyenin yarısında bir güncelle
-            speed_bytes_per_sec = increment / time_diff
-            self.root.after(0, self.update_speed, speed_bytes_per_sec)
-            self.last_speed_check_time = current_time
+        if total and speed_bytes_per_sec > 0:
+            remaining = max(0, total - transferred_bytes) / speed_bytes_per_sec
+            self.stats_labels['eta'].config(text=time.strftime('%H:%M:%S', time.gmtime(remaining)))
+        else:
+            self.stats_labels['eta'].config(text="-")
 
     def update_speed(self, speed_bytes_per_sec):
         if speed_bytes_per_sec > 1024 * 1024: